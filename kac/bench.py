@@ -0,0 +1,166 @@
+"""
+Synthetic CHANGELOG generator and benchmarks for parsing, bumping and copying CHANGELOG files.
+"""
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, TextIO
+
+from .changelog import Changelog
+from .changelog.release import ReleaseBase
+
+DEFAULT_SIZES = (1, 1000, 100000, 1000000)
+OPERATIONS = ('parse', 'parse_lazy', 'copy', 'bump')
+
+_WORDS = ('add', 'fix', 'remove', 'update', 'support', 'option', 'command', 'release', 'parser', 'version', 'file',
+          'footer', 'heading', 'changelog', 'error', 'message', 'output', 'cache', 'index', 'link')
+
+
+def _entry(rng: random.Random, line_length: int) -> str:
+    words = []
+    length = 0
+    while length < line_length:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)[:line_length].capitalize()
+
+
+def _changes(rng: random.Random, entries: int, line_length: int) -> str:
+    """Generate the changes of a release, spread over randomly chosen change types."""
+    change_types = sorted(rng.sample(range(len(ReleaseBase.CHANGE_TYPES)), min(entries, 3)))
+    per_type = [entries // len(change_types)] * len(change_types) if change_types else []
+    for idx in range(entries - sum(per_type)):
+        per_type[idx] += 1
+    return ''.join(
+        f'### {ReleaseBase.CHANGE_TYPES[t].capitalize()}\n' + ''.join(f'- {_entry(rng, line_length)}\n'
+                                                                      for _ in range(count)) + '\n'
+        for t, count in zip(change_types, per_type)
+    )
+
+
+def _version(number: int, rng: random.Random, prerelease_ratio: float, build_ratio: float) -> str:
+    version = f'{number // 10000}.{number // 100 % 100}.{number % 100}'
+    if rng.random() < prerelease_ratio:
+        version += f'-rc.{rng.randint(1, 9)}'
+    if rng.random() < build_ratio:
+        version += f'+build.{rng.randint(1, 999)}'
+    return version
+
+
+def write_changelog(f: TextIO, releases: int = 100, entries: int = 3, line_length: int = 60,
+                    prerelease_ratio: float = 0.0, build_ratio: float = 0.0, seed: int = 0,
+                    repo_url: str = 'https://github.com/atwalsh/kac') -> None:
+    """
+    Write a synthetic Keep a Changelog file, one release at a time.
+
+    :param f: Text file object to write to.
+    :param releases: Number of published releases.
+    :param entries: Number of change entries per release, and in the `Unreleased` section.
+    :param line_length: Length of each change entry.
+    :param prerelease_ratio: Fraction of versions that are prereleases, ie. `1.2.3-rc.1`.
+    :param build_ratio: Fraction of versions with build metadata, ie. `1.2.3+build.7`.
+    :param seed: Random seed, the same arguments always generate the same file.
+    :param repo_url: Repository URL used in the footer links.
+    """
+    rng = random.Random(seed)
+    f.write('# Changelog\nAll notable changes to this project will be documented in this file.\n\n'
+            'The format is based on [Keep a Changelog](https://keepachangelog.com/en/1.0.0/),\n'
+            'and this project adheres to [Semantic Versioning](https://semver.org/spec/v2.0.0.html).\n\n')
+    f.write(f'## [Unreleased]\n{_changes(rng, entries, line_length)}')
+
+    versions = [_version(number, rng, prerelease_ratio, build_ratio) for number in range(releases, 0, -1)]
+    first_date = date(2000, 1, 1)
+    for number, version in zip(range(releases, 0, -1), versions):
+        f.write(f'## [{version}] - {first_date + timedelta(days=number)}\n{_changes(rng, entries, line_length)}')
+
+    if versions:
+        f.write(f'[Unreleased]: {repo_url}/compare/v{versions[0]}...HEAD\n')
+    else:
+        f.write(f'[Unreleased]: {repo_url}/commits/HEAD\n')
+    for newer, older in zip(versions, versions[1:]):
+        f.write(f'[{newer}]: {repo_url}/compare/v{older}...v{newer}\n')
+    if versions:
+        f.write(f'[{versions[-1]}]: {repo_url}/releases/tag/v{versions[-1]}\n')
+
+
+def generate_changelog(path: str, releases: int = 100, **kwargs) -> str:
+    """
+    Write a synthetic Keep a Changelog file to `path`. Keyword arguments are passed on to `write_changelog`.
+
+    :param path: File system path to write the CHANGELOG file to.
+    :param releases: Number of published releases.
+    :return: The path of the CHANGELOG file.
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        write_changelog(f, releases, **kwargs)
+    return path
+
+
+def _copy(path: str) -> None:
+    Changelog.read_latest_release(path).changes_text
+
+
+def _bump(path: str) -> None:
+    changelog = Changelog(path, lazy=True)
+    changelog.bump(changelog.get_next_version('patch'))
+
+
+_RUNNERS: Dict[str, Callable[[str], None]] = {
+    'parse': Changelog,
+    'parse_lazy': lambda path: Changelog(path, lazy=True),
+    'copy': _copy,
+    'bump': _bump,
+}
+
+
+def _measure(operation: str, path: str, work_path: str) -> tuple:
+    """Run an operation once for its time and once for its peak memory, on a fresh copy of the file each time."""
+    shutil.copyfile(path, work_path)
+    start = time.perf_counter()
+    _RUNNERS[operation](work_path)
+    seconds = time.perf_counter() - start
+
+    shutil.copyfile(path, work_path)
+    tracemalloc.start()
+    try:
+        _RUNNERS[operation](work_path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def run_benchmarks(sizes: Iterable[int] = DEFAULT_SIZES, operations: Iterable[str] = OPERATIONS,
+                   directory: str = None, **kwargs) -> List[dict]:
+    """
+    Benchmark CHANGELOG operations against synthetic files of different sizes.
+
+    :param sizes: Numbers of releases to generate files with.
+    :param operations: Operations to benchmark, any of `OPERATIONS`.
+    :param directory: Directory for the generated files, defaults to a temporary directory that is removed afterwards.
+    :return: List of result dictionaries with the operation, release count, file size, seconds, throughput and peak
+        traced memory in bytes.
+    """
+    operations = list(operations)
+    results = []
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        for size in sizes:
+            path = generate_changelog(os.path.join(tmp, f'CHANGELOG-{size}.md'), size, **kwargs)
+            file_size = os.path.getsize(path)
+            for operation in operations:
+                seconds, peak = _measure(operation, path, os.path.join(tmp, 'CHANGELOG.md'))
+                results.append({
+                    'operation': operation,
+                    'releases': size,
+                    'bytes': file_size,
+                    'seconds': seconds,
+                    'mb_per_second': file_size / seconds / 1e6 if seconds else None,
+                    'releases_per_second': size / seconds if seconds else None,
+                    'peak_memory': peak,
+                })
+    return results
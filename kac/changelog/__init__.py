@@ -1,2 +1,6 @@
+from .batch import ParseResult, parse_many
+from .cache import ChangelogCache
 from .changelog import Changelog
-from .release import Release, Unreleased
+from .exceptions import (ChangelogError, ChangelogNotFoundError, ChangelogParseError, InvalidChangeTypeError,
+                         InvalidDateError, InvalidLinkError, InvalidVersionError, MissingUnreleasedError)
+from .release import Release, ReleaseList, Unreleased
@@ -0,0 +1,213 @@
+"""
+Asyncio API for loading and bumping CHANGELOG files.
+
+Blocking file I/O and parsing run in a bounded thread pool, at most `max_concurrency` operations are in flight per event
+loop, and bumps of the same file are serialized by a per-path lock.
+"""
+import asyncio
+import functools
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, Union
+
+from semver import VersionInfo
+
+from ..util import get_first_git_remote as _get_first_git_remote
+from .cache import ChangelogCache
+from .changelog import Changelog
+from .exceptions import ChangelogNotFoundError
+
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+DEFAULT_MAX_CONCURRENCY = 64
+
+_max_workers = DEFAULT_MAX_WORKERS
+_max_concurrency = DEFAULT_MAX_CONCURRENCY
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+class _LoopState:
+    """Concurrency limit and per-path locks of a single event loop, as asyncio primitives cannot be shared."""
+
+    def __init__(self):
+        self.semaphore = asyncio.Semaphore(_max_concurrency)
+        self.locks = weakref.WeakValueDictionary()  # Real path => asyncio.Lock, dropped once no task holds it
+
+
+_loop_states = weakref.WeakKeyDictionary()
+
+
+def _state() -> _LoopState:
+    loop = asyncio.get_event_loop()
+    state = _loop_states.get(loop)
+    if state is None:
+        state = _loop_states[loop] = _LoopState()
+    return state
+
+
+def configure(max_workers: int = None, max_concurrency: int = None) -> None:
+    """
+    Set the limits of the async API. Operations that are already running keep the previous limits.
+
+    :param max_workers: Number of threads that blocking I/O and parsing run in.
+    :param max_concurrency: Maximum number of operations in flight per event loop, further operations wait their turn.
+    """
+    global _executor, _max_workers, _max_concurrency
+    if max_workers is not None:
+        _max_workers = max_workers
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+    if max_concurrency is not None:
+        _max_concurrency = max_concurrency
+        _loop_states.clear()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix='kac')
+    return _executor
+
+
+async def run_blocking(fn: Callable, *args, **kwargs):
+    """
+    Run a blocking function in the bounded executor, waiting for a free slot first.
+
+    :param fn: The function to run.
+    :return: The return value of the function.
+    """
+    async with _state().semaphore:
+        return await asyncio.get_event_loop().run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def _lock(path: str) -> asyncio.Lock:
+    locks = _state().locks
+    key = os.path.realpath(path)
+    lock = locks.get(key)
+    if lock is None:
+        lock = locks[key] = asyncio.Lock()
+    return lock
+
+
+def _file_stat(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+class AsyncChangelog:
+    """
+    Asyncio wrapper around a Changelog.
+
+    Attributes that do not touch the file, ie. `unreleased`, `releases` and `latest_version`, are read straight from
+    the wrapped Changelog.
+    """
+
+    def __init__(self, changelog: Changelog, stat: Tuple[int, int], cache: ChangelogCache = None, lazy: bool = False,
+                 memory_map: bool = False):
+        """
+        Use `await AsyncChangelog.load(path)` rather than creating instances directly.
+
+        :param changelog: The loaded Changelog.
+        :param stat: (mtime_ns, size) of the file when it was loaded.
+        :param cache: ChangelogCache the file was loaded with.
+        :param lazy: Whether the file was loaded lazily.
+        :param memory_map: Whether the file was memory mapped.
+        """
+        self.changelog = changelog
+        self._stat = stat
+        self._load_args = (cache, lazy, memory_map)
+
+    def __repr__(self):
+        return f'<AsyncChangelog {self.changelog.path}>'
+
+    def __getattr__(self, name):
+        if name == 'changelog':  # Not set yet, ie. while unpickling
+            raise AttributeError(name)
+        return getattr(self.changelog, name)
+
+    @staticmethod
+    def _load(path: str, cache: ChangelogCache, lazy: bool, memory_map: bool) -> Tuple[Changelog, Tuple[int, int]]:
+        try:
+            stat = _file_stat(path)  # Before reading, so that a concurrent change is never missed
+        except FileNotFoundError:
+            raise ChangelogNotFoundError(path=path) from None
+        return Changelog.load(path, cache=cache, lazy=lazy, memory_map=memory_map), stat
+
+    @classmethod
+    async def load(cls, path: str, cache: ChangelogCache = None, lazy: bool = False,
+                   memory_map: bool = False) -> 'AsyncChangelog':
+        """
+        Load a CHANGELOG file without blocking the event loop.
+
+        :param path: The full file system path of the CHANGELOG file.
+        :param cache: ChangelogCache to look the file up in and store it to.
+        :param lazy: Only parse each release on first access.
+        :param memory_map: Read the file text from a read-only memory map.
+        :return: AsyncChangelog for the file.
+        """
+        changelog, stat = await run_blocking(cls._load, path, cache, lazy, memory_map)
+        return cls(changelog, stat, cache, lazy, memory_map)
+
+    def _refresh(self) -> None:
+        """Reload the file if it was changed since it was loaded, ie. by another AsyncChangelog."""
+        if _file_stat(self.changelog.path) != self._stat:
+            self.changelog.close()
+            self.changelog, self._stat = self._load(self.changelog.path, *self._load_args)
+
+    def _bump(self, version: Union[VersionInfo, Callable[[Changelog], VersionInfo]]) -> VersionInfo:
+        self._refresh()
+        if callable(version):
+            version = version(self.changelog)
+        self.changelog.bump(version)
+        self._stat = _file_stat(self.changelog.path)
+        return version
+
+    async def bump(self, version: VersionInfo) -> None:
+        """
+        Bump the CHANGELOG to the specified version without blocking the event loop.
+
+        Bumps of the same file are serialized. If the file was changed since it was loaded, it is reloaded first, so
+        that changes made by other bumps are kept.
+
+        :param version: The version which the CHANGELOG file should be bumped to.
+        """
+        async with _lock(self.changelog.path):
+            await run_blocking(self._bump, version)
+
+    async def bump_next(self, bump_type: str, prerelease_token: str = 'rc', build_token: str = 'build') -> VersionInfo:
+        """
+        Bump a version part of the CHANGELOG without blocking the event loop. The next version is worked out while the
+        file is locked, so concurrent bumps of the same file never produce the same version.
+
+        :param bump_type: The version part to be bumped, one of `Changelog.BUMP_TYPES`.
+        :param prerelease_token: String to identify prerelease versions, defaults to `rc`.
+        :param build_token: String to identify build versions, defaults to `build`.
+        :return: VersionInfo instance of the new version.
+        """
+        next_version = functools.partial(Changelog.get_next_version, bump_type=bump_type,
+                                         prerelease_token=prerelease_token, build_token=build_token)
+        async with _lock(self.changelog.path):
+            return await run_blocking(self._bump, next_version)
+
+    async def close(self) -> None:
+        """
+        Release the memory map of the CHANGELOG file, if there is one.
+        """
+        self.changelog.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+async def get_first_git_remote() -> str:
+    """
+    Attempt to get the first git remote URL from the ./.git/config file in the current directory, without blocking
+    the event loop.
+
+    :return: URL for the first git remote or an empty string if a remote URL could not be identified.
+    """
+    return await run_blocking(_get_first_git_remote)
@@ -0,0 +1,165 @@
+import os
+from concurrent.futures import Executor
+from functools import partial
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+from .changelog import Changelog, _release_from_cache, _release_to_cache
+from .exceptions import ChangelogError
+from .release import Release, Unreleased
+
+# `concurrent.futures.process` is imported when a pool is first needed, so that importing `kac.changelog` stays cheap
+
+
+class BumpResult(NamedTuple):
+    """Outcome of bumping a single CHANGELOG file."""
+    path: str
+    status: str  # One of `BUMPED`, `SKIPPED` or `ERROR`
+    previous_version: Optional[str] = None
+    new_version: Optional[str] = None
+    message: str = ''
+
+
+class ParseResult(NamedTuple):
+    """
+    Outcome of parsing a single CHANGELOG file, as plain data that is cheap to pickle between processes.
+    """
+    path: str
+    status: str  # One of `PARSED` or `ERROR`
+    unreleased: Optional[tuple] = None  # Lists of unreleased changes, in `ReleaseBase.CHANGE_TYPES` order
+    releases: Optional[list] = None  # (packed version, date ordinal, lists of changes) tuples, newest to oldest
+    message: str = ''
+
+    def to_unreleased(self) -> Unreleased:
+        """
+        :return: Unreleased instance for the unreleased changes.
+        """
+        return Unreleased(*self.unreleased)
+
+    def to_releases(self) -> List[Release]:
+        """
+        :return: List of Release instances, newest to oldest.
+        """
+        return [_release_from_cache(release) for release in self.releases]
+
+
+BUMPED = 'bumped'
+SKIPPED = 'skipped'
+PARSED = 'parsed'
+ERROR = 'error'
+
+
+def parse_file(path: str) -> ParseResult:
+    """
+    Parse a single CHANGELOG file, reporting failures as data rather than aborting.
+
+    :param path: File system path of the CHANGELOG file.
+    :return: ParseResult for the file.
+    """
+    try:
+        changelog = Changelog(path)
+    except (ChangelogError, OSError, ValueError) as e:
+        return ParseResult(path, ERROR, message=str(e))
+    return ParseResult(
+        path,
+        PARSED,
+        changelog.unreleased._change_lists(),
+        [_release_to_cache(release) for release in changelog.releases],
+    )
+
+
+def _chunksize(count: int, workers: Optional[int]) -> int:
+    """Split the work into about 4 chunks per worker, to balance pickling overhead against uneven file sizes."""
+    return max(1, count // ((workers or os.cpu_count() or 1) * 4))
+
+
+def iter_parse_many(paths: Iterable[str], workers: int = None, executor: Executor = None) -> Iterator[ParseResult]:
+    """
+    Parse many CHANGELOG files in a process pool, yielding results as they become available.
+
+    :param paths: File system paths of the CHANGELOG files.
+    :param workers: Maximum number of worker processes, defaults to the number of CPUs. With 1 worker, files are parsed
+        in the current process. Ignored if `executor` is given.
+    :param executor: Existing executor to share between batches, instead of starting a new process pool.
+    :return: Iterator of ParseResult, in the same order as `paths`.
+    """
+    paths = list(paths)
+    if executor is not None:
+        yield from executor.map(parse_file, paths, chunksize=_chunksize(len(paths), workers))
+        return
+    if workers == 1 or len(paths) <= 1:
+        yield from map(parse_file, paths)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(parse_file, paths, chunksize=_chunksize(len(paths), workers))
+
+
+def parse_many(paths: Iterable[str], workers: int = None, executor: Executor = None) -> List[ParseResult]:
+    """
+    Parse many CHANGELOG files in a process pool.
+
+    Files that cannot be parsed are reported as errors, and do not stop the rest of the batch.
+
+    :param paths: File system paths of the CHANGELOG files.
+    :param workers: Maximum number of worker processes, defaults to the number of CPUs. With 1 worker, files are parsed
+        in the current process. Ignored if `executor` is given.
+    :param executor: Existing executor to share between batches, instead of starting a new process pool.
+    :return: List of ParseResult, in the same order as `paths`.
+    """
+    return list(iter_parse_many(paths, workers, executor))
+
+
+def bump_file(path: str, bump_type: str, prerelease_token: str = 'rc', build_token: str = 'build') -> BumpResult:
+    """
+    Bump a single CHANGELOG file, reporting failures as data rather than aborting.
+
+    :param path: File system path of the CHANGELOG file.
+    :param bump_type: The version part to be bumped, one of `Changelog.BUMP_TYPES`.
+    :param prerelease_token: String to identify prerelease versions, defaults to `rc`.
+    :param build_token: String to identify build versions, defaults to `build`.
+    :return: BumpResult for the file.
+    """
+    try:
+        changelog = Changelog(path, lazy=True)
+    except (ChangelogError, OSError, ValueError) as e:
+        return BumpResult(path, ERROR, message=str(e))
+    if not changelog.releases:
+        return BumpResult(path, ERROR, message='The CHANGELOG has no releases to bump.')
+    previous_version = changelog.latest_version
+
+    if not changelog.unreleased.has_changes:
+        return BumpResult(path, SKIPPED, f'{previous_version}', message='CHANGELOG has no unreleased changes.')
+
+    try:
+        new_version = changelog.get_next_version(bump_type, prerelease_token, build_token)
+        changelog.bump(new_version)
+    except (OSError, ValueError) as e:
+        return BumpResult(path, ERROR, f'{previous_version}', message=str(e))
+    return BumpResult(path, BUMPED, f'{previous_version}', f'{new_version}')
+
+
+def bump_many(paths: Iterable[str], bump_type: str, prerelease_token: str = 'rc', build_token: str = 'build',
+              workers: int = None) -> List[BumpResult]:
+    """
+    Bump many CHANGELOG files in a process pool.
+
+    Files without unreleased changes are skipped and files that cannot be parsed are reported as errors, neither stops
+    the rest of the batch.
+
+    :param paths: File system paths of the CHANGELOG files.
+    :param bump_type: The version part to be bumped, one of `Changelog.BUMP_TYPES`.
+    :param prerelease_token: String to identify prerelease versions, defaults to `rc`.
+    :param build_token: String to identify build versions, defaults to `build`.
+    :param workers: Maximum number of worker processes, defaults to the number of CPUs. With 1 worker, files are bumped
+        in the current process.
+    :return: List of BumpResult, in the same order as `paths`.
+    """
+    paths = list(dict.fromkeys(paths))  # A file must not be bumped twice
+    bump = partial(bump_file, bump_type=bump_type, prerelease_token=prerelease_token, build_token=build_token)
+    if workers == 1 or len(paths) <= 1:
+        return [bump(path) for path in paths]
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(bump, paths, chunksize=_chunksize(len(paths), workers)))
@@ -0,0 +1,160 @@
+import hashlib
+import marshal
+import os
+import zlib
+from typing import Any, Optional
+
+from .util import atomic_write
+
+# Bump whenever the layout of cached entries changes, so that stale entries are never loaded
+CACHE_FORMAT = 1
+
+
+def default_cache_dir() -> str:
+    """
+    Get the default CHANGELOG cache directory: `$KAC_CACHE_DIR`, or `kac` in the user's cache directory.
+
+    :return: File system path of the cache directory.
+    """
+    if os.environ.get('KAC_CACHE_DIR'):
+        return os.environ['KAC_CACHE_DIR']
+    return os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'kac')
+
+
+def file_digest(path: str) -> str:
+    """
+    Get the SHA-256 hex digest of a file's contents.
+
+    :param path: File system path of the file.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ChangelogCache:
+    """
+    On-disk cache of parsed CHANGELOG files with size-bounded LRU eviction.
+
+    Entries are looked up by (path, mtime_ns, size) first. If the file was touched without changing, ie. by a fresh
+    checkout, the entry is found again by the SHA-256 of its contents. Entries are stored as zlib compressed `marshal`
+    data, so loading them never executes code.
+    """
+
+    def __init__(self, directory: str = None, max_size: int = 64 * 1024 * 1024):
+        """
+        :param directory: Directory the cache is stored in, defaults to `default_cache_dir()`.
+        :param max_size: Maximum total size of cached entries in bytes, the least recently used entries are evicted
+            once it is exceeded.
+        """
+        self.directory = directory or default_cache_dir()
+        self.max_size = max_size
+        self._stat_dir = os.path.join(self.directory, 'stat')
+        self._data_dir = os.path.join(self.directory, 'data')
+
+    def __repr__(self):
+        return f'<ChangelogCache {self.directory}>'
+
+    @staticmethod
+    def _stat_key(path: str) -> str:
+        st = os.stat(path)
+        key = f'{CACHE_FORMAT}\0{marshal.version}\0{os.path.abspath(path)}\0{st.st_mtime_ns}\0{st.st_size}'
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def _data_path(self, digest: str) -> str:
+        return os.path.join(self._data_dir, f'{digest}.v{CACHE_FORMAT}.{marshal.version}')
+
+    def _read_entry(self, digest: str) -> Optional[Any]:
+        data_path = self._data_path(digest)
+        try:
+            with open(data_path, 'rb') as f:
+                payload = marshal.loads(zlib.decompress(f.read()))
+            os.utime(data_path)  # Mark as recently used
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            return None
+        return payload
+
+    def get(self, path: str) -> Optional[Any]:
+        """
+        Get the cached payload for a CHANGELOG file.
+
+        :param path: File system path of the CHANGELOG file.
+        :raises FileNotFoundError: If the CHANGELOG file does not exist.
+        :return: The cached payload, or None if the file is not cached.
+        """
+        stat_path = os.path.join(self._stat_dir, self._stat_key(path))
+        try:
+            with open(stat_path) as f:
+                payload = self._read_entry(f.read())
+            if payload is not None:
+                return payload
+        except OSError:
+            pass
+
+        # Fall back to the content hash, and remember the new stat key if the contents are cached
+        digest = file_digest(path)
+        payload = self._read_entry(digest)
+        if payload is not None:
+            self._write_pointer(stat_path, digest)
+        return payload
+
+    def put(self, path: str, payload: Any) -> None:
+        """
+        Cache the payload for a CHANGELOG file, evicting the least recently used entries if the cache is too large.
+
+        :param path: File system path of the CHANGELOG file.
+        :param payload: Parsed CHANGELOG data made of `marshal` supported types.
+        """
+        os.makedirs(self._data_dir, exist_ok=True)
+        digest = file_digest(path)
+        with atomic_write(self._data_path(digest)) as f:
+            f.write(zlib.compress(marshal.dumps(payload), 1))
+        self._write_pointer(os.path.join(self._stat_dir, self._stat_key(path)), digest)
+        self.evict()
+
+    def _write_pointer(self, stat_path: str, digest: str) -> None:
+        os.makedirs(self._stat_dir, exist_ok=True)
+        with atomic_write(stat_path) as f:
+            f.write(digest.encode('ascii'))
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache fits in `max_size`.
+        """
+        try:
+            entries = [e for e in os.scandir(self._data_dir) if e.is_file()]
+        except FileNotFoundError:
+            return
+        entries = sorted(((e.stat(), e.path) for e in entries), key=lambda e: e[0].st_mtime_ns)
+        total = sum(st.st_size for st, _ in entries)
+        evicted = False
+        for st, data_path in entries:
+            if total <= self.max_size:
+                break
+            os.unlink(data_path)
+            total -= st.st_size
+            evicted = True
+        if evicted:
+            self._remove_dangling_pointers()
+
+    def _remove_dangling_pointers(self) -> None:
+        """Remove stat keys that point at evicted entries."""
+        cached = set(os.listdir(self._data_dir))
+        for e in os.scandir(self._stat_dir):
+            try:
+                with open(e.path) as f:
+                    if os.path.basename(self._data_path(f.read())) not in cached:
+                        os.unlink(e.path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """
+        Remove every cached entry.
+        """
+        for directory in (self._stat_dir, self._data_dir):
+            if os.path.isdir(directory):
+                for e in os.scandir(directory):
+                    os.unlink(e.path)
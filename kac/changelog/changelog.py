@@ -1,64 +1,437 @@
-import re
+import mmap
+import time
+from array import array
+from bisect import bisect_right
 from collections import OrderedDict
-from datetime import date, datetime
+from datetime import date
+from typing import BinaryIO, Iterable, List, Optional, Tuple, Union
 
-import click
 from semver import VersionInfo
 
-from .release import Release, Unreleased
-from .util import rreplace
+from . import trace
+from .cache import ChangelogCache
+from .diff import Edit, count_lines, unified_diff
+from .exceptions import (ChangelogError, ChangelogNotFoundError, ChangelogParseError, InvalidDateError,
+                         InvalidVersionError, MissingUnreleasedError, relocate)
+from .index import ReleaseIndex
+from .links import FooterLinks
+from .parser import (ChangelogIndex, ReleaseSpan, ReleaseSpans, as_text, changed_range, find_footer, line_column,
+                     line_end, parse_date, read_head, scan, scan_releases, split_heading, split_headings)
+from .release import Release, ReleaseList, Unreleased
+from .util import atomic_write, rreplace
+from .version import (PackedVersion, coerce as coerce_version, format_version, next_version, next_versions,
+                      parse as parse_version, parse_versions, unpack as unpack_version)
+
+_COPY_CHUNK_SIZE = 1 << 20
+
+
+def _release_to_cache(release: Release) -> tuple:
+    return release.packed_version, release.release_date.toordinal(), release._change_lists()
+
+
+def _release_from_cache(data: tuple) -> Release:
+    version, release_date, changes = data
+    return Release(tuple(version), date.fromordinal(release_date), *changes)
+
+
+def _heading_from_cache(data: tuple) -> Tuple[PackedVersion, date]:
+    version, release_date, _ = data
+    return tuple(version), date.fromordinal(release_date)
+
+
+def _parse_heading(buf, span: ReleaseSpan, path: str = None,
+                   errors: List[ChangelogError] = None) -> Optional[Tuple[PackedVersion, date]]:
+    """
+    Parse the version and date of a single release block of a CHANGELOG buffer.
+
+    :param buf: The CHANGELOG text as `str`, `bytes` or an `mmap`.
+    :param span: Offsets of the release block.
+    :param path: File system path of the CHANGELOG file, for errors.
+    :param errors: List to collect errors in instead of raising them.
+    :raises InvalidVersionError: If the version is not a valid semver version, and `errors` is not given.
+    :raises InvalidDateError: If the date is not a valid date, and `errors` is not given.
+    :return: Tuple of packed version and release date, or None if an error was collected.
+    """
+    v, d = split_heading(buf[span.start:span.body_start])  # version, date
+    try:
+        version = parse_version(v)
+    except ValueError as e:
+        error = InvalidVersionError(str(e), path, line_column(buf, span.start)[0], len('## [') + 1)
+    else:
+        try:
+            return version, parse_date(d)
+        except ValueError as e:
+            error = InvalidDateError(str(e), path, line_column(buf, span.start)[0], len(f'## [{v}] - ') + 1)
+    if errors is None:
+        raise error
+    errors.append(error)
+    return None
+
+
+def _parse_headings(buf, spans: Iterable[ReleaseSpan], path: str = None) -> List[Tuple[PackedVersion, date]]:
+    """
+    Parse the versions and dates of many release blocks of a CHANGELOG buffer at once.
+
+    :param buf: The CHANGELOG text as `str`, `bytes` or an `mmap`.
+    :param spans: Offsets of the release blocks.
+    :param path: File system path of the CHANGELOG file, for errors.
+    :raises InvalidVersionError: If a version is not a valid semver version.
+    :raises InvalidDateError: If a date is not a valid date.
+    :return: List of (packed version, release date) tuples, in the same order as `spans`.
+    """
+    spans = list(spans)
+    headings = split_headings(buf, spans)
+    dates = {}  # Releases are often made on the same day, each date string is only parsed once
+    try:
+        versions = parse_versions([v for v, _ in headings])
+        release_dates = [dates.get(d) or dates.setdefault(d, parse_date(d)) for _, d in headings]
+    except ValueError:  # Parse the headings one at a time again, for the position of the error
+        return [_parse_heading(buf, span, path) for span in spans]
+    return list(zip(versions, release_dates))
+
+
+def _parse_changes(buf, start: int, end: int, path: str = None, errors: List[ChangelogError] = None,
+                   text: str = None) -> dict:
+    """
+    Parse the changes of a release or `Unreleased` section of a CHANGELOG buffer, with error positions relative to
+    the whole file.
+
+    :param buf: The CHANGELOG text as `str`, `bytes` or an `mmap`.
+    :param start: Start offset of the changes.
+    :param end: End offset of the changes.
+    :param path: File system path of the CHANGELOG file, for errors.
+    :param errors: List to collect errors in instead of raising them.
+    :param text: The changes between `start` and `end` as text, if already decoded.
+    :return: Dictionary of change types and changes.
+    """
+    collected = len(errors) if errors is not None else 0
+    try:
+        changes = Release.changes_to_dict(as_text(buf[start:end]) if text is None else text, errors)
+    except ChangelogParseError as e:
+        raise relocate(e, path, line_column(buf, start)[0])
+    if errors is not None and len(errors) > collected:
+        first_line, _ = line_column(buf, start)
+        for error in errors[collected:]:
+            relocate(error, path, first_line)
+    return changes
+
+
+def _parse_release(buf, span: ReleaseSpan, path: str = None, errors: List[ChangelogError] = None) -> Optional[Release]:
+    """
+    Parse a single release block of a CHANGELOG buffer.
+
+    :param buf: The CHANGELOG text as `str`, `bytes` or an `mmap`.
+    :param span: Offsets of the release block.
+    :param path: File system path of the CHANGELOG file, for errors.
+    :param errors: List to collect errors in instead of raising them.
+    :raises ChangelogParseError: If the release is invalid, and `errors` is not given.
+    :return: Release instance for the block, or None if an error was collected.
+    """
+    tracer = trace.active()
+    if tracer is not None:
+        started = time.perf_counter()
+    heading = _parse_heading(buf, span, path, errors)
+    if tracer is not None:
+        heading_parsed = time.perf_counter()
+        tracer.add('parse_heading', heading_parsed - started, releases=1)
+    text = as_text(buf[span.body_start:span.end])
+    changes = _parse_changes(buf, span.body_start, span.end, path, errors, text)
+    if tracer is not None:
+        tracer.add('parse_changes', time.perf_counter() - heading_parsed, bytes=span.end - span.body_start)
+    if heading is None:
+        return None
+    version, release_date = heading
+    release = Release(
+        **changes,
+        release_date=release_date,
+        version=version
+    )
+    release._adopt_text(text)  # Unless the source has to be rendered differently, it is served as it is
+    return release
 
 
 class Changelog:
     default_file_name: str = 'CHANGELOG.md'
+    BUMP_TYPES = ('major', 'minor', 'patch', 'prerelease', 'build')
+
+    _lookup: Optional[ReleaseIndex] = None
+    _links: Optional[FooterLinks] = None
+    _line_count: Optional[Tuple[ChangelogIndex, int]] = None  # Line breaks in the buffer, with the index they match
+    _lookup_revision: int = -1
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, lazy: bool = False, memory_map: bool = False):
         """
         :param path: The full file system path of the CHANGELOG file.
+        :param lazy: Only index release headings when loading, and parse each release on first access.
+        :param memory_map: Parse from a read-only memory map of the file instead of reading it into memory. Combined
+            with `lazy`, only the releases that are accessed are ever copied out of the file.
 
         Attributes:
             path        The full file system path of the CHANGELOG file.
             full_text   Original CHANGELOG file text.
             unreleased  Unreleased changes.
-            releases    List of Release objects for each published release in the CHANGELOG.
+            releases    ReleaseList of Release objects for each published release in the CHANGELOG.
         """
         self.path = path
+        self._lazy = lazy
+
+        with trace.span('load', path=path, lazy=lazy, memory_map=memory_map):
+            # Read full Changelog text, or map it into memory
+            try:
+                with trace.span('read') as event:
+                    self._buffer = self._map_file(path) if memory_map else self._read_file(path)
+                    event['args']['bytes'] = len(self._buffer)
+            except FileNotFoundError:
+                raise ChangelogNotFoundError(path=path) from None
+            self._load_buffer()
+
+    def _load_buffer(self) -> None:
+        """
+        Scan and parse the CHANGELOG buffer from scratch.
+        """
+        # Tokenize CHANGELOG header, body, and footer
+        with trace.span('scan', bytes=len(self._buffer)) as event:
+            index = scan(self._buffer)
+            event['args']['releases'] = 0 if index is None else len(index.releases)
+        if index is None:
+            self.close()
+            raise MissingUnreleasedError(path=self.path)
+
+        # Parse Unreleased section
+        with trace.span('parse_unreleased', bytes=index.unreleased_end - index.unreleased_body_start):
+            self.unreleased = Unreleased(**_parse_changes(self._buffer, index.unreleased_body_start,
+                                                          index.unreleased_end, self.path))
 
-        # Read full Changelog text
+        # Index releases from the body section, parsing them now unless lazy
+        self._index = index
+        self.releases = ReleaseList(index.releases, self._parse_release, self._parse_heading,  # newest to oldest
+                                    self._parse_headings)
+        self._synced_revision = self.releases.revision
+        self._lookup = None
+        self._links = None
+        if not self._lazy:
+            with trace.span('parse_releases', releases=len(self.releases)):
+                self.releases.materialize()
+
+    @classmethod
+    def load(cls, path: str, cache: ChangelogCache = None, lazy: bool = False,
+             memory_map: bool = False) -> 'Changelog':
+        """
+        Load a CHANGELOG file, using parsed releases from a cache when the file has not changed since it was cached.
+
+        :param path: The full file system path of the CHANGELOG file.
+        :param cache: ChangelogCache to look the file up in and store it to, the file is always parsed if omitted.
+        :param lazy: Only parse each release on first access when the file is not cached.
+        :param memory_map: Read the file text from a read-only memory map.
+        :return: Changelog instance for the file.
+        """
+        if cache is None:
+            return cls(path, lazy=lazy, memory_map=memory_map)
         try:
-            with click.open_file(self.path) as f:
-                self.full_text = f.read()
+            payload = cache.get(path)
         except FileNotFoundError:
-            click.echo('Invalid CHANGELOG file path.')
-            raise click.Abort
+            raise ChangelogNotFoundError(path=path) from None
 
-        # Parse CHANGELOG header, body, and footer
-        m_file = re.fullmatch(r'([\s\S]+\n)(## \[Unreleased][\s\S]+)(\[Unreleased]:[\s\S]+)', self.full_text)
-        if m_file is None:
-            click.echo('Unable to parse CHANGELOG, most likely due to a missing `Unreleased` section.')
-            raise click.Abort
-        self._header_text, self._body_text, self._footer_text = m_file.groups()  # type: str, str, str
+        if payload is None:
+            changelog = cls(path, lazy=False, memory_map=memory_map)
+            cache.put(path, changelog._to_cache_payload())
+            return changelog
 
-        # Parse Unreleased section
-        m_unreleased = re.match(r'## \[Unreleased]\n+((?:### \w+[\n\s]*(?:-[ \S]*[\s]+)*)*)', self._body_text)
-        self.unreleased = Unreleased(**Unreleased.changes_to_dict(m_unreleased.groups()[0].strip()))
-
-        # Parse releases from the body section
-        self.releases = []  # newest to oldest
-        m_releases = re.findall(r'(?:## \[([\S]+)] - ([\d-]+)\s*)((?:### \w+[\n\s]*(?:-[ \S]*[\s]+)*)*)?',
-                                self._body_text)
-        # Parse changes from each release
-        for v, d, c in m_releases:  # type: str, str, str # version, date, changes
-            c = c.strip()
-            self.releases.append(Release(
-                **Release.changes_to_dict(c),
-                release_date=datetime.strptime(d, '%Y-%m-%d').date(),
-                version=VersionInfo.parse(v)
-            ))
+        changelog = cls.__new__(cls)
+        changelog.path = path
+        changelog._lazy = lazy
+        changelog._buffer = cls._map_file(path) if memory_map else cls._read_file(path)
+        is_bytes, (unreleased_start, unreleased_body_start, footer_start, end, offsets), unreleased, releases = payload
+        if is_bytes == (not isinstance(changelog._buffer, str)) and end == len(changelog._buffer):
+            spans = ReleaseSpans()
+            spans._offsets.frombytes(offsets)
+            changelog._index = ChangelogIndex(unreleased_start, unreleased_body_start, footer_start, end, spans)
+        else:  # Offsets were cached for the other buffer type, re-scanning is cheap compared to parsing releases
+            changelog._index = scan(changelog._buffer)
+        changelog.unreleased = Unreleased(*unreleased)
+        cached_releases = dict(zip((span.start for span in changelog._index.releases), releases))
+        changelog.releases = ReleaseList(
+            changelog._index.releases,
+            lambda span: _release_from_cache(cached_releases[span.start]),
+            lambda span: _heading_from_cache(cached_releases[span.start]),
+        )
+        changelog._synced_revision = changelog.releases.revision
+        if not lazy:
+            changelog.releases.materialize()
+        return changelog
+
+    def _to_cache_payload(self) -> tuple:
+        """
+        Get the parsed CHANGELOG as plain data for a ChangelogCache.
+
+        :return: Tuple of buffer type, section offsets, unreleased changes and releases.
+        """
+        index = self._index
+        offsets = (index.unreleased_start, index.unreleased_body_start, index.footer_start, index.end,
+                   ReleaseSpans(index.releases)._offsets.tobytes())
+        unreleased = self.unreleased._change_lists()
+        releases = [_release_to_cache(r) for r in self.releases]
+        return not isinstance(self._buffer, str), offsets, unreleased, releases
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def __repr__(self):
         return f'<CHANGELOG v{self.latest_version}>'
 
+    @staticmethod
+    def _read_file(path: str) -> str:
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    @staticmethod
+    def _map_file(path: str) -> Union[mmap.mmap, bytes]:
+        with open(path, 'rb') as f:
+            try:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Empty files cannot be mapped
+                return b''
+
+    def _write_span(self, f: BinaryIO, start: int, end: int) -> None:
+        """
+        Copy a slice of the CHANGELOG file to a binary file, in bounded chunks when the file is memory mapped.
+
+        :param f: Binary file object to write to.
+        :param start: Start offset of the slice.
+        :param end: End offset of the slice.
+        """
+        if isinstance(self._buffer, str):
+            f.write(self._buffer[start:end].encode('utf-8'))
+            return
+        for pos in range(start, end, _COPY_CHUNK_SIZE):
+            f.write(self._buffer[pos:min(pos + _COPY_CHUNK_SIZE, end)])
+
+    def close(self) -> None:
+        """
+        Release the memory map of the CHANGELOG file, if there is one. Releases that have not been parsed yet can no
+        longer be accessed afterwards.
+        """
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def _text(self, start: int = 0, end: int = None) -> str:
+        """
+        Get a slice of the CHANGELOG file as text.
+
+        :param start: Start offset of the slice.
+        :param end: End offset of the slice, defaults to the end of the file.
+        :return: Text of the slice.
+        """
+        return as_text(self._buffer[start:end])
+
+    @property
+    def full_text(self) -> str:
+        return self._text()
+
+    def _parse_heading(self, span: ReleaseSpan) -> Tuple[PackedVersion, date]:
+        return _parse_heading(self._buffer, span, self.path)
+
+    def _parse_headings(self, spans: List[ReleaseSpan]) -> List[Tuple[PackedVersion, date]]:
+        return _parse_headings(self._buffer, spans, self.path)
+
+    def _parse_release(self, span: ReleaseSpan) -> Release:
+        return _parse_release(self._buffer, span, self.path)
+
+    @classmethod
+    def read_latest_release(cls, path: str) -> Optional[Release]:
+        """
+        Read only the latest release of a CHANGELOG file, stopping at the heading that follows it.
+
+        The rest of the release history and the footer are never read, so this takes the same time however long the
+        file is. The footer is not checked for an `[Unreleased]:` link either.
+
+        :param path: The full file system path of the CHANGELOG file.
+        :return: Release instance for the most recent release, or None if the CHANGELOG has no releases.
+        """
+        try:
+            with open(path, 'rb') as f, trace.span('read_head', path=path) as event:
+                buf, head = read_head(f)
+                event['args']['bytes'] = len(buf)
+        except FileNotFoundError:
+            raise ChangelogNotFoundError(path=path) from None
+        if head is None:
+            raise MissingUnreleasedError(path=path)
+        return None if head.latest is None else _parse_release(buf, head.latest, path)
+
+    @classmethod
+    def validate(cls, path: str) -> List[ChangelogError]:
+        """
+        Check a CHANGELOG file for every error at once, rather than stopping at the first one.
+
+        Errors are collected rather than raised, so that checking many files with many errors stays cheap.
+
+        :param path: The full file system path of the CHANGELOG file.
+        :return: List of errors, in file order. Empty if the CHANGELOG is valid.
+        """
+        try:
+            buf = cls._read_file(path)
+        except FileNotFoundError:
+            return [ChangelogNotFoundError(path=path)]
+        except UnicodeDecodeError as e:
+            return [ChangelogParseError(f'CHANGELOG is not valid UTF-8: {e.reason}', path)]
+        index = scan(buf)
+        if index is None:
+            return [MissingUnreleasedError(path=path)]
+
+        errors = []
+        _parse_changes(buf, index.unreleased_body_start, index.unreleased_end, path, errors)
+        for span in index.releases:
+            _parse_release(buf, span, path, errors)
+        return errors
+
+    @property
+    def _release_index(self) -> ReleaseIndex:
+        """
+        Lookup tables for `releases`, built on first use and rebuilt after releases are added or removed.
+        """
+        if self._lookup is None or self._lookup_revision != self.releases.revision:
+            self._lookup = ReleaseIndex(self.releases.all_headings())
+            self._lookup_revision = self.releases.revision
+        return self._lookup
+
+    def get_release(self, version: Union[str, VersionInfo]) -> Optional[Release]:
+        """
+        Get a release by version. Build metadata is ignored.
+
+        :param version: Version string (ie. `1.2.0` or `v1.2.0`) or VersionInfo of the release.
+        :return: Release instance, or None if the CHANGELOG has no release with the version.
+        """
+        position = self._release_index.position(coerce_version(version))
+        return None if position is None else self.releases[position]
+
+    def releases_between(self, lo: Union[str, VersionInfo, None] = None,
+                         hi: Union[str, VersionInfo, None] = None) -> List[Release]:
+        """
+        Get the releases with versions between `lo` and `hi`, inclusive, by semver precedence.
+
+        :param lo: Lowest version, or None for no lower bound.
+        :param hi: Highest version, or None for no upper bound.
+        :return: List of Release instances, newest to oldest.
+        """
+        positions = self._release_index.positions_between(
+            None if lo is None else coerce_version(lo),
+            None if hi is None else coerce_version(hi),
+        )
+        return [self.releases[position] for position in positions]
+
+    def releases_in_dates(self, start: date = None, end: date = None) -> List[Release]:
+        """
+        Get the releases that were released between `start` and `end`, inclusive.
+
+        :param start: First release date, or None for no lower bound.
+        :param end: Last release date, or None for no upper bound.
+        :return: List of Release instances, newest to oldest.
+        """
+        return [self.releases[position] for position in self._release_index.positions_in_dates(start, end)]
+
     @property
     def latest_version(self) -> VersionInfo:
         """
@@ -95,51 +468,102 @@ class Changelog:
         :param build_token: String to identify build versions, defaults to `build`.
         :return: OrderedDict of possible new Changelog versions.
         """
-        versions = (
-            self.latest_version.bump_patch(),
-            self.latest_version.bump_minor(),
-            self.latest_version.bump_major(),
-            self.latest_version.bump_prerelease(prerelease_token),
-            self.latest_version.bump_build(build_token),
-            self.latest_version.bump_prerelease(prerelease_token).bump_build(build_token),
-        )
-        return OrderedDict({f'v{v}': v for v in versions})
+        # All candidates are worked out on the packed version, only the results are turned into VersionInfo objects
+        versions = next_versions(self.latest_release.packed_version, prerelease_token, build_token)
+        return OrderedDict((f'v{format_version(v)}', unpack_version(v)) for v in versions)
+
+    def get_next_version(self, bump_type: str, prerelease_token='rc', build_token='build') -> VersionInfo:
+        """
+        Get the next Changelog version for a version part.
+
+        :param bump_type: The version part to be bumped, one of `BUMP_TYPES`.
+        :param prerelease_token: String to identify prerelease versions, defaults to `rc`.
+        :param build_token: String to identify build versions, defaults to `build`.
+        :return: VersionInfo instance of the next version.
+        """
+        return unpack_version(next_version(self.latest_release.packed_version, bump_type, prerelease_token,
+                                           build_token))
+
+    def _bump_edits(self, version: VersionInfo, today: date) -> List[Edit]:
+        """
+        Get the edits that bump the CHANGELOG file to a version.
+
+        The new release heading is inserted below the `## [Unreleased]` heading, and the `[Unreleased]:` link line,
+        which always starts the footer, is rewritten with a compare link added below it.
+
+        :param version: The version which the CHANGELOG file should be bumped to.
+        :param today: Date of the new release.
+        :raises ChangelogParseError: If the `[Unreleased]:` link has no URL to derive compare links from.
+        :return: List of edits, by offsets within the file.
+        """
+        latest_version = format_version(self.latest_release.packed_version)
+        index = self._index
+        footer_started = time.perf_counter()
+        unreleased_link_end = line_end(self._buffer, index.footer_start)
+        unreleased_link = self._text(index.footer_start, unreleased_link_end).rstrip('\r\n')
+        try:  # Only the `[Unreleased]:` link is needed, the links of the footer are left as they are until written
+            new_diff_url = FooterLinks.parse(unreleased_link).add_release(f'{version}', latest_version)
+        except ChangelogParseError as e:
+            raise relocate(e, self.path, line_column(self._buffer, index.footer_start)[0])
+        new_unreleased_link = rreplace(s=unreleased_link, old=f'v{latest_version}', new=f'v{version}', occurrence=1)
+        tracer = trace.active()
+        if tracer is not None:
+            tracer.add('footer', time.perf_counter() - footer_started)
+        return [
+            (index.unreleased_body_start, index.unreleased_body_start, f'\n## [{version}] - {today}\n'),
+            (index.footer_start, unreleased_link_end, f'{new_unreleased_link}\n{new_diff_url}\n'),
+        ]
+
+    def bump_diff(self, version: VersionInfo, context: int = 3) -> str:
+        """
+        Get the unified diff that bumping the CHANGELOG to a version would make, without changing the file.
+
+        :param version: The version which the CHANGELOG file would be bumped to.
+        :param context: Number of unchanged lines shown around each change.
+        :raises ChangelogParseError: If the `[Unreleased]:` link has no URL to derive compare links from.
+        :return: The diff.
+        """
+        if self._line_count is None or self._line_count[0] is not self._index:
+            self._line_count = (self._index, count_lines(self._buffer))
+        return unified_diff(self._buffer, self._bump_edits(version, date.today()), self.path, self.path, context,
+                            self._line_count[1])
 
+    @trace.traced('bump')
     def bump(self, version: VersionInfo) -> None:
         """
         Bump the CHANGELOG to the specified version. Write the new CHANGELOG file text.
 
+        Only the new release heading and the `[Unreleased]` footer links are generated, the rest of the file is
+        copied across unchanged. The file is replaced atomically, so it is never left partially written.
+
         :param version: The version which the CHANGELOG file should be bumped to.
         """
-        unreleased_url_re_pattern: str = r'\[Unreleased\]:'
-        version_diff_pattern: str = '[{new_version}]: {base_url}/{current_version}...{new_version_end}'
-
         today = date.today()
-        with click.open_file(self.path, mode='w') as f:
-            f.write(self._header_text)
-            new_body = self._body_text.replace('## [Unreleased]\n', f'## [Unreleased]\n\n## [{version}] -'
-                                                                    f' {today}\n')
-            f.write(new_body)
-            unreleased_url_pattern = re.compile(unreleased_url_re_pattern)
-            for idx, line in enumerate(self._footer_text.splitlines(keepends=False)):
-                if unreleased_url_pattern.match(line):
-                    new_line = rreplace(
-                        s=line,
-                        old=f'v{self.latest_version}',
-                        new=f'v{version}',
-                        occurrence=1
-                    )
-                    f.write(f'{new_line}\n')
-                    new_diff_url = version_diff_pattern.format(
-                        new_version=f'{version}',
-                        new_version_end=f'v{version}',
-                        current_version=f'v{self.latest_version}',
-                        base_url=re.search("(?P<url>https?://[^\\s]+)", line).group("url").rsplit('/', 1)[0]
-                    )
-                    f.write(f'{new_diff_url}')
-                elif line.strip():
-                    f.write(f'{line}')
-                f.write('\n')
+        index = self._index
+        previous_version = format_version(self.latest_release.packed_version)
+        edits = self._bump_edits(version, today)
+
+        memory_map = isinstance(self._buffer, mmap.mmap)
+        with trace.span('write') as event, atomic_write(self.path) as f:
+            pos = 0
+            for start, end, text in edits:
+                self._write_span(f, pos, start)
+                f.write(text.encode('utf-8'))
+                pos = end
+            self._write_span(f, pos, index.end)
+            event['args']['bytes'] = f.tell()
+            self.close()  # The mapped file is about to be replaced
+
+        # Footer links that were already indexed are only updated once the file is written, to keep matching it
+        if self._links is not None:
+            self._links.add_release(f'{version}', previous_version)
+
+        if self.releases.revision != self._synced_revision:
+            # Releases were added or removed in memory only, so they no longer match the offsets of the file: parse the
+            # new file text from scratch instead of re-indexing it
+            self._buffer = self._map_file(self.path) if memory_map else self._read_file(self.path)
+            self._load_buffer()
+            return
 
         # Update self with new release and empty unreleased section
         self.releases.insert(0, Release(
@@ -153,3 +577,130 @@ class Changelog:
             self.unreleased.security
         ))
         self.unreleased = Unreleased()
+
+        # Re-index the new file text, keeping releases that were already parsed
+        with trace.span('rescan') as event:
+            self._buffer = self._map_file(self.path) if memory_map else self._read_file(self.path)
+            self._index = scan(self._buffer)
+            self.releases.reindex(self._index.releases)
+            event['args'].update(bytes=len(self._buffer), releases=len(self.releases))
+        self._synced_revision = self.releases.revision
+
+    @property
+    def links(self) -> FooterLinks:
+        """
+        Index of the footer links, by label. Parsed on first access, and kept up to date by `bump`.
+        """
+        if self._links is None:
+            with trace.span('parse_links', bytes=self._index.end - self._index.footer_start):
+                self._links = FooterLinks.parse(self._text(self._index.footer_start))
+        return self._links
+
+    def _versions(self) -> List[str]:
+        return [format_version(version) for version, _ in self.releases.all_headings()]
+
+    def validate_links(self) -> List[ChangelogError]:
+        """
+        Check that every release has a footer link comparing it with the previous release, in a single pass.
+
+        :return: List of InvalidLinkError, in release order. Empty if every link is correct.
+        """
+        first_line = line_column(self._buffer, self._index.footer_start)[0]
+        return [relocate(error, self.path, first_line) for error in self.links.validate(self._versions())]
+
+    def regenerate_links(self) -> None:
+        """
+        Rewrite the footer with every compare link derived from the `[Unreleased]:` link again, in release order. Links
+        that do not belong to a release are kept, other footer lines are dropped. Write the new CHANGELOG file text.
+
+        :raises ChangelogParseError: If the `[Unreleased]:` link has no URL to derive compare links from.
+        """
+        try:
+            footer = self.links.regenerate(self._versions())
+        except ChangelogParseError as e:
+            raise relocate(e, self.path, line_column(self._buffer, self._index.footer_start)[0])
+        memory_map = isinstance(self._buffer, mmap.mmap)
+        with trace.span('write') as event, atomic_write(self.path) as f:
+            self._write_span(f, 0, self._index.footer_start)
+            f.write(footer.encode('utf-8'))
+            event['args']['bytes'] = f.tell()
+            self.close()  # The mapped file is about to be replaced
+        self._buffer = self._map_file(self.path) if memory_map else self._read_file(self.path)
+        self._load_buffer()
+
+    @trace.traced('refresh')
+    def refresh(self) -> bool:
+        """
+        Update the Changelog after its file was edited, re-parsing only the sections that changed.
+
+        The new file text is compared to the old one to find the changed range. Only the `Unreleased` section and the
+        releases that overlap it are scanned and parsed again, every other release is kept as it is. Edits to the
+        header or footer, releases added or removed in memory, and memory mapped files are loaded from scratch.
+
+        :raises ChangelogError: If the new file text is invalid, the Changelog is left unchanged.
+        :return: Whether the file text changed.
+        """
+        if not isinstance(self._buffer, str):  # A mapped file may have been truncated under the map
+            self.close()
+            self._buffer = self._map_file(self.path)
+            self._load_buffer()
+            return True
+
+        try:
+            new = self._read_file(self.path)
+        except FileNotFoundError:
+            raise ChangelogNotFoundError(path=self.path) from None
+        old = self._buffer
+        if new == old:
+            return False
+        state = self.__dict__.copy()
+        try:
+            self._buffer = new
+            if self.releases.revision != self._synced_revision or not self._splice(old):
+                self._load_buffer()
+        except BaseException:
+            self.__dict__.clear()
+            self.__dict__.update(state)
+            raise
+        return True
+
+    def _splice(self, old: str) -> bool:
+        """
+        Re-scan and re-parse only the part of the new buffer that differs from the old one.
+
+        :param old: The previous buffer.
+        :return: False if the change is not confined to the `Unreleased` section and release blocks.
+        """
+        new = self._buffer
+        index = self._index
+        start, old_end, new_end = changed_range(old, new)
+        delta = new_end - old_end
+        if start <= index.unreleased_body_start or old_end >= index.footer_start:
+            return False
+
+        # Re-scan from the last block that starts before the change, far enough before it that its `## [` marker and
+        # the newline before it are untouched, up to the first block that starts after the change.
+        offsets = index.releases._offsets
+        starts = offsets[::3]
+        first = bisect_right(starts, start - len('## [')) - 1
+        window_start = index.unreleased_body_start if first == -1 else starts[first]
+        first = max(first, 0)
+        last = bisect_right(starts, old_end)
+        window_end = (starts[last] if last < len(starts) else index.footer_start) + delta
+        if find_footer(new, window_start, window_end) != -1:  # A new `[Unreleased]:` line moves the footer
+            return False
+        window = scan_releases(new, window_start, window_end)
+
+        spans = ReleaseSpans()
+        spans._offsets = offsets[:first * 3] + window + array('q', [offset + delta for offset in offsets[last * 3:]])
+        window_spans = [ReleaseSpan(*window[i:i + 3]) for i in range(0, len(window), 3)]
+        items = [None if self._lazy else _parse_release(new, span, self.path) for span in window_spans]
+        self._index = ChangelogIndex(index.unreleased_start, index.unreleased_body_start, index.footer_start + delta,
+                                     len(new), spans)
+        # The `Unreleased` section runs up to the first release, which may have lost its release heading
+        if window_start == index.unreleased_body_start or self._index.unreleased_end != index.unreleased_end:
+            self.unreleased = Unreleased(**_parse_changes(new, index.unreleased_body_start, self._index.unreleased_end,
+                                                          self.path))
+        self.releases.splice(first, last, items, spans)
+        self._synced_revision = self.releases.revision
+        return True
@@ -0,0 +1,123 @@
+"""
+Unified diffs of edits to a CHANGELOG file, before they are written.
+
+The edits kac makes, ie. a bump, only touch a few lines of a file. Only the lines around each edit are compared, so
+the diff of an edit to a large file costs about as much as the diff of an edit to a small one.
+"""
+import re
+from typing import Iterable, List, Tuple
+
+from .parser import as_text
+
+# Replacement of the slice of a buffer between two offsets with a text: (start, end, text)
+Edit = Tuple[int, int, str]
+
+_HUNK_RE = re.compile(r'^@@ -(\d+)(,\d+)? \+(\d+)(,\d+)? @@')
+
+_COUNT_CHUNK_SIZE = 1 << 20
+
+
+def count_lines(buf, start: int = 0, end: int = None) -> int:
+    """
+    Count the line breaks in a slice of a buffer. Memory mapped files are counted in bounded chunks rather than copied
+    whole.
+
+    :param buf: Text, bytes or memory mapped file.
+    :param start: Start offset of the slice.
+    :param end: End offset of the slice, defaults to the end of the buffer.
+    :return: Number of line breaks.
+    """
+    end = len(buf) if end is None else end
+    newline = '\n' if isinstance(buf, str) else b'\n'
+    if isinstance(buf, (str, bytes)):
+        return buf.count(newline, start, end)
+    return sum(buf[pos:min(pos + _COUNT_CHUNK_SIZE, end)].count(newline)
+               for pos in range(start, end, _COUNT_CHUNK_SIZE))
+
+
+def _window(buf, start: int, end: int, context: int) -> Tuple[int, int]:
+    """Get the offsets of the whole lines around a slice, with `context` more lines on either side."""
+    newline = '\n' if isinstance(buf, str) else b'\n'
+    window_start = buf.rfind(newline, 0, start) + 1
+    for _ in range(context):
+        if window_start == 0:
+            break
+        window_start = buf.rfind(newline, 0, window_start - 1) + 1
+    window_end = end
+    if end > 0 and buf[end - 1:end] != newline:  # Finish the last line of the slice
+        window_end = buf.find(newline, end)
+        window_end = len(buf) if window_end == -1 else window_end + 1
+    for _ in range(context):
+        if window_end >= len(buf):
+            break
+        window_end = buf.find(newline, window_end)
+        window_end = len(buf) if window_end == -1 else window_end + 1
+    return window_start, window_end
+
+
+def _split_lines(text: str) -> List[str]:
+    """Split text into lines at line feeds only, the way the file is scanned, keeping the line breaks."""
+    lines = [line + '\n' for line in text.split('\n')]
+    lines[-1] = lines[-1][:-1]
+    return lines if lines[-1] else lines[:-1]
+
+
+def unified_diff(buf, edits: Iterable[Edit], fromfile: str = '', tofile: str = '', context: int = 3,
+                 line_count: int = None) -> str:
+    """
+    Get the unified diff of applying edits to a buffer, as `diff -u` would print it.
+
+    :param buf: The text, bytes or memory mapped file that is edited.
+    :param edits: Edits that do not overlap, by offsets within the buffer.
+    :param fromfile: Name of the file before the edits.
+    :param tofile: Name of the file after the edits.
+    :param context: Number of unchanged lines shown around each change.
+    :param line_count: Number of line breaks in the buffer, if known. Line numbers near the end of the buffer are then
+        counted from the end, ie. for edits to the footer of a long file.
+    :return: The diff, or an empty string if the edits change nothing.
+    """
+    import difflib
+
+    edits = sorted(edits)
+    # Group edits whose surrounding lines overlap into windows, which are compared as a whole
+    windows: List[Tuple[int, int, List[Edit]]] = []
+    for edit in edits:
+        start, end = _window(buf, edit[0], edit[1], context)
+        if windows and start <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], max(end, windows[-1][1]), windows[-1][2] + [edit])
+        else:
+            windows.append((start, end, [edit]))
+
+    lines = []
+    first_line, offset = 0, 0  # Line number of the last counted offset
+    delta = 0  # Lines added so far, which shifts the line numbers of the new file
+    for window_start, window_end, window_edits in windows:
+        old = as_text(buf[window_start:window_end])
+        pieces = []
+        pos = window_start
+        for start, end, text in window_edits:
+            pieces.append(as_text(buf[pos:start]))
+            pieces.append(text)
+            pos = end
+        pieces.append(as_text(buf[pos:window_end]))
+        old_lines, new_lines = _split_lines(old), _split_lines(''.join(pieces))
+
+        if line_count is not None and len(buf) - window_start < window_start - offset:
+            first_line = line_count - count_lines(buf, window_start)
+        else:
+            first_line += count_lines(buf, offset, window_start)
+        offset = window_start
+        for line in list(difflib.unified_diff(old_lines, new_lines, n=context))[2:]:
+            match = _HUNK_RE.match(line)
+            if match is not None:
+                old_start, old_len, new_start, new_len = match.groups()
+                line = f'@@ -{int(old_start) + first_line}{old_len or ""} ' \
+                       f'+{int(new_start) + first_line + delta}{new_len or ""} @@\n'
+            elif not line.endswith('\n'):
+                line += '\n\\ No newline at end of file\n'
+            lines.append(line)
+        delta += len(new_lines) - len(old_lines)
+
+    if not lines:
+        return ''
+    return f'--- {fromfile}\n+++ {tofile}\n' + ''.join(lines)
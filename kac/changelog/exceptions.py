@@ -0,0 +1,79 @@
+from typing import Optional
+
+
+class ChangelogError(Exception):
+    """
+    Base class for errors in CHANGELOG files.
+
+    Attributes:
+        message  Description of the error.
+        path     File system path of the CHANGELOG file, if known.
+        line     1-based line number of the error, if known.
+        column   1-based column of the error, if known. Counted in bytes for memory mapped files.
+    """
+
+    def __init__(self, message: str, path: str = None, line: int = None, column: int = None):
+        super().__init__(message)
+        self.message = message
+        self.path = path
+        self.line = line
+        self.column = column
+
+    def __str__(self):
+        if self.line is None:
+            return self.message
+        return f'{self.message} (line {self.line}, column {self.column})'
+
+    def __reduce__(self):
+        return self.__class__, (self.message, self.path, self.line, self.column)
+
+
+class ChangelogNotFoundError(ChangelogError):
+    """The CHANGELOG file does not exist."""
+
+    def __init__(self, message: str = 'Invalid CHANGELOG file path.', path: str = None, line: int = None,
+                 column: int = None):
+        super().__init__(message, path, line, column)
+
+
+class ChangelogParseError(ChangelogError, ValueError):
+    """The CHANGELOG file does not follow the Keep a Changelog format."""
+
+
+class MissingUnreleasedError(ChangelogParseError):
+    """The CHANGELOG file has no `## [Unreleased]` heading, or no `[Unreleased]:` footer link."""
+
+    def __init__(self, message: str = 'Unable to parse CHANGELOG, most likely due to a missing `Unreleased` section.',
+                 path: str = None, line: int = None, column: int = None):
+        super().__init__(message, path, line, column)
+
+
+class InvalidChangeTypeError(ChangelogParseError):
+    """A `### ` heading is not one of the Keep a Changelog change types."""
+
+
+class InvalidVersionError(ChangelogParseError):
+    """A release heading's version is not a valid semver version."""
+
+
+class InvalidDateError(ChangelogParseError):
+    """A release heading's date is not a valid `YYYY-MM-DD` date."""
+
+
+class InvalidLinkError(ChangelogParseError):
+    """A footer link of a release is missing, or does not compare it with the previous release."""
+
+
+def relocate(error: ChangelogError, path: Optional[str], first_line: int = 1) -> ChangelogError:
+    """
+    Make the position of an error found in a slice of a CHANGELOG file relative to the whole file.
+
+    :param error: Error with a line number relative to the slice.
+    :param path: File system path of the CHANGELOG file.
+    :param first_line: Line number of the first line of the slice in the whole file.
+    :return: The same error, updated in place.
+    """
+    error.path = path
+    if error.line is not None:
+        error.line += first_line - 1
+    return error
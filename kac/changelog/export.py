@@ -0,0 +1,135 @@
+"""
+Streaming export of CHANGELOG releases, as JSON Lines records or as columnar batches.
+
+Files are memory mapped and each release is parsed, exported and dropped in turn, so memory use does not grow with the
+length of the release history.
+"""
+import json
+from array import array
+from datetime import date
+from typing import Dict, Iterable, Iterator, TextIO
+
+from .changelog import Changelog
+from .release import Release
+from .version import format_version
+
+COLUMNS = ('path', 'version', 'major', 'minor', 'patch', 'prerelease', 'build', 'date', 'change_type', 'entry')
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def iter_releases(path: str) -> Iterator[Release]:
+    """
+    Iterate over the releases of a CHANGELOG file, newest to oldest, parsing one release at a time.
+
+    Releases are not kept once they have been yielded, so holding on to them is up to the caller.
+
+    :param path: File system path of the CHANGELOG file.
+    :return: Iterator of Release instances.
+    """
+    changelog = Changelog(path, lazy=True, memory_map=True)
+    try:
+        for span in changelog._index.releases:
+            yield changelog._parse_release(span)
+    finally:
+        changelog.close()
+
+
+def release_to_dict(release: Release) -> dict:
+    """
+    Get a JSON serializable record of a release.
+
+    :param release: Release to convert.
+    :return: Dictionary with the version string and parts, ISO release date, and entries by change type.
+    """
+    major, minor, patch, prerelease, build = release.packed_version
+    return {
+        'version': format_version(release.packed_version),
+        'major': major,
+        'minor': minor,
+        'patch': patch,
+        'prerelease': prerelease,
+        'build': build,
+        'date': release.release_date.isoformat(),
+        'changes': release.changes,
+    }
+
+
+def iter_records(paths: Iterable[str]) -> Iterator[dict]:
+    """
+    Iterate over the release records of many CHANGELOG files.
+
+    :param paths: File system paths of the CHANGELOG files.
+    :return: Iterator of `release_to_dict` records, with the path of the CHANGELOG file added.
+    """
+    for path in paths:
+        for release in iter_releases(path):
+            record = release_to_dict(release)
+            record['path'] = path
+            yield record
+
+
+def write_jsonl(paths: Iterable[str], f: TextIO) -> int:
+    """
+    Write the releases of many CHANGELOG files as JSON Lines, one release per line.
+
+    :param paths: File system paths of the CHANGELOG files.
+    :param f: Text file object to write to.
+    :return: Number of releases written.
+    """
+    count = 0
+    for record in iter_records(paths):
+        f.write(json.dumps(record) + '\n')
+        count += 1
+    return count
+
+
+def _new_batch() -> Dict[str, list]:
+    batch = {name: [] for name in COLUMNS}
+    for name in ('major', 'minor', 'patch'):
+        batch[name] = array('q')
+    batch['date'] = array('i')
+    return batch
+
+
+def iter_batches(paths: Iterable[str], batch_size: int = 65536) -> Iterator[Dict[str, list]]:
+    """
+    Iterate over the change entries of many CHANGELOG files in columnar batches, one row per entry.
+
+    Version parts are `array('q')` columns and dates are `array('i')` columns of days since 1970-01-01 (the Arrow
+    `date32` layout), so they can be wrapped by `numpy.frombuffer` or `pyarrow.py_buffer` without copying. The other
+    columns are lists of strings, with None for missing prerelease and build identifiers. Releases without entries get
+    a single row with a None change type and entry.
+
+    :param paths: File system paths of the CHANGELOG files.
+    :param batch_size: Maximum number of rows per batch.
+    :return: Iterator of dictionaries mapping each of `COLUMNS` to a column of equal length.
+    """
+    if batch_size < 1:
+        raise ValueError('batch_size must be at least 1')
+    batch = _new_batch()
+    rows = 0
+    for path in paths:
+        for release in iter_releases(path):
+            packed = release.packed_version
+            version = format_version(packed)
+            days = release.release_date.toordinal() - _EPOCH_ORDINAL
+            entries = [(t, e) for t, changes in release.changes.items() for e in changes] or [(None, None)]
+            for change_type, entry in entries:
+                batch['path'].append(path)
+                batch['version'].append(version)
+                batch['major'].append(packed[0])
+                batch['minor'].append(packed[1])
+                batch['patch'].append(packed[2])
+                batch['prerelease'].append(packed[3])
+                batch['build'].append(packed[4])
+                batch['date'].append(days)
+                batch['change_type'].append(change_type)
+                batch['entry'].append(entry)
+                rows += 1
+                if rows == batch_size:
+                    yield batch
+                    batch = _new_batch()
+                    rows = 0
+    if rows:
+        yield batch
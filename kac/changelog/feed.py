@@ -0,0 +1,88 @@
+"""
+Combined release timeline of many CHANGELOG files, newest first.
+
+The releases of each file are already ordered newest to oldest, so the files are merged as sorted streams with
+`heapq.merge`. Only release headings are parsed while merging, and a release is only parsed in full once it makes it
+into the feed. The merge stops at the first release older than the cutoff date, or once the limit is reached, so the
+work done depends on the size of the feed rather than on the length of each file's history.
+"""
+import heapq
+from datetime import date
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .changelog import Changelog
+from .release import Release
+
+
+class FeedItem(NamedTuple):
+    """A release in the feed, with the CHANGELOG file it is from."""
+    path: str
+    release: Release
+
+    @property
+    def release_date(self) -> date:
+        return self.release.release_date
+
+
+def _iter_headings(changelog: Changelog, file_idx: int) -> Iterator[Tuple[date, int, int]]:
+    """Iterate over (date, file index, release index) of each release of a file, newest to oldest."""
+    for idx, (_, release_date) in enumerate(changelog.releases.headings()):
+        yield release_date, file_idx, idx
+
+
+def iter_feed(paths: Iterable[str], since: date = None, until: date = None, limit: int = None) -> Iterator[FeedItem]:
+    """
+    Iterate over the releases of many CHANGELOG files, newest first. Releases of the same date keep the order of
+    `paths`, and then the order of their file.
+
+    Each file is expected to list its releases newest to oldest, as Keep a Changelog does.
+
+    :param paths: File system paths of the CHANGELOG files.
+    :param since: Stop at the first release older than this date.
+    :param until: Skip releases newer than this date.
+    :param limit: Stop after this many releases.
+    :raises ChangelogError: If a CHANGELOG file cannot be found or scanned.
+    :return: Iterator of FeedItem.
+    """
+    changelogs: List[Changelog] = []
+    try:
+        for path in paths:
+            changelogs.append(Changelog(path, lazy=True, memory_map=True))
+        merged = heapq.merge(*(_iter_headings(c, i) for i, c in enumerate(changelogs)),
+                             key=lambda heading: heading[0], reverse=True)
+        items = (
+            FeedItem(changelogs[file_idx].path, changelogs[file_idx].releases[idx])
+            for _, file_idx, idx in _until(_since(merged, since), until)
+        )
+        yield from items if limit is None else islice(items, limit)
+    finally:
+        for changelog in changelogs:
+            changelog.close()
+
+
+def _since(headings: Iterator[tuple], since: Optional[date]) -> Iterator[tuple]:
+    for heading in headings:
+        if since is not None and heading[0] < since:  # Every remaining release is older
+            return
+        yield heading
+
+
+def _until(headings: Iterator[tuple], until: Optional[date]) -> Iterator[tuple]:
+    for heading in headings:
+        if until is None or heading[0] <= until:
+            yield heading
+
+
+def feed(paths: Iterable[str], since: date = None, until: date = None, limit: int = None) -> List[FeedItem]:
+    """
+    Get the releases of many CHANGELOG files, newest first.
+
+    :param paths: File system paths of the CHANGELOG files.
+    :param since: Leave out releases older than this date.
+    :param until: Leave out releases newer than this date.
+    :param limit: Maximum number of releases.
+    :raises ChangelogError: If a CHANGELOG file cannot be found or scanned.
+    :return: List of FeedItem.
+    """
+    return list(iter_feed(paths, since, until, limit))
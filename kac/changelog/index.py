@@ -0,0 +1,68 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+from .version import PackedVersion, precedence_key
+
+
+class ReleaseIndex:
+    """
+    Lookup tables for the releases of a Changelog, built once from each release's version and date.
+
+    Positions refer to the Changelog's newest to oldest `releases` list. Versions are looked up in a hash table, and
+    version and date ranges are found by bisecting sorted keys.
+    """
+
+    def __init__(self, headings: Iterable[Tuple[PackedVersion, date]]):
+        """
+        :param headings: Packed version and release date of each release, newest to oldest.
+        """
+        self._positions = {}  # (major, minor, patch, prerelease) => position
+        by_version = []
+        by_date = []
+        for position, (version, release_date) in enumerate(headings):
+            self._positions.setdefault(version[:4], position)
+            by_version.append((precedence_key(version), position))
+            by_date.append((release_date.toordinal(), position))
+        by_version.sort()
+        by_date.sort()
+        self._version_keys = [key for key, _ in by_version]
+        self._version_positions = [position for _, position in by_version]
+        self._date_keys = [key for key, _ in by_date]
+        self._date_positions = [position for _, position in by_date]
+
+    def __len__(self):
+        return len(self._version_keys)
+
+    def position(self, version: PackedVersion) -> Optional[int]:
+        """
+        Get the position of a release by version. Build metadata is ignored.
+
+        :param version: Packed version tuple.
+        :return: Position of the newest release with the version, or None if there is none.
+        """
+        return self._positions.get(tuple(version[:4]))
+
+    def positions_between(self, lo: Optional[PackedVersion], hi: Optional[PackedVersion]) -> List[int]:
+        """
+        Get the positions of releases with versions in an inclusive range.
+
+        :param lo: Lowest version of the range, or None for no lower bound.
+        :param hi: Highest version of the range, or None for no upper bound.
+        :return: Sorted list of positions, ie. newest to oldest.
+        """
+        start = 0 if lo is None else bisect_left(self._version_keys, precedence_key(lo))
+        end = len(self._version_keys) if hi is None else bisect_right(self._version_keys, precedence_key(hi))
+        return sorted(self._version_positions[start:end])
+
+    def positions_in_dates(self, start: Optional[date], end: Optional[date]) -> List[int]:
+        """
+        Get the positions of releases with release dates in an inclusive range.
+
+        :param start: First date of the range, or None for no lower bound.
+        :param end: Last date of the range, or None for no upper bound.
+        :return: Sorted list of positions, ie. newest to oldest.
+        """
+        lo = 0 if start is None else bisect_left(self._date_keys, start.toordinal())
+        hi = len(self._date_keys) if end is None else bisect_right(self._date_keys, end.toordinal())
+        return sorted(self._date_positions[lo:hi])
@@ -0,0 +1,199 @@
+"""
+Link reference definitions of a CHANGELOG footer, ie. `[0.3.0]: https://github.com/atwalsh/kac/compare/v0.2.3...v0.3.0`.
+"""
+import re
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from .exceptions import ChangelogParseError, InvalidLinkError
+
+UNRELEASED = 'Unreleased'
+
+# `[label]: url` lines, the label of a release is its version
+_LINK_RE = re.compile(r'^\[(?P<label>[^\]\r\n]+)\]:[ \t]*(?P<url>\S*)', re.MULTILINE)
+_URL_RE = re.compile(r'https?://\S+')
+
+
+def split_compare_url(url: str) -> Tuple[Optional[str], str]:
+    """
+    Split the URL of the `[Unreleased]:` link into its compare base URL and the branch it compares against.
+
+    :param url: The URL, ie. `https://github.com/atwalsh/kac/compare/v0.3.0...master`.
+    :return: Tuple of the compare base URL, ie. `https://github.com/atwalsh/kac/compare`, or None if the link has no
+        URL, and the branch, ie. `master`, defaulting to `HEAD`.
+    """
+    match = _URL_RE.search(url)
+    if match is None:
+        return None, 'HEAD'
+    base, _, comparison = match.group().rpartition('/')
+    _, dots, head = comparison.partition('...')
+    return base, head if dots and head else 'HEAD'
+
+
+class FooterLinks:
+    """
+    Index of the link reference definitions of a CHANGELOG footer, by label.
+
+    The compare base URL is extracted from the `[Unreleased]:` link once, and every compare link is derived from it.
+    """
+
+    def __init__(self, links: 'OrderedDict[str, str]' = None, lines: 'OrderedDict[str, int]' = None):
+        """
+        Use `FooterLinks.parse` rather than creating instances directly.
+
+        :param links: URL of each label, in file order.
+        :param lines: 0-based line of each label within the footer.
+        """
+        self._links = links if links is not None else OrderedDict()
+        self._lines = lines if lines is not None else OrderedDict()
+        self.compare_base, self.head = split_compare_url(self._links.get(UNRELEASED, ''))
+
+    def __repr__(self):
+        return f'<FooterLinks of {len(self)} links>'
+
+    def __len__(self):
+        return len(self._links)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._links)
+
+    def __contains__(self, label):
+        return label in self._links
+
+    def __getitem__(self, label: str) -> str:
+        return self._links[label]
+
+    def get(self, label: str, default: str = None) -> Optional[str]:
+        return self._links.get(label, default)
+
+    def items(self):
+        return self._links.items()
+
+    @classmethod
+    def parse(cls, text: str) -> 'FooterLinks':
+        """
+        Parse the link reference definitions of a CHANGELOG footer in a single pass. Lines that are not link reference
+        definitions are skipped, and the first definition of a label wins.
+
+        :param text: The footer text, starting with the `[Unreleased]:` line.
+        :return: FooterLinks of the footer.
+        """
+        links = OrderedDict()
+        lines = OrderedDict()
+        line = 0
+        pos = 0
+        for match in _LINK_RE.finditer(text):
+            label = match.group('label')
+            if label in links:
+                continue
+            line += text.count('\n', pos, match.start())
+            pos = match.start()
+            links[label] = match.group('url')
+            lines[label] = line
+        return cls(links, lines)
+
+    def line_of(self, label: str) -> Optional[int]:
+        """
+        Get the line of a label's link within the footer.
+
+        :param label: The link label.
+        :return: 0-based line, or None if the label was added after parsing or is missing.
+        """
+        return self._lines.get(label)
+
+    def compare_url(self, previous: str, version: str) -> str:
+        """
+        Get the URL comparing two versions.
+
+        :param previous: The older version, without a leading `v`.
+        :param version: The newer version, without a leading `v`.
+        :raises ChangelogParseError: If the `[Unreleased]:` link has no URL to derive compare links from.
+        :return: The compare URL.
+        """
+        return self._compare_url(f'v{previous}', f'v{version}')
+
+    def _compare_url(self, old: str, new: str) -> str:
+        if self.compare_base is None:
+            raise ChangelogParseError('The `[Unreleased]:` link has no URL to compare versions with.')
+        return f'{self.compare_base}/{old}...{new}'
+
+    def add_release(self, version: str, previous: str) -> str:
+        """
+        Point the `[Unreleased]:` link at a new release, and add the link comparing it to the previous release.
+
+        :param version: The new version, without a leading `v`.
+        :param previous: The previous latest version, without a leading `v`.
+        :raises ChangelogParseError: If the `[Unreleased]:` link has no URL to derive compare links from.
+        :return: The new `[version]: url` line, without a line break.
+        """
+        url = self.compare_url(previous, version)
+        unreleased = self._links.get(UNRELEASED, '')
+        head = unreleased.rfind(f'v{previous}')
+        if head != -1:
+            self._links[UNRELEASED] = f'{unreleased[:head]}v{version}{unreleased[head + len(previous) + 1:]}'
+        # Keep the new link right below the `[Unreleased]:` link, without rebuilding the index
+        self._links[version] = url
+        self._links.move_to_end(version, last=False)
+        self._links.move_to_end(UNRELEASED, last=False)
+        self._lines.clear()  # Lines are only known for a freshly parsed footer
+        return f'[{version}]: {url}'
+
+    def expected(self, versions: Sequence[str]) -> 'OrderedDict[str, Optional[str]]':
+        """
+        Get the URL every link should have for a list of releases. The oldest release has no version to compare
+        with, so its link is expected to exist with any URL.
+
+        :param versions: Versions of every release without a leading `v`, newest to oldest.
+        :raises ChangelogParseError: If the `[Unreleased]:` link has no URL to derive compare links from.
+        :return: Ordered dict of label and expected URL, or None for the oldest release.
+        """
+        expected = OrderedDict()
+        expected[UNRELEASED] = self._compare_url(f'v{versions[0]}', self.head) if versions else \
+            self._links.get(UNRELEASED)
+        for version, previous in zip(versions, versions[1:]):
+            expected[version] = self.compare_url(previous, version)
+        if versions:
+            expected[versions[-1]] = None
+        return expected
+
+    def validate(self, versions: Sequence[str]) -> List[InvalidLinkError]:
+        """
+        Check the link of every release in one pass.
+
+        :param versions: Versions of every release without a leading `v`, newest to oldest.
+        :return: List of errors, with lines relative to the footer. Empty if every link is correct.
+        """
+        if self.compare_base is None:
+            return [InvalidLinkError('The `[Unreleased]:` link has no URL to compare versions with.', line=1,
+                                     column=1)]
+        errors = []
+        for label, url in self.expected(versions).items():
+            actual = self._links.get(label)
+            line = self._lines.get(label)
+            if actual is None:
+                errors.append(InvalidLinkError(f'Missing link for {label}'))
+            elif url is not None and actual != url:
+                error = InvalidLinkError(f'Link for {label} should be {url}')
+                if line is not None:
+                    error.line, error.column = line + 1, len(f'[{label}]: ') + 1
+                errors.append(error)
+        return errors
+
+    def regenerate(self, versions: Sequence[str]) -> str:
+        """
+        Get the footer text with every compare link derived from the compare base URL again, in release order. The
+        link of the oldest release is kept, and links that do not belong to a release are kept below the others.
+
+        :param versions: Versions of every release without a leading `v`, newest to oldest.
+        :raises ChangelogParseError: If the `[Unreleased]:` link has no URL to derive compare links from.
+        :return: The new footer text.
+        """
+        expected = self.expected(versions)
+        if versions and expected[versions[-1]] is None:
+            oldest = self._links.get(versions[-1])
+            if oldest is None:  # The repository URL is the compare base URL without its `/compare` path
+                oldest = f'{self.compare_base.rpartition("/")[0]}/releases/tag/v{versions[-1]}'
+            expected[versions[-1]] = oldest
+        lines = [f'[{label}]: {url}' for label, url in expected.items()]
+        lines.extend(f'[{label}]: {url}' for label, url in self._links.items() if label not in expected)
+        return '\n'.join(lines) + '\n'
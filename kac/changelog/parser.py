@@ -0,0 +1,440 @@
+"""
+Line-oriented, single-pass tokenizer for Keep a Changelog files.
+
+The tokenizer only looks for markers at the start of lines (`## [`, `[Unreleased]:`, `### `, `- `) and jumps between
+them with `find`, so parsing is linear in the size of the file and cannot backtrack. It works on `str`, `bytes` and
+`mmap` buffers alike; offsets are indices into whichever buffer was scanned.
+"""
+import re
+from array import array
+from datetime import date
+from collections.abc import MutableSequence
+from typing import BinaryIO, Iterable, Iterator, List, NamedTuple, Optional, Pattern, Tuple, Union
+
+Buffer = Union[str, bytes, bytearray, memoryview]
+
+
+class ReleaseSpan(NamedTuple):
+    """Offsets of a single `## [x.y.z] - date` release block."""
+    start: int  # Start of the `## [` heading line
+    body_start: int  # Start of the line following the heading
+    end: int  # Start of the next heading, or of the footer
+
+
+class ReleaseSpans(MutableSequence):
+    """
+    Compact sequence of ReleaseSpan offsets, stored as a flat array of integers rather than one tuple per release.
+    """
+
+    def __init__(self, spans: Iterable[ReleaseSpan] = ()):
+        if isinstance(spans, ReleaseSpans):
+            self._offsets = array('q', spans._offsets)
+        else:
+            self._offsets = array('q')
+            for span in spans:
+                self._offsets.extend(span)
+
+    def __repr__(self):
+        return f'ReleaseSpans({list(self)!r})'
+
+    def __len__(self):
+        return len(self._offsets) // 3
+
+    def _position(self, idx: int) -> int:
+        length = len(self)
+        if idx < 0:
+            idx += length
+        if not 0 <= idx < length:
+            raise IndexError('release span index out of range')
+        return idx * 3
+
+    def __iter__(self) -> Iterator[ReleaseSpan]:
+        offsets = self._offsets
+        for pos in range(0, len(offsets), 3):
+            yield ReleaseSpan(offsets[pos], offsets[pos + 1], offsets[pos + 2])
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return ReleaseSpans(self[i] for i in range(*idx.indices(len(self))))
+        pos = self._position(idx)
+        return ReleaseSpan(*self._offsets[pos:pos + 3])
+
+    def __setitem__(self, idx, span: ReleaseSpan):
+        if isinstance(idx, slice):
+            spans = list(self)
+            spans[idx] = span
+            self._offsets = ReleaseSpans(spans)._offsets
+            return
+        pos = self._position(idx)
+        self._offsets[pos:pos + 3] = array('q', span)
+
+    def __delitem__(self, idx):
+        if isinstance(idx, slice):
+            spans = list(self)
+            del spans[idx]
+            self._offsets = ReleaseSpans(spans)._offsets
+            return
+        pos = self._position(idx)
+        del self._offsets[pos:pos + 3]
+
+    def __eq__(self, other):
+        if isinstance(other, (ReleaseSpans, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def insert(self, idx: int, span: ReleaseSpan) -> None:
+        pos = min(max(idx + len(self) if idx < 0 else idx, 0), len(self)) * 3
+        self._offsets[pos:pos] = array('q', span)
+
+
+class ChangelogIndex(NamedTuple):
+    """Offsets of the header, body, and footer sections of a CHANGELOG buffer."""
+    unreleased_start: int  # Start of the `## [Unreleased]` heading line, also the end of the header
+    unreleased_body_start: int  # Start of the line following the `## [Unreleased]` heading
+    footer_start: int  # Start of the `[Unreleased]:` link line, also the end of the body
+    end: int  # Length of the buffer
+    releases: ReleaseSpans  # newest to oldest
+
+    @property
+    def unreleased_end(self) -> int:
+        return self.releases[0].start if self.releases else self.footer_start
+
+
+class _Tokens(NamedTuple):
+    newline: Buffer
+    heading: Buffer
+    unreleased_heading: Buffer
+    unreleased_link: Buffer
+    release_heading: Pattern
+
+
+# A release heading line, ie. `## [0.3.0] - 2020-04-05`, optionally followed by a marker such as `[YANKED]`. Only ever
+# matched against a single line, and has no nested quantifiers, so it cannot backtrack.
+_RELEASE_HEADING = r'## \[([^\s\]]+)\] - ([0-9-]+)(?:[ \t][^\r\n]*)?\s*\Z'
+
+_STR_TOKENS = _Tokens('\n', '## [', '## [Unreleased]', '[Unreleased]:', re.compile(_RELEASE_HEADING))
+_BYTES_TOKENS = _Tokens(b'\n', b'## [', b'## [Unreleased]', b'[Unreleased]:', re.compile(_RELEASE_HEADING.encode()))
+
+
+def _tokens(buf) -> _Tokens:
+    return _STR_TOKENS if isinstance(buf, str) else _BYTES_TOKENS
+
+
+def as_text(chunk) -> str:
+    """
+    Decode a slice of a scanned buffer to `str`.
+
+    :param chunk: A `str` or bytes-like slice.
+    :return: The slice as text.
+    """
+    return chunk if isinstance(chunk, str) else bytes(chunk).decode('utf-8')
+
+
+def parse_date(release_date: str) -> date:
+    """
+    Parse a `YYYY-MM-DD` release date, like `datetime.strptime(release_date, '%Y-%m-%d')` but without its overhead.
+
+    :param release_date: Date string from a release heading.
+    :raises ValueError: If the string is not a valid date.
+    :return: The release date.
+    """
+    parts = release_date.split('-')
+    if len(parts) != 3 or len(parts[0]) != 4 or not all(0 < len(p) <= 2 for p in parts[1:]) or \
+            not all(p.isdigit() for p in parts):
+        raise ValueError(f"time data '{release_date}' does not match format '%Y-%m-%d'")
+    return date(int(parts[0]), int(parts[1]), int(parts[2]))
+
+
+def _find_line_start(buf, sub, start: int, end: int, tokens: _Tokens) -> int:
+    """Find the first occurrence of `sub` at the start of a line in `buf[start:end]`, or -1."""
+    if start == 0 and buf[:len(sub)] == sub:
+        return 0
+    idx = buf.find(tokens.newline + sub, max(start - 1, 0), end)
+    return -1 if idx == -1 else idx + 1
+
+
+def _line_end(buf, start: int, end: int, tokens: _Tokens) -> int:
+    """Offset of the start of the line following `start`, bounded by `end`."""
+    idx = buf.find(tokens.newline, start, end)
+    return end if idx == -1 else idx + 1
+
+
+def line_end(buf, start: int) -> int:
+    """
+    Get the offset of the start of the line following `start`.
+
+    :param buf: A scanned buffer.
+    :param start: Offset within the buffer.
+    :return: Offset just past the next newline, or the length of the buffer if there is none.
+    """
+    return _line_end(buf, start, len(buf), _tokens(buf))
+
+
+def split_heading(line) -> Optional[Tuple[str, str]]:
+    """
+    Split a release heading line (ie. `## [0.3.0] - 2020-04-05`) into its version and date strings. Text after the
+    date, ie. a `[YANKED]` marker, is ignored.
+
+    :param line: A single heading line, with or without its trailing newline.
+    :return: Tuple of (version, date) strings, or None if the line is not a release heading.
+    """
+    m = _STR_TOKENS.release_heading.match(as_text(line).lstrip())
+    return None if m is None else m.groups()
+
+
+def split_headings(buf, spans: Iterable[ReleaseSpan]) -> List[Optional[Tuple[str, str]]]:
+    """
+    Split the heading lines of many release blocks into their version and date strings, matching each heading in place
+    rather than copying it out of the buffer first.
+
+    :param buf: A scanned buffer.
+    :param spans: Offsets of the release blocks.
+    :return: List of (version, date) string tuples, or None for a block that does not start with a release heading.
+    """
+    match = _tokens(buf).release_heading.match
+    headings = [match(buf, span[0], span[1]) for span in spans]
+    if isinstance(buf, str):
+        return [None if m is None else m.groups() for m in headings]
+    return [None if m is None else (m.group(1).decode('utf-8'), m.group(2).decode('utf-8')) for m in headings]
+
+
+def scan(buf) -> Optional[ChangelogIndex]:
+    """
+    Tokenize a CHANGELOG buffer into header, `Unreleased`, release, and footer spans in a single linear pass.
+
+    :param buf: The full CHANGELOG text as `str`, `bytes` or an `mmap`.
+    :return: ChangelogIndex for the buffer, or None if the `Unreleased` heading or link could not be found.
+    """
+    tokens = _tokens(buf)
+    end = len(buf)
+
+    unreleased_start = _find_line_start(buf, tokens.unreleased_heading, 0, end, tokens)
+    if unreleased_start == -1:
+        return None
+    unreleased_body_start = _line_end(buf, unreleased_start, end, tokens)
+    footer_start = _find_line_start(buf, tokens.unreleased_link, unreleased_body_start, end, tokens)
+    if footer_start == -1:
+        return None
+
+    releases = ReleaseSpans()
+    releases._offsets = scan_releases(buf, unreleased_body_start, footer_start)
+    return ChangelogIndex(unreleased_start, unreleased_body_start, footer_start, end, releases)
+
+
+def scan_releases(buf, start: int, end: int) -> array:
+    """
+    Find the release blocks in a slice of a CHANGELOG buffer. The last block found ends at `end`.
+
+    :param buf: The CHANGELOG text as `str`, `bytes` or an `mmap`.
+    :param start: Start offset of the slice, at the start of a line.
+    :param end: End offset of the slice, at the start of a line.
+    :return: Flat array of (start, body_start, end) offsets of each release block.
+    """
+    tokens = _tokens(buf)
+    offsets = array('q')
+    release_start = None
+    body_start = None
+    pos = start
+    while True:
+        heading_start = _find_line_start(buf, tokens.heading, pos, end, tokens)
+        block_end = end if heading_start == -1 else heading_start
+        if release_start is not None:
+            offsets.extend((release_start, body_start, block_end))
+            release_start = None
+        if heading_start == -1:
+            return offsets
+        pos = _line_end(buf, heading_start, end, tokens)
+        if tokens.release_heading.match(buf, heading_start, pos):
+            release_start, body_start = heading_start, pos
+
+
+def find_footer(buf, start: int, end: int) -> int:
+    """
+    Find the `[Unreleased]:` link line that starts the footer in a slice of a CHANGELOG buffer.
+
+    :param buf: The CHANGELOG text as `str`, `bytes` or an `mmap`.
+    :param start: Start offset of the slice.
+    :param end: End offset of the slice.
+    :return: Offset of the start of the line, or -1 if there is none.
+    """
+    tokens = _tokens(buf)
+    return _find_line_start(buf, tokens.unreleased_link, start, end, tokens)
+
+
+def _common_prefix_length(a, b, chunk_size: int) -> int:
+    n = min(len(a), len(b))
+    for pos in range(0, n, chunk_size):
+        end = min(pos + chunk_size, n)
+        if a[pos:end] != b[pos:end]:
+            # Binary search the mismatching chunk, keeping a[:lo] == b[:lo] and a[lo:hi] != b[lo:hi]
+            lo, hi = pos, end
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if a[lo:mid] == b[lo:mid]:
+                    lo = mid
+                else:
+                    hi = mid
+            return lo
+    return n
+
+
+def _common_suffix_length(a, b, limit: int, chunk_size: int) -> int:
+    a_end, b_end = len(a), len(b)
+    length = 0
+    while length < limit:
+        step = min(chunk_size, limit - length)
+        a_stop, b_stop = a_end - length, b_end - length
+        if a[a_stop - step:a_stop] != b[b_stop - step:b_stop]:
+            # Binary search the mismatching chunk, keeping its last `lo` items equal and its last `hi` items not
+            lo, hi = 0, step
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if a[a_stop - mid:a_stop - lo] == b[b_stop - mid:b_stop - lo]:
+                    lo = mid
+                else:
+                    hi = mid
+            return length + lo
+        length += step
+    return limit
+
+
+def changed_range(old, new, chunk_size: int = 1 << 16) -> Tuple[int, int, int]:
+    """
+    Find the range of a buffer that changed, by comparing the two buffers chunk by chunk from either end.
+
+    :param old: The previous buffer.
+    :param new: The new buffer.
+    :param chunk_size: Size of the chunks that are compared at once.
+    :return: Tuple of the start of the change, and the end of the change in `old` and in `new`. Everything before the
+        start and everything after the ends is the same in both buffers.
+    """
+    prefix = _common_prefix_length(old, new, chunk_size)
+    suffix = _common_suffix_length(old, new, min(len(old), len(new)) - prefix, chunk_size)
+    return prefix, len(old) - suffix, len(new) - suffix
+
+
+class ChangelogHead(NamedTuple):
+    """Offsets of the `Unreleased` section and the latest release at the top of a CHANGELOG buffer."""
+    unreleased_start: int  # Start of the `## [Unreleased]` heading line
+    unreleased_body_start: int  # Start of the line following the `## [Unreleased]` heading
+    latest: Optional[ReleaseSpan]  # The first release block, or None if there are no releases
+
+
+_MORE = object()  # Returned by `_scan_head` when the buffer ends before the latest release does
+
+
+def _scan_head(buf, eof: bool):
+    """
+    Find the `Unreleased` heading and the first release block at the top of a buffer.
+
+    :param buf: The start of a CHANGELOG file as bytes.
+    :param eof: Whether the buffer holds the whole file. Otherwise, tokens are only trusted once the line they are on
+        is complete, and `_MORE` is returned if the buffer ends before the first release block does.
+    :return: ChangelogHead, None if there is no `Unreleased` heading, or `_MORE`.
+    """
+    tokens = _BYTES_TOKENS
+    end = len(buf)
+
+    unreleased_start = _find_line_start(buf, tokens.unreleased_heading, 0, end, tokens)
+    if unreleased_start == -1:
+        return None if eof else _MORE
+    unreleased_body_start = _line_end(buf, unreleased_start, end, tokens)
+    if unreleased_body_start == end and not eof:
+        return _MORE
+
+    pos = unreleased_body_start
+    while True:
+        # The footer ends the body; a partially read `[Unreleased]:` line is not found, so it is read in full first
+        footer_start = _find_line_start(buf, tokens.unreleased_link, pos, end, tokens)
+        limit = end if footer_start == -1 else footer_start
+        heading_start = _find_line_start(buf, tokens.heading, pos, limit, tokens)
+        if heading_start == -1:
+            return ChangelogHead(unreleased_start, unreleased_body_start, None) if eof or footer_start != -1 else _MORE
+        pos = _line_end(buf, heading_start, limit, tokens)
+        if pos == end and not eof:
+            return _MORE
+        if tokens.release_heading.match(buf, heading_start, pos):
+            break
+
+    # The latest release ends at the next heading, or at the footer
+    body_start = pos
+    release_end = _find_line_start(buf, tokens.heading, body_start, limit, tokens)
+    if release_end == -1:
+        if footer_start == -1 and not eof:
+            return _MORE
+        release_end = limit
+    return ChangelogHead(unreleased_start, unreleased_body_start, ReleaseSpan(heading_start, body_start, release_end))
+
+
+def read_head(f: BinaryIO, chunk_size: int = 8192) -> Tuple[bytes, Optional[ChangelogHead]]:
+    """
+    Read a CHANGELOG file from the top until the end of its latest release, and no further.
+
+    Reads start at `chunk_size` bytes and double in size, so the head is scanned in linear time however long it is.
+
+    :param f: Binary file object positioned at the start of the CHANGELOG file.
+    :param chunk_size: Size of the first read.
+    :return: Tuple of the bytes read and the ChangelogHead, which is None if there is no `Unreleased` heading.
+    """
+    buf = bytearray()
+    while True:
+        chunk = f.read(chunk_size)
+        buf += chunk
+        head = _scan_head(buf, eof=not chunk)
+        if head is not _MORE:
+            return bytes(buf), head
+        chunk_size = min(chunk_size * 2, 1 << 20)
+
+
+def line_column(buf, offset: int) -> Tuple[int, int]:
+    """
+    Get the position of an offset in a scanned buffer. This copies the buffer up to the offset, so it is meant for
+    reporting errors rather than for the parsing itself.
+
+    :param buf: A scanned buffer.
+    :param offset: Offset within the buffer.
+    :return: Tuple of 1-based line number and column.
+    """
+    prefix = buf[:offset]
+    if not isinstance(prefix, (str, bytes)):
+        prefix = bytes(prefix)
+    newline = _tokens(prefix).newline
+    return prefix.count(newline) + 1, offset - prefix.rfind(newline)
+
+
+# A change type heading line, ie. `### Added`, followed by nothing but spaces
+_CHANGE_TYPE_HEADING = re.compile(r'### (\S+) *\Z')
+
+
+def iter_change_lines(changes_text: str) -> Iterator[Tuple[int, str, str]]:
+    """
+    Iterate over the entries of a release's changes text, with the line of the change type heading of each.
+
+    :param changes_text: Text of changes from a release.
+    :return: Iterator of (0-based line index of the heading, change type heading, entry) tuples, in file order.
+    """
+    change_type = None
+    heading_idx = -1
+    for idx, line in enumerate(changes_text.splitlines()):
+        if line.startswith('### '):
+            # A single word, ie. `### Added`; the entries of other `### ` headings are ignored
+            m = _CHANGE_TYPE_HEADING.match(line)
+            change_type = None if m is None else m.group(1)
+            heading_idx = idx
+        elif change_type is not None and line.startswith('- '):
+            yield heading_idx, change_type, line.lstrip('- ').rstrip()
+        elif line.startswith('#'):
+            change_type = None
+
+
+def iter_changes(changes_text: str) -> Iterator[Tuple[str, str]]:
+    """
+    Iterate over the entries of a release's changes text.
+
+    Entries are `- ` lines that follow a `### ChangeType` heading of a single word. All other lines are ignored.
+
+    :param changes_text: Text of changes from a release.
+    :return: Iterator of (change type heading, entry) tuples, in file order.
+    """
+    for _, change_type, entry in iter_change_lines(changes_text):
+        yield change_type, entry
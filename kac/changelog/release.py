@@ -1,16 +1,103 @@
 import re
+import time
 from collections import OrderedDict
+from collections.abc import MutableSequence
 from datetime import date
-from typing import List
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
 
-import click
 from semver import VersionInfo
 
+from . import trace
+from .exceptions import ChangelogError, InvalidChangeTypeError
+from .parser import ReleaseSpan, ReleaseSpans, iter_change_lines
+from .version import PackedVersion, format_version, pack, unpack
+
+_NO_SPAN = ReleaseSpan(-1, -1, -1)
+
+_EMPTY_OFFSETS = (0,) * 7
+
+# Offset patterns repeat across releases (ie. "one added entry, two fixed entries"), so equal offset tuples are shared
+_OFFSETS_CACHE_SIZE = 4096
+_offsets_cache = {_EMPTY_OFFSETS: _EMPTY_OFFSETS}
+
+
+def _intern_offsets(offsets: tuple) -> tuple:
+    if len(_offsets_cache) < _OFFSETS_CACHE_SIZE:
+        return _offsets_cache.setdefault(offsets, offsets)
+    return _offsets_cache.get(offsets, offsets)
+
+
+# `### ChangeType` heading and the `- ` of the first entry of each change type, in CHANGE_TYPES order
+_CHANGE_TYPE_HEADINGS = ('### Added\n- ', '### Changed\n- ', '### Deprecated\n- ', '### Fixed\n- ', '### Removed\n- ',
+                         '### Security\n- ')
+
+# Changes text that `changes_text` renders exactly the way it was written: every change type at most once and in order,
+# each followed by one blank line, and entries without anything that parsing strips from them
+_CANONICAL_CHANGES_TEXT = re.compile(''.join(
+    rf'(?:### {heading}\n(?:- [^\s\-](?:[^\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]*\S)?\n)+\n)?'
+    for heading in ('Added', 'Changed', 'Deprecated', 'Fixed', 'Removed', 'Security')
+))
+
+
+class _ChangeList(list):
+    """
+    List of the changes of one change type, as returned by the change type attributes of a release. Every change made
+    to the list is written back to the release, and fails if the release is frozen.
+    """
+    __slots__ = ('_release', '_change_type')
+
+    def __init__(self, release: 'ReleaseBase', change_type: str, entries: Iterable[str]):
+        super(_ChangeList, self).__init__(entries)
+        self._release = release
+        self._change_type = change_type
+
+    def __reduce__(self):
+        return list, (list(self),)  # Copies are detached from the release
+
+
+def _write_through(name: str) -> Callable:
+    method = getattr(list, name)
+
+    def write(self, *args, **kwargs):
+        if self._release.frozen:
+            raise AttributeError(f'{self._release!r} is frozen')
+        result = method(self, *args, **kwargs)
+        self._release._set_changes({self._change_type: self})
+        return result
+
+    write.__name__ = name
+    return write
+
+
+for _name in ('__setitem__', '__delitem__', '__iadd__', '__imul__', 'append', 'extend', 'insert', 'pop', 'remove',
+              'clear', 'reverse', 'sort'):
+    setattr(_ChangeList, _name, _write_through(_name))
+
+
+def _change_type_property(idx: int) -> property:
+    """Property for the list of changes of a single change type, backed by the flat entry store of a release."""
+
+    def fget(self) -> List[str]:
+        entries = self._entries[self._offsets[idx]:self._offsets[idx + 1]]
+        return _ChangeList(self, ReleaseBase.CHANGE_TYPES[idx], entries)
+
+    def fset(self, value: List[str]):
+        self._set_changes({ReleaseBase.CHANGE_TYPES[idx]: value})
+
+    return property(fget, fset)
+
 
 class ReleaseBase:
     """
     Represents a release in a Changelog file.
+
+    Changes of every type are kept in a single flat tuple of entries, with the offset where each change type starts.
+    The change type attributes (`added`, `changed`, ...) return a new list on every access, which writes any change
+    made to it back to the release. Frozen releases cannot be changed at all. The rendered `changes_text` is cached
+    until the changes are modified.
     """
+    __slots__ = ('_entries', '_offsets', '_frozen', '_text')
+
     _change_pattern = re.compile(r'^### (\S+)$\n+((?:^- (?:.*)$\n)+)\s*')
 
     CHANGE_TYPES = (
@@ -23,87 +110,325 @@ class ReleaseBase:
     )
 
     def __init__(self, added: List = None, changed: List = None, deprecated: List = None, fixed: List = None,
-                 removed: List = None, security: List = None):
-        if added is None:
-            added = []
-        if changed is None:
-            changed = []
-        if deprecated is None:
-            deprecated = []
-        if fixed is None:
-            fixed = []
-        if removed is None:
-            removed = []
-        if security is None:
-            security = []
-
-        self.added = added
-        self.changed = changed
-        self.deprecated = deprecated
-        self.fixed = fixed
-        self.removed = removed
-        self.security = security
-
-        self.changes: OrderedDict = OrderedDict([
-            ('added', self.added),
-            ('changed', self.changed),
-            ('deprecated', self.deprecated),
-            ('fixed', self.fixed),
-            ('removed', self.removed),
-            ('security', self.security),
-        ])
+                 removed: List = None, security: List = None, frozen: bool = False):
+        self._frozen = False
+        self._text: Optional[str] = None
+        self._entries: tuple = ()
+        self._offsets: tuple = _EMPTY_OFFSETS
+        self._set_changes(dict(zip(self.CHANGE_TYPES, (added, changed, deprecated, fixed, removed, security))))
+        self._frozen = frozen
+
+    added = _change_type_property(0)
+    changed = _change_type_property(1)
+    deprecated = _change_type_property(2)
+    fixed = _change_type_property(3)
+    removed = _change_type_property(4)
+    security = _change_type_property(5)
+
+    def _set_changes(self, changes: dict) -> None:
+        """
+        Replace the changes of one or more change types.
+
+        :param changes: Dictionary of change types and their new list of changes.
+        """
+        if self._frozen:
+            raise AttributeError(f'{self!r} is frozen')
+        entries = []
+        offsets = [0]
+        for idx, change_type in enumerate(self.CHANGE_TYPES):
+            if change_type in changes:
+                entries.extend(changes[change_type] or ())
+            else:
+                entries.extend(self._entries[self._offsets[idx]:self._offsets[idx + 1]])
+            offsets.append(len(entries))
+        self._entries = tuple(entries) if entries else ()
+        self._offsets = _intern_offsets(tuple(offsets))
+        self._text = None
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def freeze(self) -> None:
+        """
+        Make the release immutable.
+        """
+        self._frozen = True
+
+    @property
+    def changes(self) -> OrderedDict:
+        """
+        Ordered dictionary of every change type and its list of changes. Changes made to the lists are written back
+        to the release, like those made to the lists of the change type attributes.
+        """
+        entries, offsets = self._entries, self._offsets
+        return OrderedDict(
+            (change_type, _ChangeList(self, change_type, entries[offsets[idx]:offsets[idx + 1]]))
+            for idx, change_type in enumerate(self.CHANGE_TYPES)
+        )
+
+    def _change_lists(self) -> Tuple[List[str], ...]:
+        """Get the changes of every change type as plain lists, in CHANGE_TYPES order, ie. to be serialized."""
+        entries, offsets = self._entries, self._offsets
+        return tuple(list(entries[offsets[idx]:offsets[idx + 1]]) for idx in range(len(self.CHANGE_TYPES)))
 
     @classmethod
-    def changes_to_dict(cls, changes_text) -> dict:
+    def changes_to_dict(cls, changes_text, errors: List[ChangelogError] = None) -> dict:
         """
         Parse a release's changes into a dictionary where keys are the change type (ie. Added => `added` key), and
         values are a list of changes for that change type.
 
-        :raises click.Abort: If change type is not in CHANGE_TYPES.
+        :raises InvalidChangeTypeError: If change type is not in CHANGE_TYPES, and `errors` is not given.
 
         :param changes_text: Text of changes from a release.
+        :param errors: List to collect errors in instead of raising them. Entries of invalid change types are skipped.
         :return: Dictionary of change types and changes.
         """
         data = {v: [] for v in cls.CHANGE_TYPES}
-        for change_type, change_data in re.findall(r'### (\S+) *\n+((?:- (?:.*)\n*)+)\s*',
-                                                   changes_text.strip()):  # type: str, str
-            change_data = change_data.strip()
-            if change_type.lower() not in Release.CHANGE_TYPES:
-                click.echo(f'Invalid change type: {change_type}')
-                raise click.Abort
-            data[change_type.lower()].extend([cd.lstrip('- ') for cd in change_data.split('\n')])
+        invalid_heading_idx = -1
+        for heading_idx, change_type, entry in iter_change_lines(changes_text):  # type: int, str, str
+            changes = data.get(change_type.lower())
+            if changes is not None:
+                changes.append(entry)
+                continue
+            if heading_idx == invalid_heading_idx:  # Report each heading once, not once per entry
+                continue
+            error = InvalidChangeTypeError(f'Invalid change type: {change_type}', line=heading_idx + 1, column=5)
+            if errors is None:
+                raise error
+            errors.append(error)
+            invalid_heading_idx = heading_idx
         return data
 
-    @property
-    def changes_text(self):
-        data = ''
-        for change_type, change_data in self.changes.items():  # type: str, str
-            if not change_data:
-                continue
-            change_entries = ''.join([f'- {cd}\n' for cd in change_data])
-            data += f'### {change_type.capitalize()}\n{change_entries}\n'
+    def _adopt_text(self, text: str) -> None:
+        """
+        Use the source text of the changes as the rendered `changes_text`, if it is exactly what would be rendered.
 
-        return data
+        :param text: Text of changes the release was parsed from.
+        """
+        if _CANONICAL_CHANGES_TEXT.fullmatch(text):
+            self._text = text
+
+    @property
+    def changes_text(self) -> str:
+        """
+        Markdown text of the changes, with a `### ChangeType` heading per change type that has changes.
+        """
+        if self._text is None:
+            started = time.perf_counter()
+            entries, offsets = self._entries, self._offsets
+            parts = []
+            for idx, heading in enumerate(_CHANGE_TYPE_HEADINGS):
+                start, end = offsets[idx], offsets[idx + 1]
+                if start != end:
+                    parts += (heading, '\n- '.join(entries[start:end]), '\n\n')
+            self._text = ''.join(parts)
+            tracer = trace.active()
+            if tracer is not None:
+                tracer.add('render', time.perf_counter() - started, bytes=len(self._text))
+        return self._text
 
 
 class Release(ReleaseBase):
-    def __init__(self, version: VersionInfo, release_date: date, added: List = None, changed: List = None,
-                 deprecated: List = None, fixed: List = None, removed: List = None, security: List = None):
-        super(Release, self).__init__(added, changed, deprecated, removed, fixed, security)
-        self.release_date = release_date
-        self.version = version
+    """
+    A published release. The version is kept as a packed tuple, and only turned into a VersionInfo when requested.
+    """
+    __slots__ = ('_version', '_version_info', '_release_date')
+
+    def __init__(self, version: Union[VersionInfo, PackedVersion], release_date: date, added: List = None,
+                 changed: List = None, deprecated: List = None, fixed: List = None, removed: List = None,
+                 security: List = None, frozen: bool = False):
+        self._version = pack(version)
+        self._version_info = version if isinstance(version, VersionInfo) else None
+        self._release_date = release_date
+        super(Release, self).__init__(added, changed, deprecated, fixed, removed, security, frozen=frozen)
 
     def __repr__(self):
-        return f'<Release v{self.version} - {self.release_date}>'
+        return f'<Release v{format_version(self._version)} - {self.release_date}>'
 
     def __eq__(self, other):
-        return self.version == other.version and self.release_date == other.release_date
+        if not isinstance(other, Release):
+            return NotImplemented
+        if self.release_date != other.release_date or self._version[:3] != other._version[:3]:
+            return False
+        # Build metadata is ignored, and prereleases that only differ in their text are compared by VersionInfo
+        return self._version[3] == other._version[3] or self.version == other.version
+
+    __hash__ = None
+
+    @property
+    def version(self) -> VersionInfo:
+        if self._version_info is None:
+            self._version_info = unpack(self._version)
+        return self._version_info
+
+    @version.setter
+    def version(self, version: Union[VersionInfo, PackedVersion]):
+        if self._frozen:
+            raise AttributeError(f'{self!r} is frozen')
+        self._version = pack(version)
+        self._version_info = version if isinstance(version, VersionInfo) else None
+
+    @property
+    def release_date(self) -> date:
+        return self._release_date
+
+    @release_date.setter
+    def release_date(self, release_date: date):
+        if self._frozen:
+            raise AttributeError(f'{self!r} is frozen')
+        self._release_date = release_date
+
+    @property
+    def packed_version(self) -> PackedVersion:
+        """
+        The release version as a `(major, minor, patch, prerelease, build)` tuple.
+        """
+        return self._version
 
 
 class Unreleased(ReleaseBase):
+    __slots__ = ()
+
     def __repr__(self):
         return '<Unreleased>'
 
     @property
     def has_changes(self):
-        return any(cv for cv in self.changes.values())
+        return bool(self._entries)
+
+
+class ReleaseList(MutableSequence):
+    """
+    Newest to oldest list of releases that are parsed from their CHANGELOG text on first access.
+    """
+
+    def __init__(self, spans: Iterable[ReleaseSpan], parse: Callable[[ReleaseSpan], Release],
+                 parse_heading: Callable[[ReleaseSpan], Tuple[PackedVersion, date]] = None,
+                 parse_headings: Callable[[List[ReleaseSpan]], List[Tuple[PackedVersion, date]]] = None):
+        """
+        :param spans: Offsets of each release block, as returned by `kac.changelog.parser.scan`.
+        :param parse: Callable that parses a span into a Release.
+        :param parse_heading: Callable that only parses the version and date of a span, defaults to parsing the full
+            release.
+        :param parse_headings: Callable that parses the versions and dates of many spans at once, defaults to calling
+            `parse_heading` for each span.
+        """
+        self._spans = ReleaseSpans(spans)  # Offsets of every release, or _NO_SPAN for releases added in memory
+        self._items: List[Optional[Release]] = [None] * len(self._spans)  # Parsed releases
+        self._parse = parse
+        self._parse_heading = parse_heading
+        self._parse_headings = parse_headings
+        self.revision = 0  # Incremented whenever releases are added, replaced or removed
+
+    def __repr__(self):
+        return f'<ReleaseList of {len(self)} releases>'
+
+    def __len__(self):
+        return len(self._items)
+
+    def _get(self, idx: int) -> Release:
+        item = self._items[idx]
+        if item is None:
+            item = self._items[idx] = self._parse(self._spans[idx])
+        return item
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._get(i) for i in range(*idx.indices(len(self)))]
+        return self._get(idx)
+
+    def __setitem__(self, idx, release: Release):
+        if isinstance(idx, slice):
+            release = list(release)
+            self._items[idx] = release  # Checks the length of extended slices before the spans are changed
+            self._spans[idx] = [_NO_SPAN] * len(release)
+        else:
+            self._items[idx] = release
+            self._spans[idx] = _NO_SPAN
+        self.revision += 1
+
+    def __delitem__(self, idx):
+        del self._items[idx]
+        del self._spans[idx]
+        self.revision += 1
+
+    def __eq__(self, other):
+        if isinstance(other, (ReleaseList, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def insert(self, idx: int, release: Release) -> None:
+        self._items.insert(idx, release)
+        self._spans.insert(idx, _NO_SPAN)
+        self.revision += 1
+
+    def headings(self) -> Iterator[Tuple[PackedVersion, date]]:
+        """
+        Iterate over the version and date of every release, without parsing the changes of releases that have not been
+        accessed yet.
+
+        :return: Iterator of (packed version, release date) tuples, newest to oldest.
+        """
+        for idx, item in enumerate(self._items):
+            if item is None and self._parse_heading is not None:
+                yield self._parse_heading(self._spans[idx])
+            else:
+                item = self._get(idx)
+                yield item.packed_version, item.release_date
+
+    def all_headings(self) -> List[Tuple[PackedVersion, date]]:
+        """
+        Get the version and date of every release, parsing the headings of the releases that have not been accessed yet
+        in a single batch.
+
+        :return: List of (packed version, release date) tuples, newest to oldest.
+        """
+        if self._parse_headings is None:
+            return list(self.headings())
+        unparsed = [span for span, item in zip(self._spans, self._items) if item is None]
+        headings = iter(self._parse_headings(unparsed))
+        return [next(headings) if item is None else (item.packed_version, item.release_date) for item in self._items]
+
+    def reindex(self, spans: Iterable[ReleaseSpan]) -> None:
+        """
+        Replace the offsets of every release, ie. after the CHANGELOG text was rewritten.
+
+        :param spans: New offsets of each release block, in the same order as the releases.
+        """
+        spans = ReleaseSpans(spans)
+        if len(spans) != len(self._items):
+            raise ValueError(f'Expected {len(self._items)} release spans, got {len(spans)}')
+        self._spans = spans
+
+    def splice(self, start: int, stop: int, items: List[Optional[Release]], spans: Iterable[ReleaseSpan]) -> None:
+        """
+        Replace a range of releases after part of the CHANGELOG text was re-scanned, keeping the releases outside of
+        the range as they are.
+
+        :param start: Position of the first release to replace.
+        :param stop: Position after the last release to replace.
+        :param items: Parsed releases for the range, or None for releases to parse on first access.
+        :param spans: New offsets of every release block, including the ones outside of the range.
+        """
+        spans = ReleaseSpans(spans)
+        if len(spans) != len(self._items) - (stop - start) + len(items):
+            raise ValueError(f'Expected {len(self._items) - (stop - start) + len(items)} release spans, '
+                             f'got {len(spans)}')
+        self._items[start:stop] = items
+        self._spans = spans
+        self.revision += 1
+
+    @property
+    def parsed_count(self) -> int:
+        """
+        Number of releases that have already been parsed.
+        """
+        return sum(item is not None for item in self._items)
+
+    def materialize(self) -> None:
+        """
+        Parse every release that has not been accessed yet.
+        """
+        for idx in range(len(self._items)):
+            self._get(idx)
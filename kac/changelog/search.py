@@ -0,0 +1,399 @@
+"""
+Full-text search of the change entries of many CHANGELOG files.
+
+Every entry is tokenized once into lowercase words, and each word maps to the sorted ids of the entries it appears in.
+A query only intersects the posting lists of its words, starting with the shortest, so answering it depends on how
+many entries contain its words rather than on how many entries are indexed. The index is persisted next to the
+CHANGELOG cache, and kept up to date without parsing unchanged files again: files are indexed again when their size or
+modification time changes. `SearchIndex.bump` lets library callers that keep an index open index only the new
+release of a bump.
+"""
+import marshal
+import os
+import re
+from array import array
+from datetime import date
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from semver import VersionInfo
+
+from . import trace
+from .cache import default_cache_dir
+from .changelog import Changelog
+from .exceptions import ChangelogNotFoundError
+from .release import Release, ReleaseBase
+from .util import atomic_write
+from .version import format_version
+
+# Bump whenever the layout of the persisted index changes, so that stale indexes are never loaded
+INDEX_FORMAT = 2
+
+_TOKEN_RE = re.compile(r'\w+')
+_STRIP_RE = re.compile(r'^\W+|\W+$')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase words, ie. `Fix CVE-2021-44228` into `fix`, `cve`, `2021` and `44228`.
+
+    :param text: Text of a change entry or query.
+    :return: List of words, in order.
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+def default_index_path() -> str:
+    """
+    Get the default search index file: `search.idx` in the CHANGELOG cache directory.
+
+    :return: File system path of the index file.
+    """
+    return os.path.join(default_cache_dir(), 'search.idx')
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class SearchHit(NamedTuple):
+    """A change entry matching a query."""
+    path: str
+    version: str
+    release_date: date
+    change_type: str
+    entry: str
+
+
+class SearchIndex:
+    """
+    Inverted index of the change entries of CHANGELOG files, by lowercase word.
+
+    Entries are identified by consecutive ids, and their file, version, date and change type are kept in parallel
+    arrays. Entries of a file that is indexed again are only marked as removed, and left out of the index when it is
+    saved.
+    """
+
+    def __init__(self):
+        self._paths: List[str] = []
+        self._path_ids: Dict[str, int] = {}
+        self._signatures: Dict[str, Tuple[int, int]] = {}
+        self._doc_paths = array('i')
+        self._doc_dates = array('i')
+        self._doc_types = array('b')
+        self._doc_versions = array('i')
+        self._doc_entries: List[str] = []
+        self._versions: List[str] = []
+        self._version_ids: Dict[str, int] = {}
+        # Posting lists of a loaded index stay bytes until a query or a new entry needs them
+        self._postings: Dict[str, object] = {}
+        self._deleted: Set[int] = set()
+        self._changed = False
+
+    def __repr__(self):
+        return f'<SearchIndex of {len(self)} entries>'
+
+    def __len__(self):
+        return len(self._doc_entries) - len(self._deleted)
+
+    def __contains__(self, path):
+        return os.path.abspath(path) in self._signatures
+
+    @property
+    def changed(self) -> bool:
+        """Whether the index changed since it was loaded or saved."""
+        return self._changed
+
+    @property
+    def paths(self) -> List[str]:
+        """Absolute paths of the indexed CHANGELOG files."""
+        return list(self._signatures)
+
+    def _path_id(self, path: str) -> int:
+        path_id = self._path_ids.get(path)
+        if path_id is None:
+            path_id = self._path_ids[path] = len(self._paths)
+            self._paths.append(path)
+        return path_id
+
+    def _posting(self, token: str) -> Optional[array]:
+        posting = self._postings.get(token)
+        if isinstance(posting, bytes):
+            posting = array('i')
+            posting.frombytes(self._postings[token])
+            self._postings[token] = posting
+        return posting
+
+    def add_release(self, path: str, release: Release) -> None:
+        """
+        Index the change entries of a release.
+
+        :param path: File system path of the CHANGELOG file of the release.
+        :param release: The release.
+        """
+        path_id = self._path_id(os.path.abspath(path))
+        version = format_version(release.packed_version)
+        version_id = self._version_ids.get(version)
+        if version_id is None:
+            version_id = self._version_ids[version] = len(self._versions)
+            self._versions.append(version)
+        ordinal = release.release_date.toordinal()
+        for type_idx, entries in enumerate(release._change_lists()):
+            for entry in entries:
+                doc_id = len(self._doc_entries)
+                self._doc_paths.append(path_id)
+                self._doc_dates.append(ordinal)
+                self._doc_types.append(type_idx)
+                self._doc_versions.append(version_id)
+                self._doc_entries.append(entry)
+                for token in set(tokenize(entry)):
+                    posting = self._posting(token)
+                    if posting is None:
+                        posting = self._postings[token] = array('i')
+                    posting.append(doc_id)
+        self._changed = True
+
+    def remove(self, path: str) -> None:
+        """
+        Remove the entries of a CHANGELOG file from the index.
+
+        :param path: File system path of the CHANGELOG file.
+        """
+        path = os.path.abspath(path)
+        path_id = self._path_ids.get(path)
+        if path_id is None:
+            return
+        self._deleted.update(i for i, p in enumerate(self._doc_paths) if p == path_id)
+        self._signatures.pop(path, None)
+        self._changed = True
+
+    def add_changelog(self, changelog: Changelog) -> None:
+        """
+        Index the releases of a Changelog, replacing the entries of its file.
+
+        :param changelog: The Changelog, which should match its file.
+        """
+        with trace.span('index_file', releases=len(changelog.releases)):
+            self.remove(changelog.path)
+            for release in changelog.releases:
+                self.add_release(changelog.path, release)
+            self._remember(changelog.path)
+
+    def _remember(self, path: str) -> None:
+        signature = _file_signature(path)
+        if signature is not None:
+            self._signatures[os.path.abspath(path)] = signature
+
+    def update(self, paths: Iterable[str]) -> int:
+        """
+        Index CHANGELOG files that are new or changed since they were indexed. Unchanged files are only checked with a
+        `stat` call, and files that no longer exist are removed from the index.
+
+        :param paths: File system paths of the CHANGELOG files.
+        :raises ChangelogError: If a changed CHANGELOG file cannot be parsed, in which case its entries are left out.
+        :return: Number of files that were indexed again.
+        """
+        indexed = 0
+        for path in paths:
+            path = os.path.abspath(path)
+            signature = _file_signature(path)
+            if signature is not None and signature == self._signatures.get(path):
+                continue
+            self.remove(path)
+            if signature is None:
+                continue
+            with Changelog(path, lazy=True, memory_map=True) as changelog:
+                self.add_changelog(changelog)
+            indexed += 1
+        return indexed
+
+    def bump(self, changelog: Changelog, version: VersionInfo) -> None:
+        """
+        Bump a Changelog, and index its new release. The rest of the file is not indexed again if it was up to date.
+
+        :param changelog: The Changelog to bump.
+        :param version: The version which the CHANGELOG file should be bumped to.
+        """
+        path = os.path.abspath(changelog.path)
+        up_to_date = self._signatures.get(path) == _file_signature(path)
+        changelog.bump(version)
+        if up_to_date:
+            self.add_release(path, changelog.latest_release)
+            self._remember(path)
+        else:
+            self.add_changelog(changelog)
+
+    def search(self, query: str, change_type: str = None, paths: Iterable[str] = None,
+               limit: int = None) -> List[SearchHit]:
+        """
+        Find the change entries containing every word of a query, newest release first.
+
+        Words are matched whole and case insensitively, and each whitespace separated term of the query must also
+        appear as is in the entry, so `CVE-2021-44228` does not match an entry mentioning `CVE-2021-1234` and `44228`.
+
+        :param query: Words to look for, ie. `CVE-2021-44228`.
+        :param change_type: Only match entries of this change type, one of `ReleaseBase.CHANGE_TYPES`.
+        :param paths: Only match entries of these CHANGELOG files.
+        :param limit: Maximum number of hits.
+        :raises ValueError: If the change type is invalid.
+        :return: List of SearchHit.
+        """
+        type_idx = None
+        if change_type is not None:
+            if change_type not in ReleaseBase.CHANGE_TYPES:
+                raise ValueError(f'Invalid change type: {change_type}')
+            type_idx = ReleaseBase.CHANGE_TYPES.index(change_type)
+        path_ids = None if paths is None else {self._path_ids.get(os.path.abspath(p)) for p in paths}
+        terms = [t for t in (_STRIP_RE.sub('', term) for term in query.lower().split()) if t]
+
+        with trace.span('search') as event:
+            postings = [self._posting(token) for token in set(tokenize(query))]
+            if not postings or any(p is None for p in postings):
+                return []
+            postings.sort(key=len)
+            event['args']['candidates'] = len(postings[0])
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+            candidates.difference_update(self._deleted)
+
+            doc_ids = []
+            for doc_id in sorted(candidates):
+                if type_idx is not None and self._doc_types[doc_id] != type_idx or \
+                        path_ids is not None and self._doc_paths[doc_id] not in path_ids:
+                    continue
+                entry = self._doc_entries[doc_id].lower()
+                if all(term in entry for term in terms):
+                    doc_ids.append(doc_id)
+            doc_ids.sort(key=lambda i: -self._doc_dates[i])  # Stable, so entries keep their order within a date
+            if limit is not None:
+                doc_ids = doc_ids[:limit]
+            event['args']['hits'] = len(doc_ids)
+
+        return [
+            SearchHit(self._paths[self._doc_paths[i]], self._versions[self._doc_versions[i]],
+                      date.fromordinal(self._doc_dates[i]), ReleaseBase.CHANGE_TYPES[self._doc_types[i]],
+                      self._doc_entries[i])
+            for i in doc_ids
+        ]
+
+    def _compact(self) -> 'SearchIndex':
+        """Get a copy of the index without removed entries."""
+        compact = SearchIndex()
+        compact._signatures = dict(self._signatures)
+        compact._versions = self._versions
+        compact._version_ids = self._version_ids
+        path_ids = {}
+        for doc_id, entry in enumerate(self._doc_entries):
+            if doc_id in self._deleted:
+                continue
+            path_id = self._doc_paths[doc_id]
+            if path_id not in path_ids:
+                path_ids[path_id] = compact._path_id(self._paths[path_id])
+            new_id = len(compact._doc_entries)
+            compact._doc_paths.append(path_ids[path_id])
+            compact._doc_dates.append(self._doc_dates[doc_id])
+            compact._doc_types.append(self._doc_types[doc_id])
+            compact._doc_versions.append(self._doc_versions[doc_id])
+            compact._doc_entries.append(entry)
+            for token in set(tokenize(entry)):
+                posting = compact._postings.get(token)
+                if posting is None:
+                    posting = compact._postings[token] = array('i')
+                posting.append(new_id)
+        return compact
+
+    def save(self, path: str = None) -> None:
+        """
+        Write the index to a file atomically, leaving out removed entries. The index is not compressed, as it is read
+        on every search and decompressing it takes longer than reading it.
+
+        :param path: File system path of the index file, defaults to `default_index_path()`.
+        """
+        path = path or default_index_path()
+        index = self._compact() if self._deleted else self
+        payload = {
+            'format': INDEX_FORMAT,
+            'paths': index._paths,
+            'signatures': index._signatures,
+            'doc_paths': index._doc_paths.tobytes(),
+            'doc_dates': index._doc_dates.tobytes(),
+            'doc_types': index._doc_types.tobytes(),
+            'doc_versions': index._doc_versions.tobytes(),
+            'versions': index._versions,
+            'doc_entries': index._doc_entries,
+            'postings': {t: p if isinstance(p, bytes) else p.tobytes() for t, p in index._postings.items()},
+        }
+        with trace.span('save_index', entries=len(index)) as event:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with atomic_write(path) as f:
+                f.write(marshal.dumps(payload))
+                event['args']['bytes'] = f.tell()
+        if index is not self:
+            self.__dict__.update(index.__dict__)
+        self._changed = False
+
+    @classmethod
+    def load(cls, path: str = None) -> 'SearchIndex':
+        """
+        Read an index file.
+
+        :param path: File system path of the index file, defaults to `default_index_path()`.
+        :return: The SearchIndex, empty if the file does not exist or is not a valid index.
+        """
+        path = path or default_index_path()
+        index = cls()
+        with trace.span('load_index') as event:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                payload = marshal.loads(data)
+                if payload.get('format') != INDEX_FORMAT:
+                    return index
+                event['args']['bytes'] = len(data)
+                index._paths = payload['paths']
+                index._path_ids = {p: i for i, p in enumerate(index._paths)}
+                index._signatures = {p: tuple(s) for p, s in payload['signatures'].items()}
+                index._doc_paths.frombytes(payload['doc_paths'])
+                index._doc_dates.frombytes(payload['doc_dates'])
+                index._doc_types.frombytes(payload['doc_types'])
+                index._doc_versions.frombytes(payload['doc_versions'])
+                index._versions = payload['versions']
+                index._version_ids = {v: i for i, v in enumerate(index._versions)}
+                index._doc_entries = payload['doc_entries']
+                index._postings = payload['postings']
+            except (OSError, ValueError, EOFError, TypeError, KeyError, AttributeError):
+                return cls()
+        return index
+
+
+def search(query: str, paths: Iterable[str], change_type: str = None, limit: int = None,
+           index_path: str = None) -> List[SearchHit]:
+    """
+    Search the change entries of CHANGELOG files with the persisted index, indexing new and changed files first.
+
+    :param query: Words to look for.
+    :param paths: File system paths of the CHANGELOG files.
+    :param change_type: Only match entries of this change type.
+    :param limit: Maximum number of hits.
+    :param index_path: File system path of the index file, defaults to `default_index_path()`.
+    :raises ChangelogError: If a changed CHANGELOG file cannot be parsed.
+    :return: List of SearchHit, newest release first.
+    """
+    paths = list(paths)
+    index = SearchIndex.load(index_path)
+    try:
+        index.update(paths)
+    finally:
+        if index.changed:
+            try:
+                index.save(index_path)
+            except OSError:  # ie. a read-only cache directory, the index is rebuilt next time
+                pass
+    missing = [p for p in paths if _file_signature(p) is None]
+    if missing:
+        raise ChangelogNotFoundError(path=missing[0])
+    return index.search(query, change_type=change_type, paths=paths, limit=limit)
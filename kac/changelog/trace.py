@@ -0,0 +1,206 @@
+"""
+Opt-in timing of the phases of loading, bumping and rendering CHANGELOG files.
+
+Tracing is off unless a Tracer is enabled, in which case every phase records its duration and the bytes and releases
+it handled. Phases that run once per release, ie. parsing release headings, are summed up rather than recorded one by
+one. Traces can be written as JSON or in the Chrome trace-event format (`chrome://tracing`, Perfetto).
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, TextIO
+
+FORMATS = ('json', 'chrome')
+
+_active: Optional['Tracer'] = None
+
+
+class Tracer:
+    """
+    Records the phases of CHANGELOG operations.
+
+    Attributes:
+        events  Finished spans, in the order they finished. Each is a dict of `name`, `start` and `duration` in
+                seconds, `pid`, `tid` and `args`, with the byte and release counts of the phase.
+        totals  Phases that are summed up, by name. Each is a dict of `count`, `duration` in seconds, and the summed
+                up `args`.
+    """
+
+    def __init__(self, on_event: Callable[[dict], None] = None):
+        """
+        :param on_event: Called with each span as it finishes.
+        """
+        self.on_event = on_event
+        self.events: List[dict] = []
+        self.totals: Dict[str, dict] = {}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'<Tracer of {len(self.events)} events>'
+
+    @contextmanager
+    def span(self, name: str, **args) -> Iterator[dict]:
+        """
+        Time a phase.
+
+        :param name: Name of the phase, ie. `scan`.
+        :param args: Counts of the phase, ie. `bytes=1024`. Counts only known at the end of the phase can be added to
+            the `args` of the yielded event.
+        :return: Context manager yielding the event of the span.
+        """
+        event = {'name': name, 'start': time.perf_counter() - self._origin, 'duration': 0, 'pid': os.getpid(),
+                 'tid': threading.get_ident(), 'args': args}
+        try:
+            yield event
+        finally:
+            event['duration'] = time.perf_counter() - self._origin - event['start']
+            with self._lock:
+                self.events.append(event)
+            if self.on_event is not None:
+                self.on_event(event)
+
+    def add(self, name: str, duration: float, **args: int) -> None:
+        """
+        Add the duration and counts of one run of a phase to its totals.
+
+        :param name: Name of the phase, ie. `parse_heading`.
+        :param duration: Duration of the run in seconds.
+        :param args: Counts of the run, ie. `releases=1`.
+        """
+        with self._lock:
+            total = self.totals.get(name)
+            if total is None:
+                total = self.totals[name] = {'count': 0, 'duration': 0.0, 'args': {}}
+            total['count'] += 1
+            total['duration'] += duration
+            for key, value in args.items():
+                total['args'][key] = total['args'].get(key, 0) + value
+
+    def to_dict(self) -> dict:
+        """
+        Get the trace as plain data, with times in seconds.
+
+        :return: Dictionary of `events` and `totals`.
+        """
+        return {'events': list(self.events), 'totals': dict(self.totals)}
+
+    def to_chrome_trace(self) -> dict:
+        """
+        Get the trace in the Chrome trace-event format, with times in microseconds. Spans are complete (`X`) events,
+        and the totals of summed up phases are kept in `otherData`.
+
+        :return: Dictionary of `traceEvents`, `displayTimeUnit` and `otherData`.
+        """
+        trace_events = [
+            {'name': e['name'], 'cat': 'kac', 'ph': 'X', 'ts': e['start'] * 1e6, 'dur': e['duration'] * 1e6,
+             'pid': e['pid'], 'tid': e['tid'], 'args': e['args']}
+            for e in sorted(self.events, key=lambda e: e['start'])
+        ]
+        totals = {name: dict(total, duration=total['duration'] * 1e6) for name, total in self.totals.items()}
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms', 'otherData': {'totals': totals}}
+
+    def write(self, f: TextIO, output_format: str = 'json') -> None:
+        """
+        Write the trace to a text file.
+
+        :param f: Text file object to write to.
+        :param output_format: One of `FORMATS`.
+        """
+        if output_format not in FORMATS:
+            raise ValueError(f'Invalid trace format: {output_format}')
+        json.dump(self.to_chrome_trace() if output_format == 'chrome' else self.to_dict(), f, indent=2)
+        f.write('\n')
+
+
+class _NullSpan:
+    """Context manager of a span while tracing is off."""
+
+    def __enter__(self):
+        return {'args': {}}
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def active() -> Optional[Tracer]:
+    """
+    Get the enabled Tracer.
+
+    :return: The Tracer, or None if tracing is off.
+    """
+    return _active
+
+
+def enable(tracer: Tracer = None) -> Tracer:
+    """
+    Record the phases of every CHANGELOG operation in the process.
+
+    :param tracer: Tracer to record to, a new one if omitted.
+    :return: The enabled Tracer.
+    """
+    global _active
+    _active = tracer if tracer is not None else Tracer()
+    return _active
+
+
+def disable() -> None:
+    """
+    Stop recording CHANGELOG operations.
+    """
+    global _active
+    _active = None
+
+
+@contextmanager
+def tracing(tracer: Tracer = None) -> Iterator[Tracer]:
+    """
+    Record the phases of CHANGELOG operations within a `with` block. The previously enabled Tracer, if any, is
+    enabled again afterwards.
+
+    :param tracer: Tracer to record to, a new one if omitted.
+    :return: Context manager yielding the enabled Tracer.
+    """
+    global _active
+    previous = _active
+    try:
+        yield enable(tracer)
+    finally:
+        _active = previous
+
+
+def span(name: str, **args):
+    """
+    Time a phase with the enabled Tracer, or do nothing if tracing is off.
+
+    :param name: Name of the phase.
+    :param args: Counts of the phase.
+    :return: Context manager yielding the event of the span.
+    """
+    if _active is None:
+        return _NULL_SPAN
+    return _active.span(name, **args)
+
+
+def traced(name: str) -> Callable:
+    """
+    Decorator that times every call of a function as a phase, if tracing is on.
+
+    :param name: Name of the phase.
+    :return: The decorator.
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return f(*args, **kwargs)
+            with _active.span(name):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,3 +1,9 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+
+
 def rreplace(s: str, old: str, new: str, occurrence: int) -> str:
     """
     Reverse replace.
@@ -8,3 +14,38 @@ def rreplace(s: str, old: str, new: str, occurrence: int) -> str:
     :param occurrence: The number of occurrences of `old` that should be replaced with `new`.
     """
     return new.join(s.rsplit(old, occurrence))
+
+
+@contextmanager
+def atomic_write(path: str) -> Iterator[BinaryIO]:
+    """
+    Open a temporary binary file next to `path` for writing, and atomically replace `path` with it on success.
+
+    The original file is left untouched if writing fails, and its permissions and, where allowed, owner are copied to
+    the new file. A symbolic link is followed, so the file it points to is replaced rather than the link itself.
+
+    :param path: File system path of the file to be replaced.
+    """
+    path = os.path.realpath(path)
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{name}.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            pass
+        else:
+            os.chmod(tmp_path, st.st_mode & 0o7777)
+            if hasattr(os, 'chown'):
+                try:
+                    os.chown(tmp_path, st.st_uid, st.st_gid)
+                except OSError:  # Only the superuser can give a file away
+                    pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,268 @@
+"""
+Packed semver versions.
+
+Versions are kept as plain `(major, minor, patch, prerelease, build)` tuples, and only turned into `VersionInfo` objects
+when they are requested.
+"""
+import re
+from typing import Iterable, List, Optional, Tuple, Union
+
+from semver import VersionInfo
+
+PackedVersion = Tuple[int, int, int, Optional[str], Optional[str]]
+
+# Semantic Versioning 2.0.0 regex, equivalent to the one VersionInfo.parse uses
+_SEMVER_RE = re.compile(
+    r"""
+    ^
+    (?P<major>0|[1-9]\d*)
+    \.
+    (?P<minor>0|[1-9]\d*)
+    \.
+    (?P<patch>0|[1-9]\d*)
+    (?:-(?P<prerelease>
+        (?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)
+        (?:\.(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*
+    ))?
+    (?:\+(?P<build>
+        [0-9a-zA-Z-]+
+        (?:\.[0-9a-zA-Z-]+)*
+    ))?
+    $
+    """,
+    re.VERBOSE,
+)
+
+
+# Bounded caches shared by every CHANGELOG file, since the same versions (`0.1.0`, `1.0.0`, ...) appear in most of them.
+# Once a cache is full, versions that are not in it yet are still parsed or formatted, just not kept.
+_VERSION_CACHE_SIZE = 4096
+_parsed = {}
+_formatted = {}
+_unpacked = {}
+
+# Plain `MAJOR.MINOR.PATCH` versions, which most release headings are, matched without the full semver regex
+_PLAIN_RE = re.compile(r'(0|[1-9][0-9]*)\.(0|[1-9][0-9]*)\.(0|[1-9][0-9]*)\Z')
+
+
+def _parse(version: str) -> PackedVersion:
+    """Parse a version string, trying the plain `MAJOR.MINOR.PATCH` form before the full semver regex."""
+    m = _PLAIN_RE.match(version)
+    if m is not None:
+        major, minor, patch = m.groups()
+        return int(major), int(minor), int(patch), None, None
+    m = _SEMVER_RE.match(version)
+    if m is None:
+        raise ValueError(f'{version} is not valid SemVer string')
+    major, minor, patch, prerelease, build = m.groups()
+    return int(major), int(minor), int(patch), prerelease, build
+
+
+def parse(version: str) -> PackedVersion:
+    """
+    Parse a semver version string into a packed version, without creating a VersionInfo.
+
+    Parsed versions are interned, so every CHANGELOG file shares the same tuple for the same version string, and their
+    formatted strings are cached along with them.
+
+    :param version: Version string, ie. `1.0.0-rc.1+build.2`.
+    :raises ValueError: If the version string is not a valid semver version.
+    :return: Packed version tuple.
+    """
+    packed = _parsed.get(version)
+    if packed is None:
+        packed = _parse(version)
+        if len(_parsed) < _VERSION_CACHE_SIZE:
+            _parsed[version] = packed
+            format_version(packed)
+    return packed
+
+
+def parse_versions(versions: Iterable[str]) -> List[PackedVersion]:
+    """
+    Parse many semver version strings at once, ie. the versions of every release heading of a CHANGELOG file.
+
+    :param versions: Version strings.
+    :raises ValueError: If a version string is not a valid semver version.
+    :return: List of packed version tuples, in the same order.
+    """
+    cached = _parsed.get
+    return [cached(version) or parse(version) for version in versions]
+
+
+def pack(version: Union[VersionInfo, tuple]) -> PackedVersion:
+    """
+    Pack a VersionInfo into a plain tuple.
+
+    :param version: VersionInfo instance, or an already packed version.
+    :return: Packed version tuple.
+    """
+    if isinstance(version, VersionInfo):
+        return version.major, version.minor, version.patch, version.prerelease, version.build
+    major, minor, patch, prerelease, build = version
+    return major, minor, patch, prerelease, build
+
+
+def unpack(version: PackedVersion) -> VersionInfo:
+    """
+    Create a VersionInfo from a packed version.
+
+    :param version: Packed version tuple.
+    :return: VersionInfo instance, shared with every other caller that unpacks the same version.
+    """
+    info = _unpacked.get(version)
+    if info is None:
+        info = VersionInfo(*version)
+        if len(_unpacked) < _VERSION_CACHE_SIZE:
+            _unpacked[version] = info
+    return info
+
+
+def format_version(version: PackedVersion) -> str:
+    """
+    Format a packed version the way `str(VersionInfo)` does.
+
+    :param version: Packed version tuple.
+    :return: Version string.
+    """
+    text = _formatted.get(version)
+    if text is not None:
+        return text
+    major, minor, patch, prerelease, build = version
+    text = f'{major}.{minor}.{patch}'
+    if prerelease:
+        text += f'-{prerelease}'
+    if build:
+        text += f'+{build}'
+    if len(_formatted) < _VERSION_CACHE_SIZE:
+        _formatted[version] = text
+    return text
+
+
+def precedence_key(version: PackedVersion) -> tuple:
+    """
+    Get a sort key that orders packed versions by semver precedence. Build metadata is ignored.
+
+    :param version: Packed version tuple.
+    :return: Tuple that compares the way the versions do.
+    """
+    major, minor, patch, prerelease, _ = version
+    if not prerelease:
+        return major, minor, patch, 1, ()
+    # Numeric identifiers sort numerically and before alphanumeric ones, and fewer identifiers sort first
+    identifiers = tuple((0, int(part), '') if part.isdigit() else (1, 0, part) for part in prerelease.split('.'))
+    return major, minor, patch, 0, identifiers
+
+
+def coerce(version: Union[str, VersionInfo, tuple]) -> PackedVersion:
+    """
+    Get a packed version from a version string (with or without a leading `v`), VersionInfo, or packed version.
+
+    :param version: The version to pack.
+    :raises ValueError: If a version string is not a valid semver version.
+    :return: Packed version tuple.
+    """
+    if isinstance(version, str):
+        return parse(version[1:] if version.startswith('v') else version)
+    return pack(version)
+
+
+# Candidate bumps returned by `next_versions`, in order
+CANDIDATES = ('patch', 'minor', 'major', 'prerelease', 'build', 'prerelease_build')
+
+# Last run of digits in a prerelease or build string, the same regex VersionInfo uses
+_LAST_NUMBER = re.compile(r'(?:[^\d]*(\d+)[^\d]*)+')
+
+
+def _increment_string(string: str) -> str:
+    """Increment the last number in a string, keeping leading zeros the way `VersionInfo._increment_string` does."""
+    match = _LAST_NUMBER.search(string)
+    if match:
+        next_ = str(int(match.group(1)) + 1)
+        start, end = match.span(1)
+        string = string[:max(end - len(next_), start)] + next_ + string[end:]
+    return string
+
+
+def _first_increment(token: str, default: str) -> str:
+    """Get the prerelease or build string of the first bump, ie. `rc.1`."""
+    return _increment_string(f'{token or default}.0')
+
+
+def _next_versions(version: PackedVersion, first_prerelease: str, first_build: str) -> Tuple[PackedVersion, ...]:
+    major, minor, patch, prerelease, build = version
+    next_prerelease = _increment_string(prerelease) if prerelease else first_prerelease
+    return (
+        (major, minor, patch + 1, None, None),
+        (major, minor + 1, 0, None, None),
+        (major + 1, 0, 0, None, None),
+        (major, minor, patch, next_prerelease, None),
+        (major, minor, patch, prerelease, _increment_string(build) if build else first_build),
+        (major, minor, patch, next_prerelease, first_build),  # Bumping the prerelease drops the build
+    )
+
+
+def next_versions(version: PackedVersion, prerelease_token: str = 'rc',
+                  build_token: str = 'build') -> Tuple[PackedVersion, ...]:
+    """
+    Get every candidate bump of a packed version in one pass, in `CANDIDATES` order. Equivalent to `bump_patch()`,
+    `bump_minor()`, `bump_major()`, `bump_prerelease(prerelease_token)`, `bump_build(build_token)` and
+    `bump_prerelease(prerelease_token).bump_build(build_token)` of a VersionInfo.
+
+    :param version: Packed version tuple.
+    :param prerelease_token: String to identify prerelease versions, defaults to `rc`.
+    :param build_token: String to identify build versions, defaults to `build`.
+    :return: Tuple of packed candidate versions.
+    """
+    return _next_versions(version, _first_increment(prerelease_token, 'rc'), _first_increment(build_token, 'build'))
+
+
+def next_versions_many(versions: Iterable[Union[str, VersionInfo, tuple]], prerelease_token: str = 'rc',
+                       build_token: str = 'build') -> List[Tuple[PackedVersion, ...]]:
+    """
+    Get the candidate bumps of many versions at once, ie. the latest versions of many CHANGELOG files.
+
+    :param versions: Version strings, VersionInfo instances or packed versions.
+    :param prerelease_token: String to identify prerelease versions, defaults to `rc`.
+    :param build_token: String to identify build versions, defaults to `build`.
+    :raises ValueError: If a version string is not a valid semver version.
+    :return: One row of packed candidate versions per version, in `CANDIDATES` order.
+    """
+    first_prerelease = _first_increment(prerelease_token, 'rc')
+    first_build = _first_increment(build_token, 'build')
+    return [_next_versions(coerce(version), first_prerelease, first_build) for version in versions]
+
+
+def next_version(version: PackedVersion, bump_type: str, prerelease_token: str = 'rc',
+                 build_token: str = 'build') -> PackedVersion:
+    """
+    Get the next packed version for a version part, equivalent to `VersionInfo.next_version`, and to `bump_build` for
+    the `build` part.
+
+    :param version: Packed version tuple.
+    :param bump_type: The version part to be bumped, one of `major`, `minor`, `patch`, `prerelease` or `build`.
+    :param prerelease_token: String to identify prerelease versions, defaults to `rc`.
+    :param build_token: String to identify build versions, defaults to `build`.
+    :raises ValueError: If the version part is not valid.
+    :return: Packed version tuple of the next version.
+    """
+    major, minor, patch, prerelease, build = version
+    if bump_type == 'build':
+        build = _increment_string(build) if build else _first_increment(build_token, 'build')
+        return major, minor, patch, prerelease, build
+    if bump_type not in ('major', 'minor', 'patch', 'prerelease'):
+        raise ValueError(f'Invalid part. Expected one of major, minor, patch, prerelease or build, but got '
+                         f'{bump_type!r}')
+    # A prerelease of the next patch, minor or major version is released by dropping its prerelease
+    if (prerelease or build) and (bump_type == 'patch' or (bump_type == 'minor' and patch == 0)
+                                  or (bump_type == 'major' and minor == patch == 0)):
+        return major, minor, patch, None, None
+    if bump_type == 'major':
+        return major + 1, 0, 0, None, None
+    if bump_type == 'minor':
+        return major, minor + 1, 0, None, None
+    if bump_type == 'patch':
+        return major, minor, patch + 1, None, None
+    if prerelease:
+        return major, minor, patch, _increment_string(prerelease), None
+    return major, minor, patch + 1, _first_increment(prerelease_token, 'rc'), None
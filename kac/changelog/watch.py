@@ -0,0 +1,101 @@
+import os
+import threading
+from typing import Callable, Optional, Tuple
+
+from .changelog import Changelog
+from .exceptions import ChangelogError
+
+
+def _file_stat(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:  # ie. in the middle of an editor's save
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class ChangelogWatcher:
+    """
+    Keeps a Changelog up to date with its file, by polling the file and refreshing the Changelog in place when it
+    changes. Only the sections of the file that were edited are parsed again.
+    """
+
+    def __init__(self, path: str, interval: float = 0.2, lazy: bool = True,
+                 on_change: Callable[[Changelog], None] = None, on_error: Callable[[ChangelogError], None] = None):
+        """
+        :param path: The full file system path of the CHANGELOG file.
+        :param interval: Seconds between polls of the file.
+        :param lazy: Only parse each release on first access.
+        :param on_change: Called with the Changelog after it was refreshed.
+        :param on_error: Called with the error if the edited file is invalid, in which case the Changelog keeps its
+            previous state. Errors are raised from `poll` if omitted.
+
+        Attributes:
+            changelog   The Changelog that is kept up to date.
+        """
+        self._stat = _file_stat(path)
+        self.changelog = Changelog(path, lazy=lazy)
+        self.interval = interval
+        self.on_change = on_change
+        self.on_error = on_error
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __repr__(self):
+        return f'<ChangelogWatcher {self.changelog.path}>'
+
+    def poll(self) -> bool:
+        """
+        Refresh the Changelog if its file changed since the last poll.
+
+        :raises ChangelogError: If the edited file is invalid and there is no `on_error` callback.
+        :return: Whether the Changelog was refreshed.
+        """
+        stat = _file_stat(self.changelog.path)
+        if stat is None or stat == self._stat:
+            return False
+        self._stat = stat
+        try:
+            changed = self.changelog.refresh()
+        except ChangelogError as e:
+            if self.on_error is None:
+                raise
+            self.on_error(e)
+            return False
+        if changed and self.on_change is not None:
+            self.on_change(self.changelog)
+        return changed
+
+    def watch(self) -> None:
+        """
+        Poll the file until `stop` is called.
+        """
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(self.interval)
+
+    def start(self) -> 'ChangelogWatcher':
+        """
+        Watch the file in a background thread.
+
+        :return: The watcher itself.
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.watch, name=f'kac-watch-{self.changelog.path}', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop watching the file, waiting for the background thread if there is one.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
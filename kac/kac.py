@@ -1,59 +1,148 @@
+import functools
+import glob
+import json
 import os
-from datetime import date
 
 import click
-import pyperclip
-import questionary
-from jinja2 import Environment, PackageLoader
-from semver import VersionInfo
 
-from .changelog import Changelog
 from .util import get_first_git_remote
 
+# The CHANGELOG library (and semver), and heavier dependencies (pyperclip, questionary, jinja2, and the process pool
+# used by `bump-all`) are imported inside the commands that use them, so that every invocation of `kac`, ie. for
+# `--help`, does not pay for all of them. The option defaults and choices below are copies of the library's own
+# `Changelog.default_file_name`, `Changelog.BUMP_TYPES` and `ReleaseBase.CHANGE_TYPES`.
+DEFAULT_FILE_NAME = 'CHANGELOG.md'
+BUMP_TYPES = ('major', 'minor', 'patch', 'prerelease', 'build')
+CHANGE_TYPES = ('added', 'changed', 'deprecated', 'fixed', 'removed', 'security')
+
+
+def _expand_patterns(patterns) -> list:
+    """Expand CHANGELOG file paths and globs into a list of paths."""
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            paths.append(pattern)
+    return paths
+
+
+def _abort_on_changelog_error(f):
+    """Report CHANGELOG errors raised by a command, and abort it."""
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        from .changelog import ChangelogError
+
+        try:
+            return f(*args, **kwargs)
+        except ChangelogError as e:
+            click.echo(str(e))
+            raise click.Abort
+    return wrapper
+
+
+def _write_profile(tracer, path: str, output_format: str) -> None:
+    """Write the trace of a command to a file, or to stderr for `-`."""
+    if path == '-':
+        tracer.write(click.get_text_stream('stderr'), output_format)
+        return
+    with open(path, 'w') as f:
+        tracer.write(f, output_format)
+
 
 @click.group()
-def cli():
+@click.option('--profile', 'profile', help='Write the timings of each phase of the command to a file, or to stderr for '
+                                           '`-`.', envvar='KAC_PROFILE', type=click.Path(dir_okay=False))
+@click.option('--profile-format', 'profile_format', help='`json` or the Chrome trace-event format.', default='json',
+              envvar='KAC_PROFILE_FORMAT', type=click.Choice(choices=['json', 'chrome']), show_default=True)
+@click.pass_context
+def cli(ctx, profile, profile_format):
     """
     Python and  CLI tool for CHANGELOG files that follow the Keep a Changelog standard.
     """
-    pass
+    if not profile:
+        return
+    from .changelog import trace
+
+    tracer = trace.enable()
+    ctx.call_on_close(functools.partial(_write_profile, tracer, profile, profile_format))
+    ctx.call_on_close(trace.disable)
+    ctx.with_resource(tracer.span(f'kac {ctx.invoked_subcommand}'))
 
 
 @cli.command()
 @click.option('-f', '--filename', 'filename', help='The filename of the CHANGELOG file to be created.',
-              default=Changelog.default_file_name,
+              default=DEFAULT_FILE_NAME,
               type=click.Path(exists=True, dir_okay=False, writable=True, resolve_path=True), show_default=True)
-def copy(filename):
+@click.option('--json', 'as_json', help='Write the release and its text as JSON.', is_flag=True)
+@click.option('--dry-run', 'dry_run', help='Write the release text instead of copying it to the clipboard.',
+              is_flag=True)
+@_abort_on_changelog_error
+def copy(filename, as_json, dry_run):
     """Copy the latest release's changelog text."""
-    changelog = Changelog(filename)
-    pyperclip.copy(changelog.latest_release.changes_text)
-    click.echo(f'v{changelog.latest_version} release text copied to clipboard!')
+    from .changelog import Changelog, ChangelogError
+    from .serve import ERROR, SKIPPED, copy_record, error_record
+
+    if as_json:
+        try:
+            record = copy_record(filename, Changelog.read_latest_release(filename), dry_run)
+        except ChangelogError as e:
+            record = error_record(filename, e)
+        click.echo(json.dumps(record, indent=2))
+        if record['status'] == ERROR:
+            click.get_current_context().exit(1)
+        return
+
+    record = copy_record(filename, Changelog.read_latest_release(filename), dry_run)
+    if record['status'] in (SKIPPED, ERROR):
+        click.echo(record['message'])
+        raise click.Abort
+    if dry_run:
+        click.echo(record['text'], nl=False)
+    else:
+        click.echo(f'v{record["version"]} release text copied to clipboard!')
 
 
 @cli.command()
 @click.option('-f', '--filename', 'filename', help='The filename of the CHANGELOG file to be bumped.',
-              default=Changelog.default_file_name,
+              default=DEFAULT_FILE_NAME,
               type=click.Path(exists=True, dir_okay=False, writable=True, resolve_path=True), show_default=True)
 @click.option('--pre-release', 'prerelease', help='The prerelease identifier token.', default='rc',
               type=click.STRING, show_default=True)
 @click.option('--build', 'build', help='The build identifier token.', default='build', type=click.STRING,
               show_default=True)
 @click.option('-t', '--type', 'bump_type', help='The version part to be bumped.',
-              type=click.Choice(choices=['major', 'minor', 'patch', 'prerelease', 'build']))
-def bump(filename, build, prerelease, bump_type):
+              type=click.Choice(choices=BUMP_TYPES))
+@click.option('--json', 'as_json', help='Write the candidate versions, the new version and the diff as JSON, without '
+                                        'prompting. Only the candidate versions are written without --type.',
+              is_flag=True)
+@click.option('--dry-run', 'dry_run', help='Write the diff of the bump instead of bumping.', is_flag=True)
+@_abort_on_changelog_error
+def bump(filename, build, prerelease, bump_type, as_json, dry_run):
     """Bump the latest version of a CHANGELOG file."""
+    from .changelog import Changelog, ChangelogError
+    from .serve import ERROR, bump_record, error_record
+
+    if as_json:
+        try:
+            record = bump_record(Changelog(filename), bump_type, prerelease, build, dry_run)
+        except ChangelogError as e:
+            record = error_record(filename, e)
+        click.echo(json.dumps(record, indent=2))
+        if record['status'] == ERROR:
+            click.get_current_context().exit(1)
+        return
+
     changelog = Changelog(filename)
     if not changelog.unreleased.has_changes:
         click.echo('CHANGELOG has no unreleased changes.')
         raise click.Abort
 
     if bump_type:
-        # `build` token currently not supported by VersionInfo.next_version
-        if bump_type == 'build':
-            new_version = changelog.latest_version.bump_build(build)
-        else:
-            new_version = changelog.latest_version.next_version(bump_type, prerelease_token=prerelease)
+        new_version = changelog.get_next_version(bump_type, prerelease, build)
     else:
+        import questionary
+
         available_versions = changelog.get_next_versions(prerelease, build)
         # Ask user to select new version
         new_v_num: str = questionary.select(
@@ -63,63 +152,315 @@ def bump(filename, build, prerelease, bump_type):
         if new_v_num is None:
             raise click.Abort
         new_version = available_versions[new_v_num]
-        # Confirm selected new version
-        should_bump: bool = questionary.confirm(message=f'Bump Changelog to v{new_version}?').ask()
+        # Confirm selected new version, unless nothing is written
+        should_bump: bool = dry_run or questionary.confirm(message=f'Bump Changelog to v{new_version}?').ask()
         # Bump or end
         if not should_bump:
             raise click.Abort
 
+    if dry_run:
+        click.echo(changelog.bump_diff(new_version), nl=False)
+        return
     changelog.bump(new_version)
     click.echo(f'Bumped to v{new_version}!')
 
 
+@cli.command('bump-all')
+@click.argument('patterns', nargs=-1, required=True)
+@click.option('-t', '--type', 'bump_type', help='The version part to be bumped.', required=True,
+              type=click.Choice(choices=BUMP_TYPES))
+@click.option('--pre-release', 'prerelease', help='The prerelease identifier token.', default='rc',
+              type=click.STRING, show_default=True)
+@click.option('--build', 'build', help='The build identifier token.', default='build', type=click.STRING,
+              show_default=True)
+@click.option('-w', '--workers', 'workers', help='Number of worker processes, defaults to the number of CPUs.',
+              type=click.IntRange(min=1))
+@click.option('--format', 'output_format', help='Output format for the per-file results.', default='table',
+              type=click.Choice(choices=['table', 'json']), show_default=True)
+def bump_all(patterns, bump_type, prerelease, build, workers, output_format):
+    """
+    Bump many CHANGELOG files at once.
+
+    PATTERNS are CHANGELOG file paths or globs, ie. `packages/*/CHANGELOG.md`. Files without unreleased changes are
+    skipped.
+    """
+    paths = _expand_patterns(patterns)
+    if not paths:
+        click.echo('No CHANGELOG files found.')
+        raise click.Abort
+
+    from .changelog.batch import ERROR, bump_many
+
+    results = bump_many([os.path.abspath(p) for p in paths], bump_type, prerelease, build, workers=workers)
+    if output_format == 'json':
+        click.echo(json.dumps([r._asdict() for r in results], indent=2))
+    else:
+        rows = [('PATH', 'STATUS', 'FROM', 'TO')] + [
+            (r.path, r.status, r.previous_version or '', r.new_version or r.message) for r in results
+        ]
+        widths = [max(len(row[col]) for row in rows) for col in range(3)]
+        for row in rows:
+            click.echo('  '.join(cell.ljust(width) for cell, width in zip(row, widths)) + f'  {row[3]}'.rstrip())
+
+    if any(r.status == ERROR for r in results):
+        click.get_current_context().exit(1)
+
+
 @cli.command()
-@click.option('-f', '--filename', 'filename', help='The filename of the CHANGELOG file to be created.',
-              default=Changelog.default_file_name, type=click.Path(dir_okay=False, writable=True, resolve_path=True),
+@click.option('--max-files', 'max_files', help='Number of parsed CHANGELOG files kept in memory.', default=128,
+              type=click.IntRange(min=1), show_default=True)
+def serve(max_files):
+    """
+    Answer JSON Lines bump and copy requests from stdin.
+
+    Results are written to stdout, one JSON object per line.
+
+    Each request is an object with a `command` (`bump` or `copy`), a `path` defaulting to `CHANGELOG.md`, and the
+    options of the command: `type`, `prerelease`, `build` and `dry_run`. Results are the records of `bump --json` and
+    `copy --json`, with the `id` of the request if it had one. Parsed CHANGELOG files are kept in memory between
+    requests, and only parsed again when they change.
+    """
+    from .serve import Server
+
+    Server(max_files).serve(click.get_text_stream('stdin'), click.get_text_stream('stdout'))
+
+
+@cli.command()
+@click.option('-f', '--filename', 'filename', help='The filename of the CHANGELOG file to be watched.',
+              default=DEFAULT_FILE_NAME,
+              type=click.Path(exists=True, dir_okay=False, resolve_path=True), show_default=True)
+@click.option('-i', '--interval', 'interval', help='Seconds between checks of the file.', default=0.2,
+              type=click.FloatRange(min=0.01), show_default=True)
+@_abort_on_changelog_error
+def watch(filename, interval):
+    """Re-parse a CHANGELOG file whenever it is saved."""
+    import time
+    from .changelog.watch import ChangelogWatcher
+
+    def describe(changelog):
+        latest = f', latest v{changelog.latest_version}' if changelog.releases else ''
+        return f'{len(changelog.releases)} releases{latest}, ' \
+               f'{sum(len(c) for c in changelog.unreleased.changes.values())} unreleased changes'
+
+    def on_change(changelog):
+        click.echo(f'Updated in {(time.perf_counter() - polled) * 1000:.1f} ms: {describe(changelog)}')
+
+    def on_error(error):
+        click.echo(f'Error: {error}')
+
+    watcher = ChangelogWatcher(filename, interval=interval, on_change=on_change, on_error=on_error)
+    click.echo(f'Watching {filename}: {describe(watcher.changelog)}')
+    try:
+        while True:
+            polled = time.perf_counter()
+            watcher.poll()
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+
+@cli.command()
+@click.argument('patterns', nargs=-1)
+@click.option('-o', '--output', 'output', help='File to write the export to.', default='-', type=click.File('w'),
               show_default=True)
-def init(filename):
-    """Create an empty CHANGELOG file."""
-    # Check if the file already exists
-    if os.path.isfile(filename):
-        click.echo(f'The CHANGELOG file already exists!')
+@click.option('--format', 'output_format', help='`jsonl` writes one release per line, `columns` writes one batch of '
+                                                'columns per line with a row per change entry.',
+              default='jsonl', type=click.Choice(choices=['jsonl', 'columns']), show_default=True)
+@click.option('--batch-size', 'batch_size', help='Maximum number of rows per batch of columns.', default=65536,
+              type=click.IntRange(min=1), show_default=True)
+@_abort_on_changelog_error
+def export(patterns, output, output_format, batch_size):
+    """
+    Export the releases of CHANGELOG files.
+
+    PATTERNS are CHANGELOG file paths or globs, ie. `packages/*/CHANGELOG.md`, and default to `CHANGELOG.md`. Releases
+    are streamed one at a time, newest to oldest.
+    """
+    from .changelog.export import iter_batches, write_jsonl
+
+    paths = _expand_patterns(patterns or [DEFAULT_FILE_NAME])
+    if not paths:
+        click.echo('No CHANGELOG files found.')
         raise click.Abort
-    # Ask the user for the initial version of their project
-    first_v_num: str = questionary.text(
-        message='Enter your first version number',
-        default='0.0.1'
-    ).ask()
-    if first_v_num is None:
+    if output_format == 'jsonl':
+        write_jsonl(paths, output)
+        return
+    for batch in iter_batches(paths, batch_size):
+        output.write(json.dumps({name: list(column) for name, column in batch.items()}) + '\n')
+
+
+@cli.command()
+@click.argument('patterns', nargs=-1)
+@click.option('--since', 'since', help='Leave out releases older than this date.', type=click.DateTime(['%Y-%m-%d']))
+@click.option('--until', 'until', help='Leave out releases newer than this date.', type=click.DateTime(['%Y-%m-%d']))
+@click.option('-n', '--limit', 'limit', help='Maximum number of releases.', type=click.IntRange(min=0))
+@click.option('--format', 'output_format', help='`text` writes one line per release, `jsonl` one JSON record per '
+                                                'release with its changes.',
+              default='text', type=click.Choice(choices=['text', 'jsonl']), show_default=True)
+@_abort_on_changelog_error
+def feed(patterns, since, until, limit, output_format):
+    """
+    List the releases of many CHANGELOG files, newest first.
+
+    PATTERNS are CHANGELOG file paths or globs, ie. `packages/*/CHANGELOG.md`, and default to `CHANGELOG.md`. Files are
+    merged by release date, and only read as far back as the feed goes.
+    """
+    from .changelog.export import release_to_dict
+    from .changelog.feed import iter_feed
+    from .changelog.version import format_version
+
+    paths = _expand_patterns(patterns or [DEFAULT_FILE_NAME])
+    if not paths:
+        click.echo('No CHANGELOG files found.')
+        raise click.Abort
+    for item in iter_feed(paths, since=since and since.date(), until=until and until.date(), limit=limit):
+        if output_format == 'jsonl':
+            click.echo(json.dumps(dict(release_to_dict(item.release), path=item.path)))
+        else:
+            click.echo(f'{item.release_date}  v{format_version(item.release.packed_version)}  {item.path}')
+
+
+@cli.command()
+@click.argument('query')
+@click.argument('patterns', nargs=-1)
+@click.option('-t', '--type', 'change_type', help='Only match entries of this change type.',
+              type=click.Choice(choices=CHANGE_TYPES))
+@click.option('-n', '--limit', 'limit', help='Maximum number of entries.', type=click.IntRange(min=0))
+@click.option('--index', 'index_path', help='The search index file, defaults to `search.idx` in the CHANGELOG cache '
+                                            'directory.', type=click.Path(dir_okay=False))
+@click.option('--format', 'output_format', help='`text` writes one line per entry, `jsonl` one JSON record per entry.',
+              default='text', type=click.Choice(choices=['text', 'jsonl']), show_default=True)
+@_abort_on_changelog_error
+def search(query, patterns, change_type, limit, index_path, output_format):
+    """
+    Search the change entries of CHANGELOG files.
+
+    QUERY is matched against whole words, case insensitively, ie. `CVE-2021-44228`. PATTERNS are CHANGELOG file paths
+    or globs, ie. `packages/*/CHANGELOG.md`, and default to `CHANGELOG.md`. The entries are indexed on first use, and
+    files are only indexed again once they change.
+    """
+    from .changelog.search import search as search_entries
+
+    paths = _expand_patterns(patterns or [DEFAULT_FILE_NAME])
+    if not paths:
+        click.echo('No CHANGELOG files found.')
         raise click.Abort
+    given = {os.path.abspath(p): p for p in paths}
+    for hit in search_entries(query, paths, change_type=change_type, limit=limit, index_path=index_path):
+        path = given.get(hit.path, hit.path)
+        if output_format == 'jsonl':
+            click.echo(json.dumps(dict(hit._asdict(), path=path, release_date=hit.release_date.isoformat())))
+        else:
+            click.echo(f'{hit.release_date}  v{hit.version}  {hit.change_type}  {path}: {hit.entry}')
+
+
+@cli.command()
+@click.option('-r', '--releases', 'sizes', help='Number of releases in a generated CHANGELOG, can be repeated.  '
+                                                '[default: 1, 1000, 100000, 1000000]',
+              type=click.IntRange(min=1), multiple=True)
+@click.option('-o', '--operation', 'operations', help='Operation to benchmark, can be repeated.  [default: all]',
+              type=click.Choice(choices=['parse', 'parse_lazy', 'copy', 'bump']), multiple=True)
+@click.option('-e', '--entries', 'entries', help='Number of change entries per release.', default=3,
+              type=click.IntRange(min=0), show_default=True)
+@click.option('--line-length', 'line_length', help='Length of each change entry.', default=60,
+              type=click.IntRange(min=1), show_default=True)
+@click.option('--prerelease-ratio', 'prerelease_ratio', help='Fraction of prerelease versions.', default=0.0,
+              type=click.FloatRange(0, 1), show_default=True)
+@click.option('--build-ratio', 'build_ratio', help='Fraction of versions with build metadata.', default=0.0,
+              type=click.FloatRange(0, 1), show_default=True)
+@click.option('--format', 'output_format', help='Output format for the results.', default='table',
+              type=click.Choice(choices=['table', 'json']), show_default=True)
+def bench(sizes, operations, entries, line_length, prerelease_ratio, build_ratio, output_format):
+    """Benchmark parse, bump and copy on generated CHANGELOG files."""
+    from .bench import DEFAULT_SIZES, OPERATIONS, run_benchmarks
+
+    results = run_benchmarks(sizes or DEFAULT_SIZES, operations or OPERATIONS, entries=entries,
+                             line_length=line_length, prerelease_ratio=prerelease_ratio, build_ratio=build_ratio)
+    if output_format == 'json':
+        click.echo(json.dumps(results, indent=2))
+        return
+    click.echo(f'{"OPERATION":<12}{"RELEASES":>10}{"SIZE (MB)":>12}{"SECONDS":>12}{"MB/S":>10}{"PEAK MEM (MB)":>15}')
+    for r in results:
+        click.echo(f'{r["operation"]:<12}{r["releases"]:>10}{r["bytes"] / 1e6:>12.2f}{r["seconds"]:>12.4f}'
+                   f'{r["mb_per_second"] or 0:>10.1f}{r["peak_memory"] / 1e6:>15.2f}')
+
+
+def _parse_initial_version(version_number: str):
+    from semver import VersionInfo
+
     # Remove leading `v` if it exists
-    if first_v_num[0] == 'v':
-        first_v_num = first_v_num[1:]
+    if version_number[:1] == 'v':
+        version_number = version_number[1:]
     # Try to parse version using semver lib
     try:
-        version = VersionInfo.parse(first_v_num)
+        return VersionInfo.parse(version_number)
     except ValueError:
-        click.echo(f'Invalid Semantic Version number: {first_v_num}')
+        click.echo(f'Invalid Semantic Version number: {version_number}')
         raise click.Abort
 
-    # Ask the user for their GitHub repository URL
-    github_repo_url: str = questionary.text(
-        message='Enter Repository URL',
-        default=get_first_git_remote() or 'https://github.com/atwalsh/kac',
-    ).ask()
-    if github_repo_url is None:
+
+@cli.command()
+@click.argument('paths', nargs=-1, type=click.Path(dir_okay=False, writable=True, resolve_path=True))
+@click.option('-f', '--filename', 'filename', help='The filename of the CHANGELOG file to be created, if no PATHS are '
+                                                   'given.',
+              default=DEFAULT_FILE_NAME, type=click.Path(dir_okay=False, writable=True, resolve_path=True),
+              show_default=True)
+@click.option('--version', 'version_number', help='The first version number, prompted for if omitted.')
+@click.option('--repo-url', 'repo_url', help='The repository URL, prompted for if omitted.')
+def init(paths, filename, version_number, repo_url):
+    """
+    Create an empty CHANGELOG file.
+
+    PATHS are the CHANGELOG files to be created, all from the same version and repository URL. Files that already
+    exist are left as they are.
+    """
+    from .render import render_changelog
+
+    paths = paths or (filename,)
+    # Check if the file already exists
+    if len(paths) == 1 and os.path.isfile(paths[0]):
+        click.echo(f'The CHANGELOG file already exists!')
         raise click.Abort
 
-    # Load the CHANGELOG template
-    env = Environment(loader=PackageLoader('kac', 'templates'), )
-    changelog_template = env.get_template('CHANGELOG.md')
-    # Render the template with user input
-    new_file_text = changelog_template.render(initial_release=version, repo_url=github_repo_url,
-                                              initial_release_date=date.today())
+    if version_number is None:
+        import questionary
 
-    # Write the new CHANGELOG file
-    try:
-        with click.open_file(filename, 'x') as f:  # `x` mode will fail to open if file exists
-            f.write(new_file_text)
-            click.echo(f'Created CHANGELOG file at: {filename}')
-    except FileExistsError:
-        click.echo('The CHANGELOG file already exists!')
+        # Ask the user for the initial version of their project
+        version_number = questionary.text(
+            message='Enter your first version number',
+            default='0.0.1'
+        ).ask()
+        if version_number is None:
+            raise click.Abort
+    version = _parse_initial_version(version_number)
+
+    if repo_url is None:
+        import questionary
+
+        # Ask the user for their GitHub repository URL
+        repo_url = questionary.text(
+            message='Enter Repository URL',
+            default=get_first_git_remote() or 'https://github.com/atwalsh/kac',
+        ).ask()
+        if repo_url is None:
+            raise click.Abort
+
+    # Render the template once, every file gets the same text
+    new_file_text = render_changelog(version, repo_url)
+
+    # Write the new CHANGELOG files
+    failed = False
+    for path in paths:
+        try:
+            with click.open_file(path, 'x') as f:  # `x` mode will fail to open if file exists
+                f.write(new_file_text)
+                click.echo(f'Created CHANGELOG file at: {path}')
+        except FileExistsError:
+            click.echo('The CHANGELOG file already exists!' if len(paths) == 1 else
+                       f'The CHANGELOG file already exists: {path}')
+            failed = True
+        except OSError as e:
+            click.echo(f'Unable to create CHANGELOG file at {path}: {e.strerror}')
+            failed = True
+    if failed:
         raise click.Abort
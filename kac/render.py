@@ -0,0 +1,74 @@
+"""
+Rendering of the templates in `kac/templates`.
+
+The Jinja environment is created once per process and its templates are compiled once. The compiled bytecode is also
+cached on disk, so later processes load the templates without compiling them again.
+"""
+import os
+from datetime import date
+from typing import Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, PackageLoader, Template
+from semver import VersionInfo
+
+from .changelog import trace
+from .changelog.cache import default_cache_dir
+
+_environment: Optional[Environment] = None
+
+
+def template_cache_dir() -> str:
+    """
+    Get the directory compiled templates are cached in: `templates` in the CHANGELOG cache directory.
+
+    :return: File system path of the cache directory.
+    """
+    return os.path.join(default_cache_dir(), 'templates')
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    directory = template_cache_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:  # ie. a read-only home directory, compile the templates in memory instead
+        return None
+    return FileSystemBytecodeCache(directory)
+
+
+def get_environment() -> Environment:
+    """
+    Get the Jinja environment of the kac templates, creating it on first use.
+
+    The package templates never change while kac runs, so they are not checked for changes once loaded.
+
+    :return: The shared Environment.
+    """
+    global _environment
+    if _environment is None:
+        _environment = Environment(loader=PackageLoader('kac', 'templates'), bytecode_cache=_bytecode_cache(),
+                                   auto_reload=False)
+    return _environment
+
+
+def get_template(name: str) -> Template:
+    """
+    Get a compiled kac template.
+
+    :param name: File name of the template in `kac/templates`.
+    :return: The compiled Template, shared by every caller.
+    """
+    return get_environment().get_template(name)
+
+
+def render_changelog(initial_release: VersionInfo, repo_url: str, initial_release_date: date = None) -> str:
+    """
+    Render the text of a new CHANGELOG file.
+
+    :param initial_release: Version of the first release.
+    :param repo_url: URL of the repository, used for the footer links.
+    :param initial_release_date: Date of the first release, defaults to today.
+    :return: The CHANGELOG text.
+    """
+    with trace.span('render_template'):
+        return get_template('CHANGELOG.md').render(initial_release=initial_release, repo_url=repo_url,
+                                                   initial_release_date=initial_release_date or date.today())
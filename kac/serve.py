@@ -0,0 +1,210 @@
+"""
+Machine-readable `bump` and `copy`, and a JSON Lines request loop that keeps parsed CHANGELOG files in memory.
+
+Results are plain dicts with a `status`, so that automation never has to parse human-readable output. Failures are
+reported as results with the `error` status rather than raised.
+"""
+import json
+import os
+from collections import OrderedDict
+from typing import Optional, TextIO, Tuple
+
+from .changelog import Changelog, ChangelogError, ChangelogNotFoundError, Release
+from .changelog.batch import BUMPED, ERROR, SKIPPED
+from .changelog.version import CANDIDATES, format_version, next_versions
+
+COPIED = 'copied'
+DRY_RUN = 'dry_run'
+
+COMMANDS = ('bump', 'copy')
+
+
+def error_record(path: Optional[str], error: Exception) -> dict:
+    """
+    Get the result of a request that failed.
+
+    :param path: File system path of the CHANGELOG file.
+    :param error: The error.
+    :return: Dictionary of `path`, `status` and `message`, with the `line` and `column` of CHANGELOG errors.
+    """
+    record = {'path': path, 'status': ERROR, 'message': str(error)}
+    if isinstance(error, ChangelogError) and error.line is not None:
+        record.update(line=error.line, column=error.column)
+    return record
+
+
+def bump_record(changelog: Changelog, bump_type: str = None, prerelease_token: str = 'rc',
+                build_token: str = 'build', dry_run: bool = False) -> dict:
+    """
+    Bump a Changelog, and describe the bump.
+
+    :param changelog: The Changelog to bump.
+    :param bump_type: The version part to be bumped, one of `Changelog.BUMP_TYPES`. Only the candidate versions are
+        reported if omitted.
+    :param prerelease_token: String to identify prerelease versions, defaults to `rc`.
+    :param build_token: String to identify build versions, defaults to `build`.
+    :param dry_run: Only describe the bump, without writing the file.
+    :return: Dictionary of `path`, `status`, `previous_version`, `candidates` by version part, `new_version`, the
+        unified `diff` of the bump, and `message`.
+    """
+    record = {'path': changelog.path, 'status': SKIPPED, 'previous_version': None, 'candidates': None,
+              'new_version': None, 'diff': None, 'message': ''}
+    if not changelog.releases:
+        return dict(record, status=ERROR, message='The CHANGELOG has no releases to bump.')
+    latest = changelog.latest_release.packed_version
+    record['previous_version'] = format_version(latest)
+    if not changelog.unreleased.has_changes:
+        return dict(record, message='CHANGELOG has no unreleased changes.')
+
+    try:
+        candidates = OrderedDict(zip(CANDIDATES, next_versions(latest, prerelease_token, build_token)))
+        record['candidates'] = OrderedDict((name, format_version(v)) for name, v in candidates.items())
+        if bump_type is None:
+            return dict(record, status=DRY_RUN, message='No version part to bump was given.')
+        if bump_type not in Changelog.BUMP_TYPES:
+            raise ValueError(f'Invalid bump type: {bump_type}')
+        new_version = changelog.get_next_version(bump_type, prerelease_token, build_token)
+        record.update(new_version=f'{new_version}', diff=changelog.bump_diff(new_version))
+        if dry_run:
+            return dict(record, status=DRY_RUN)
+        changelog.bump(new_version)
+    except (ChangelogError, OSError, ValueError) as e:
+        return dict(record, status=ERROR, message=str(e))
+    return dict(record, status=BUMPED)
+
+
+def copy_record(path: str, release: Optional[Release], dry_run: bool = False) -> dict:
+    """
+    Copy the changes text of a release to the clipboard, and describe it.
+
+    :param path: File system path of the CHANGELOG file.
+    :param release: The latest release, or None if the CHANGELOG has no releases.
+    :param dry_run: Only describe the release, without copying its text.
+    :return: Dictionary of `path`, `status`, `version`, `release_date`, the changes `text`, and `message`.
+    """
+    if release is None:
+        return {'path': path, 'status': SKIPPED, 'version': None, 'release_date': None, 'text': None,
+                'message': 'The CHANGELOG has no releases to copy.'}
+    text = release.changes_text
+    if not dry_run:
+        import pyperclip
+
+        try:
+            pyperclip.copy(text)
+        except pyperclip.PyperclipException as e:  # ie. no clipboard on a headless machine
+            return error_record(path, e)
+    return {'path': path, 'status': DRY_RUN if dry_run else COPIED, 'version': format_version(release.packed_version),
+            'release_date': release.release_date.isoformat(), 'text': text, 'message': ''}
+
+
+def _file_stat(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class Server:
+    """
+    Answers `bump` and `copy` requests, keeping the parsed CHANGELOG files in memory between requests.
+
+    A file that changed since its last request is refreshed in place, so only its edited sections are parsed again.
+    """
+
+    def __init__(self, max_files: int = 128):
+        """
+        :param max_files: Number of parsed CHANGELOG files kept in memory, the least recently used are dropped.
+        """
+        self.max_files = max_files
+        self._changelogs: 'OrderedDict[str, Tuple[Changelog, tuple]]' = OrderedDict()
+
+    def __repr__(self):
+        return f'<Server of {len(self._changelogs)} CHANGELOG files>'
+
+    def changelog(self, path: str) -> Changelog:
+        """
+        Get the Changelog of a file, parsing or refreshing it only if the file changed since it was last used.
+
+        :param path: File system path of the CHANGELOG file.
+        :raises ChangelogError: If the CHANGELOG file cannot be found or parsed.
+        :return: The Changelog.
+        """
+        path = os.path.abspath(path)
+        stat = _file_stat(path)
+        cached = self._changelogs.pop(path, None)
+        if stat is None:
+            raise ChangelogNotFoundError(path=path)
+        if cached is None:
+            changelog = Changelog(path, lazy=True)
+        else:
+            changelog = cached[0]
+            if cached[1] != stat:
+                changelog.refresh()
+        self._remember(changelog)
+        return changelog
+
+    def _remember(self, changelog: Changelog) -> None:
+        self._changelogs[changelog.path] = (changelog, _file_stat(changelog.path))
+        while len(self._changelogs) > self.max_files:
+            self._changelogs.popitem(last=False)
+
+    def handle(self, request: dict) -> dict:
+        """
+        Answer a request.
+
+        Requests are dicts of `command`, one of `COMMANDS`, and `path`, defaulting to `CHANGELOG.md`. `bump` also
+        takes `type`, `prerelease`, `build` and `dry_run`, and `copy` takes `dry_run`. An `id` is echoed back in the
+        result.
+
+        :param request: The request.
+        :return: The result of `bump_record` or `copy_record`, or of `error_record` if the request is invalid.
+        """
+        if not isinstance(request, dict):
+            return error_record(None, ValueError('Requests must be JSON objects.'))
+        path = request.get('path') or Changelog.default_file_name
+        command = request.get('command')
+        try:
+            if command not in COMMANDS:
+                raise ValueError(f'Invalid command: {command}, expected one of {", ".join(COMMANDS)}')
+            changelog = self.changelog(path)
+            if command == 'bump':
+                result = bump_record(changelog, request.get('type'), request.get('prerelease') or 'rc',
+                                     request.get('build') or 'build', bool(request.get('dry_run')))
+                if result['status'] == ERROR:
+                    self._changelogs.pop(changelog.path, None)
+                else:
+                    self._remember(changelog)  # The bumped Changelog already matches the new file
+            else:
+                latest = changelog.latest_release if changelog.releases else None
+                result = copy_record(changelog.path, latest, bool(request.get('dry_run')))
+        except (ChangelogError, OSError, ValueError) as e:
+            self._changelogs.pop(os.path.abspath(path), None)
+            result = error_record(path, e)
+        if 'id' in request:
+            result['id'] = request['id']
+        return result
+
+    def serve(self, requests: TextIO, results: TextIO) -> int:
+        """
+        Answer JSON Lines requests until the end of the input, writing one JSON result per line as soon as it is
+        ready. Blank lines are skipped.
+
+        :param requests: Text stream of requests, one JSON object per line.
+        :param results: Text stream to write the results to.
+        :return: Number of requests answered.
+        """
+        count = 0
+        for line in requests:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                result = error_record(None, ValueError(f'Invalid JSON request: {e}'))
+            else:
+                result = self.handle(request)
+            results.write(json.dumps(result) + '\n')
+            results.flush()
+            count += 1
+        return count
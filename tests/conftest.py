@@ -1,3 +1,4 @@
+import shutil
 from pathlib import Path
 
 import pytest
@@ -5,11 +6,27 @@ import pytest
 from kac.changelog import Changelog
 
 
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep the CHANGELOG cache, search index and template cache of every test out of the user's cache directory."""
+    path = tmp_path / 'cache'
+    monkeypatch.setenv('KAC_CACHE_DIR', str(path))
+    return path
+
+
 @pytest.fixture
 def test_changelog_path():
     return f'{Path(__file__).parent.resolve()}/files/test_changelog_file.md'
 
 
+@pytest.fixture
+def changelog_path(test_changelog_path, tmp_path):
+    """Copy of the test CHANGELOG file that a test can change."""
+    path = str(tmp_path / 'CHANGELOG.md')
+    shutil.copy(test_changelog_path, path)
+    return path
+
+
 @pytest.fixture(scope='function')
 def test_changelog(test_changelog_path):
     return Changelog(test_changelog_path)
@@ -0,0 +1,82 @@
+import json
+
+from click.testing import CliRunner
+from semver import VersionInfo
+
+from kac.bench import OPERATIONS, generate_changelog, run_benchmarks
+from kac.changelog import Changelog
+from kac.kac import bench
+
+
+class TestGenerateChangelog:
+    def test_generate(self, tmp_path):
+        path = generate_changelog(str(tmp_path / 'CHANGELOG.md'), releases=250, entries=4, line_length=30)
+        changelog = Changelog(path)
+        assert len(changelog.releases) == 250
+        assert changelog.latest_version == VersionInfo(0, 2, 50)
+        assert changelog.releases[-1].version == VersionInfo(0, 0, 1)
+        assert changelog.unreleased.has_changes
+        for release in changelog.releases:
+            entries = [e for changes in release.changes.values() for e in changes]
+            assert len(entries) == 4
+            assert all(len(e) <= 30 for e in entries)
+
+    def test_generate_prerelease_build(self, tmp_path):
+        path = generate_changelog(str(tmp_path / 'CHANGELOG.md'), releases=200, prerelease_ratio=0.5,
+                                  build_ratio=0.5, seed=3)
+        versions = [r.version for r in Changelog(path).releases]
+        assert any(v.prerelease for v in versions) and any(not v.prerelease for v in versions)
+        assert any(v.build for v in versions) and any(not v.build for v in versions)
+
+    def test_generate_deterministic(self, tmp_path):
+        a = generate_changelog(str(tmp_path / 'A.md'), releases=10, seed=1)
+        b = generate_changelog(str(tmp_path / 'B.md'), releases=10, seed=1)
+        with open(a) as fa, open(b) as fb:
+            assert fa.read() == fb.read()
+
+    def test_generated_bump(self, tmp_path):
+        path = generate_changelog(str(tmp_path / 'CHANGELOG.md'), releases=5)
+        changelog = Changelog(path)
+        changelog.bump(changelog.get_next_version('minor'))
+        assert Changelog(path).latest_version == VersionInfo(0, 1, 0)
+
+
+class TestRunBenchmarks:
+    def test_run_benchmarks(self, tmp_path):
+        results = run_benchmarks(sizes=(1, 50), directory=str(tmp_path))
+        assert [(r['operation'], r['releases']) for r in results] == [(o, s) for s in (1, 50) for o in OPERATIONS]
+        for r in results:
+            assert r['seconds'] > 0
+            assert r['peak_memory'] > 0
+            assert r['bytes'] > 0
+        assert list(tmp_path.iterdir()) == []
+
+    def test_parse_scales_linearly(self, tmp_path):
+        def parse_time(size):
+            return min(r['seconds'] for r in run_benchmarks((size,) * 3, ['parse'], directory=str(tmp_path)))
+
+        # 8x the releases should take about 8x as long to parse, with plenty of room for noisy CI runners
+        assert parse_time(4000) < parse_time(500) * 24
+
+    def test_copy_is_constant(self, tmp_path):
+        small, large = run_benchmarks((10, 20000), ['copy'], directory=str(tmp_path))
+        assert large['bytes'] > small['bytes'] * 1000
+        # Only the top of the file is read, however long the history is
+        assert large['peak_memory'] < small['peak_memory'] * 2
+        assert large['seconds'] < max(small['seconds'], 1e-3) * 10
+
+
+class TestBenchCommand:
+    def test_table(self):
+        res = CliRunner().invoke(bench, ['-r', '1', '-r', '10', '-o', 'parse', '-o', 'copy'])
+        assert res.exit_code == 0
+        lines = res.output.splitlines()
+        assert lines[0].split()[:2] == ['OPERATION', 'RELEASES']
+        assert [line.split()[:2] for line in lines[1:]] == [['parse', '1'], ['copy', '1'], ['parse', '10'],
+                                                           ['copy', '10']]
+
+    def test_json(self):
+        res = CliRunner().invoke(bench, ['-r', '5', '-o', 'bump', '--format', 'json', '--prerelease-ratio', '1'])
+        assert res.exit_code == 0
+        results = json.loads(res.output)
+        assert [(r['operation'], r['releases']) for r in results] == [('bump', 5)]
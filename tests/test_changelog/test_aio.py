@@ -0,0 +1,95 @@
+import asyncio
+import shutil
+import threading
+import time
+
+import pytest
+from freezegun import freeze_time
+from semver import VersionInfo
+
+from kac.changelog import Changelog, ChangelogNotFoundError, aio
+from kac.changelog.aio import AsyncChangelog
+
+
+def _run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_limits():
+    yield
+    aio.configure(max_workers=aio.DEFAULT_MAX_WORKERS, max_concurrency=aio.DEFAULT_MAX_CONCURRENCY)
+
+
+class TestAsyncChangelog:
+    def test_load(self, changelog_path, test_changelog):
+        changelog = _run(AsyncChangelog.load(changelog_path, lazy=True))
+        assert changelog.latest_version == VersionInfo(0, 3, 0)
+        assert changelog.releases == test_changelog.releases
+        assert changelog.unreleased.added == ['Something added']
+
+    def test_load_missing(self, tmp_path):
+        with pytest.raises(ChangelogNotFoundError):
+            _run(AsyncChangelog.load(str(tmp_path / 'CHANGELOG.md')))
+
+    @freeze_time('2021-01-16')
+    def test_bump(self, changelog_path, test_changelog_path, tmp_path):
+        async def bump():
+            async with await AsyncChangelog.load(changelog_path, memory_map=True) as changelog:
+                await changelog.bump(VersionInfo(0, 4, 0))
+                return changelog
+
+        changelog = _run(bump())
+        assert changelog.latest_version == VersionInfo(0, 4, 0)
+
+        expected = tmp_path / 'expected.md'
+        shutil.copy(test_changelog_path, expected)
+        Changelog(str(expected)).bump(VersionInfo(0, 4, 0))
+        assert expected.read_text() == open(changelog_path).read()
+
+    def test_concurrent_bumps_serialize(self, changelog_path):
+        async def bump_all():
+            changelogs = await asyncio.gather(*(AsyncChangelog.load(changelog_path) for _ in range(4)))
+            return await asyncio.gather(*(c.bump_next('patch') for c in changelogs))
+
+        versions = _run(bump_all())
+        assert sorted(str(v) for v in versions) == ['0.3.1', '0.3.2', '0.3.3', '0.3.4']
+        changelog = Changelog(changelog_path)
+        assert [str(r.version) for r in changelog.releases[:5]] == ['0.3.4', '0.3.3', '0.3.2', '0.3.1', '0.3.0']
+        assert changelog.releases[3].added == ['Something added']  # The first bump's changes are kept
+
+    def test_concurrency_limit(self, changelog_path, monkeypatch):
+        aio.configure(max_workers=8, max_concurrency=2)
+        running = []
+        peak = []
+        lock = threading.Lock()
+        load = AsyncChangelog._load
+
+        def slow_load(*args):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.pop()
+            return load(*args)
+
+        monkeypatch.setattr(AsyncChangelog, '_load', staticmethod(slow_load))
+
+        async def load_all():
+            return await asyncio.gather(*(AsyncChangelog.load(changelog_path) for _ in range(6)))
+
+        assert len(_run(load_all())) == 6
+        assert max(peak) == 2
+
+
+class TestGetFirstGitRemote:
+    def test_get_first_git_remote(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / '.git').mkdir()
+        (tmp_path / '.git' / 'config').write_text('[remote "origin"]\nurl = https://github.com/atwalsh/test.git\n')
+        assert _run(aio.get_first_git_remote()) == 'https://github.com/atwalsh/test'
@@ -0,0 +1,109 @@
+import pickle
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from kac.changelog import Changelog, parse_many
+from kac.changelog.batch import (BUMPED, ERROR, PARSED, SKIPPED, BumpResult, ParseResult, bump_file, bump_many,
+                                 iter_parse_many, parse_file)
+
+
+@pytest.fixture
+def changelog_paths(test_changelog_path, tmp_path):
+    paths = []
+    for idx in range(4):
+        path = tmp_path / f'package_{idx}' / 'CHANGELOG.md'
+        path.parent.mkdir()
+        shutil.copy(test_changelog_path, path)
+        paths.append(str(path))
+    return paths
+
+
+class TestBumpFile:
+    def test_bumped(self, changelog_paths):
+        assert bump_file(changelog_paths[0], 'minor') == BumpResult(changelog_paths[0], BUMPED, '0.3.0', '0.4.0')
+        assert Changelog(changelog_paths[0]).latest_release.added == ['Something added']
+
+    def test_skipped(self, changelog_paths):
+        bump_file(changelog_paths[0], 'patch')
+        result = bump_file(changelog_paths[0], 'patch')
+        assert result == BumpResult(changelog_paths[0], SKIPPED, '0.3.1',
+                                    message='CHANGELOG has no unreleased changes.')
+
+    def test_error(self, tmp_path, capsys):
+        path = tmp_path / 'CHANGELOG.md'
+        path.write_text('# Changelog\n')
+        result = bump_file(str(path), 'patch')
+        assert result.status == ERROR
+        assert 'missing `Unreleased` section' in result.message
+        assert capsys.readouterr().out == ''
+
+    def test_no_releases(self, tmp_path):
+        path = tmp_path / 'CHANGELOG.md'
+        path.write_text('# Changelog\n\n## [Unreleased]\n### Added\n- Something\n\n'
+                        '[Unreleased]: https://github.com/atwalsh/kac/compare/v0.1.0...HEAD\n')
+        assert bump_file(str(path), 'patch') == \
+            BumpResult(str(path), ERROR, message='The CHANGELOG has no releases to bump.')
+
+
+class TestBumpMany:
+    def test_bump_many(self, changelog_paths, tmp_path):
+        bump_file(changelog_paths[1], 'major')
+        missing = str(tmp_path / 'missing' / 'CHANGELOG.md')
+
+        empty = tmp_path / 'empty' / 'CHANGELOG.md'
+        empty.parent.mkdir()
+        empty.write_text('## [Unreleased]\n\n[Unreleased]: https://github.com/atwalsh/kac/compare/v0.1.0...HEAD\n')
+
+        results = bump_many(changelog_paths + [missing, str(empty)], 'patch', workers=2)
+        assert [r.path for r in results] == changelog_paths + [missing, str(empty)]
+        assert [r.status for r in results] == [BUMPED, SKIPPED, BUMPED, BUMPED, ERROR, ERROR]
+        assert results[0].new_version == '0.3.1'
+        assert results[4].message == 'Invalid CHANGELOG file path.'
+        assert results[5].message == 'The CHANGELOG has no releases to bump.'
+        for path in changelog_paths:
+            assert Changelog(path).unreleased.has_changes is False
+
+    def test_bump_many_single_worker(self, changelog_paths):
+        results = bump_many(changelog_paths[:2] + changelog_paths[:1], 'prerelease', workers=1)
+        assert [(r.path, r.new_version) for r in results] == [
+            (changelog_paths[0], '0.3.1-rc.1'),
+            (changelog_paths[1], '0.3.1-rc.1'),
+        ]
+
+
+class TestParseFile:
+    def test_parsed(self, test_changelog_path, test_changelog):
+        result = parse_file(test_changelog_path)
+        assert result.status == PARSED
+        assert result.to_releases() == test_changelog.releases
+        assert result.to_unreleased().changes == test_changelog.unreleased.changes
+        assert pickle.loads(pickle.dumps(result)) == result
+
+    def test_error(self, tmp_path, capsys):
+        path = tmp_path / 'CHANGELOG.md'
+        path.write_text('## [Unreleased]\n\n## [1.0] - 2020-01-01\n\n[Unreleased]: https://example.com\n')
+        result = parse_file(str(path))
+        assert result == ParseResult(str(path), ERROR, message='1.0 is not valid SemVer string (line 3, column 5)')
+        assert capsys.readouterr().out == ''
+
+
+class TestParseMany:
+    def test_parse_many(self, changelog_paths, tmp_path):
+        missing = str(tmp_path / 'missing' / 'CHANGELOG.md')
+        results = parse_many(changelog_paths + [missing], workers=2)
+        assert [r.path for r in results] == changelog_paths + [missing]
+        assert [r.status for r in results] == [PARSED] * 4 + [ERROR]
+        assert all(len(r.releases) == 9 for r in results[:4])
+        assert results[4].message == 'Invalid CHANGELOG file path.'
+
+    def test_parse_many_single_worker(self, changelog_paths):
+        assert parse_many(changelog_paths, workers=1) == [parse_file(path) for path in changelog_paths]
+
+    def test_shared_executor(self, changelog_paths):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            first = parse_many(changelog_paths[:2], executor=executor)
+            second = list(iter_parse_many(changelog_paths[2:], executor=executor))
+        assert [r.path for r in first + second] == changelog_paths
+        assert all(r.status == PARSED for r in first + second)
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from kac.changelog import Changelog
+from kac.changelog.cache import ChangelogCache, default_cache_dir
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ChangelogCache(str(tmp_path / 'cache'))
+
+
+def _no_parse(*args, **kwargs):
+    raise AssertionError('CHANGELOG should not be parsed on a cache hit')
+
+
+class TestChangelogCache:
+    def test_default_cache_dir(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('KAC_CACHE_DIR', str(tmp_path))
+        assert default_cache_dir() == str(tmp_path)
+        monkeypatch.delenv('KAC_CACHE_DIR')
+        monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+        assert default_cache_dir() == os.path.join(str(tmp_path), 'kac')
+
+    def test_get_put(self, cache, changelog_path):
+        assert cache.get(changelog_path) is None
+        cache.put(changelog_path, (1, [2, 'three'], None))
+        assert cache.get(changelog_path) == (1, [2, 'three'], None)
+
+    def test_content_hash_fallback(self, cache, changelog_path):
+        cache.put(changelog_path, 'payload')
+        st = os.stat(changelog_path)
+        os.utime(changelog_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))  # Touched, but not changed
+        assert cache.get(changelog_path) == 'payload'
+
+        with open(changelog_path, 'a') as f:
+            f.write('\n')
+        assert cache.get(changelog_path) is None
+
+    def test_eviction(self, tmp_path, changelog_path):
+        cache = ChangelogCache(str(tmp_path / 'cache'), max_size=500)
+        other_path = tmp_path / 'OTHER.md'
+        other_path.write_text('other')
+
+        cache.put(changelog_path, os.urandom(300))  # Random bytes do not compress
+        os.utime(cache._data_path(os.listdir(cache._data_dir)[0].split('.')[0]), ns=(0, 0))
+        cache.put(str(other_path), os.urandom(300))
+        assert cache.get(changelog_path) is None
+        assert cache.get(str(other_path)) is not None
+        assert len(os.listdir(cache._stat_dir)) == 1
+
+    def test_clear(self, cache, changelog_path):
+        cache.put(changelog_path, 'payload')
+        cache.clear()
+        assert cache.get(changelog_path) is None
+
+    def test_missing_file(self, cache, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            cache.get(str(tmp_path / 'missing.md'))
+
+
+class TestChangelogLoad:
+    def test_load_without_cache(self, changelog_path):
+        assert Changelog.load(changelog_path).releases == Changelog(changelog_path).releases
+
+    @pytest.mark.parametrize('lazy, memory_map', [(False, False), (True, False), (False, True), (True, True)])
+    def test_load_cache_hit(self, cache, changelog_path, monkeypatch, lazy, memory_map):
+        expected = Changelog(changelog_path)
+        Changelog.load(changelog_path, cache=cache)
+
+        monkeypatch.setattr(Changelog, '_parse_release', _no_parse)
+        monkeypatch.setattr('kac.changelog.release.ReleaseBase.changes_to_dict', _no_parse)
+        c = Changelog.load(changelog_path, cache=cache, lazy=lazy, memory_map=memory_map)
+        assert c.full_text == expected.full_text
+        assert c.unreleased.changes == expected.unreleased.changes
+        assert c.releases == expected.releases
+        assert [r.changes for r in c.releases] == [r.changes for r in expected.releases]
+        c.close()
+
+    def test_load_then_bump(self, cache, changelog_path):
+        Changelog.load(changelog_path, cache=cache)
+        c = Changelog.load(changelog_path, cache=cache, lazy=True)
+        c.bump(c.get_next_version('minor'))
+
+        # The bumped file is parsed again, rather than loaded from the stale cache entry
+        reloaded = Changelog.load(changelog_path, cache=cache)
+        assert str(reloaded.latest_version) == '0.4.0'
+        assert reloaded.latest_release.added == ['Something added']
@@ -1,13 +1,15 @@
+import difflib
+import tracemalloc
 from collections import OrderedDict
 from datetime import date
 from pathlib import Path
 
 import pytest
-from click.exceptions import Abort
 from freezegun import freeze_time
 from semver import VersionInfo
 
-from kac.changelog import Changelog, Release
+from kac.changelog import (Changelog, ChangelogNotFoundError, InvalidChangeTypeError, InvalidDateError,
+                          InvalidVersionError, MissingUnreleasedError, Release)
 
 
 class TestChangelog:
@@ -30,8 +32,62 @@ class TestChangelog:
 
         assert c.full_text == expected_full_text
 
+    def test_init_lazy(self, test_changelog_path):
+        eager = Changelog(test_changelog_path)
+        c = Changelog(test_changelog_path, lazy=True)
+        assert c.releases.parsed_count == 0
+        assert len(c.releases) == 9
+
+        # Only the releases that are accessed get parsed
+        assert c.latest_release == eager.latest_release
+        assert c.latest_release.added == eager.latest_release.added
+        assert c.releases.parsed_count == 1
+        assert c.releases[-1].version == VersionInfo(0, 1, 0)
+        assert c.releases.parsed_count == 2
+
+        assert c.releases == eager.releases
+        assert c.releases.parsed_count == 9
+
+    def test_init_lazy_large(self, tmp_path):
+        releases = ''.join(f'## [0.0.{i}] - 2020-01-01\n### Added\n- Release {i}\n\n' for i in range(50000, 0, -1))
+        f_path = tmp_path / 'CHANGELOG.md'
+        f_path.write_text(f'# Changelog\n\n## [Unreleased]\n\n{releases}'
+                          f'[Unreleased]: https://github.com/atwalsh/kac/compare/v0.0.50000...HEAD\n')
+
+        c = Changelog(str(f_path), lazy=True)
+        assert c.latest_version == VersionInfo(0, 0, 50000)
+        assert c.latest_release.added == ['Release 50000']
+        assert len(c.releases) == 50000
+        assert c.releases.parsed_count == 1
+
+    def test_init_memory_map(self, test_changelog_path):
+        eager = Changelog(test_changelog_path)
+        with Changelog(test_changelog_path, lazy=True, memory_map=True) as c:
+            assert c.full_text == eager.full_text
+            assert c.unreleased.changes == eager.unreleased.changes
+            assert c.releases == eager.releases
+            assert [r.changes for r in c.releases] == [r.changes for r in eager.releases]
+
+    def test_init_memory_map_peak_memory(self, tmp_path):
+        releases = ''.join(f'## [0.0.{i}] - 2020-01-01\n### Added\n- Release {i} {"x" * 200}\n\n'
+                           for i in range(20000, 0, -1))
+        f_path = tmp_path / 'CHANGELOG.md'
+        f_path.write_text(f'# Changelog\n\n## [Unreleased]\n\n{releases}'
+                          f'[Unreleased]: https://github.com/atwalsh/kac/compare/v0.0.20000...HEAD\n')
+        file_size = f_path.stat().st_size
+
+        tracemalloc.start()
+        try:
+            with Changelog(str(f_path), lazy=True, memory_map=True) as c:
+                assert c.latest_release.added[0].startswith('Release 20000 ')
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # The file is never copied into memory, only the release offsets are kept
+        assert peak < file_size / 4
+
     def test_init_no_unreleased(self, test_changelog_path, tmp_path):
-        """Check a click `Abort` is raised if the CHANGELOG has no `Unreleased` section."""
+        """Check a `MissingUnreleasedError` is raised if the CHANGELOG has no `Unreleased` section."""
         path = tmp_path
         f_path = path / 'CHANGELOG.md'
         with open(test_changelog_path) as f:
@@ -40,15 +96,82 @@ class TestChangelog:
         # Remove released section by line numbers 😕
         f_path.write_text(''.join([l for idx, l in enumerate(lines) if idx not in range(5, 12)]))
 
-        with pytest.raises(Abort):
+        with pytest.raises(MissingUnreleasedError):
             Changelog(str(f_path))
 
+    def test_init_yanked_release(self, tmp_path):
+        path = tmp_path / 'CHANGELOG.md'
+        path.write_text('## [Unreleased]\n\n## [0.2.0] - 2020-03-01 [YANKED]\n### Added\n- B\n\n'
+                        '## [0.1.0] - 2020-01-01\n### Added\n- A\n\n'
+                        '[Unreleased]: https://github.com/atwalsh/kac/compare/v0.2.0...HEAD\n')
+        releases = Changelog(str(path)).releases
+        assert [(str(r.version), r.release_date, r.added) for r in releases] == [
+            ('0.2.0', date(2020, 3, 1), ['B']),
+            ('0.1.0', date(2020, 1, 1), ['A']),
+        ]
+        assert Changelog.read_latest_release(str(path)).added == ['B']
+
     def test_repr(self, test_changelog):
         assert test_changelog.__repr__() == f'<CHANGELOG v0.3.0>'
 
     def test_init_bad_path(self, tmp_path):
-        with pytest.raises(Abort):
+        with pytest.raises(ChangelogNotFoundError) as e:
             Changelog(str(tmp_path) + '/CHANGELOG.md')
+        assert e.value.path == str(tmp_path) + '/CHANGELOG.md'
+        assert str(e.value) == 'Invalid CHANGELOG file path.'
+
+    def test_init_errors_have_positions(self, test_changelog_path, tmp_path):
+        f_path = tmp_path / 'CHANGELOG.md'
+        with open(test_changelog_path) as f:
+            text = f.read()
+
+        f_path.write_text(text.replace('### Fixed\n- Issue where extra', '### Fixes\n- Issue where extra'))
+        with pytest.raises(InvalidChangeTypeError) as e:
+            Changelog(str(f_path))
+        assert (e.value.path, e.value.line, e.value.column) == (str(f_path), 24, 5)
+        assert str(e.value) == 'Invalid change type: Fixes (line 24, column 5)'
+
+        f_path.write_text(text.replace('### Changed\n- `template`', '### Renamed\n- `template`'))
+        with pytest.raises(InvalidChangeTypeError) as e:
+            Changelog(str(f_path))
+        assert e.value.line == 11
+
+        f_path.write_text(text.replace('## [0.2.2] - 2020-01-14', '## [0.2] - 2020-01-14'))
+        changelog = Changelog(str(f_path), lazy=True)
+        with pytest.raises(InvalidVersionError) as e:
+            changelog.releases[2]
+        assert (e.value.line, e.value.column) == (27, 5)
+
+        f_path.write_text(text.replace('## [0.2.2] - 2020-01-14', '## [0.2.2] - 2020-01-32'))
+        with pytest.raises(InvalidDateError) as e:
+            Changelog(str(f_path))
+        assert (e.value.line, e.value.column) == (27, 14)
+        assert isinstance(e.value, ValueError)
+
+    def test_validate(self, test_changelog_path, tmp_path):
+        assert Changelog.validate(test_changelog_path) == []
+
+        f_path = tmp_path / 'CHANGELOG.md'
+        with open(test_changelog_path) as f:
+            text = f.read()
+        f_path.write_text(text.replace('### Changed\n- `template`', '### Renamed\n- `template`')
+                          .replace('## [0.2.2] - 2020-01-14', '## [0.2] - 2020-01-14')
+                          .replace('### Removed', '### Dropped'))
+        errors = Changelog.validate(str(f_path))
+        assert [(type(e), e.line) for e in errors] == [
+            (InvalidChangeTypeError, 11),
+            (InvalidVersionError, 27),
+            (InvalidChangeTypeError, 43),
+        ]
+        assert all(e.path == str(f_path) for e in errors)
+
+    def test_validate_fatal(self, tmp_path):
+        f_path = tmp_path / 'CHANGELOG.md'
+        assert [type(e) for e in Changelog.validate(str(f_path))] == [ChangelogNotFoundError]
+        f_path.write_text('# Changelog\n')
+        assert [type(e) for e in Changelog.validate(str(f_path))] == [MissingUnreleasedError]
+        f_path.write_bytes(b'## [Unreleased]\n\xff\n')
+        assert str(Changelog.validate(str(f_path))[0]).startswith('CHANGELOG is not valid UTF-8')
 
     def test_latest_version(self, test_changelog):
         assert test_changelog.latest_version == VersionInfo(0, 3, 0)
@@ -66,6 +189,76 @@ class TestChangelog:
         )
         assert test_changelog.latest_release == r
 
+    def test_read_latest_release(self, test_changelog, test_changelog_path):
+        assert Changelog.read_latest_release(test_changelog_path) == test_changelog.latest_release
+
+    def test_read_latest_release_errors(self, tmp_path):
+        f_path = tmp_path / 'CHANGELOG.md'
+        with pytest.raises(ChangelogNotFoundError):
+            Changelog.read_latest_release(str(f_path))
+
+        f_path.write_text('# Changelog\n\n## [0.1.0] - 2020-01-01\n')
+        with pytest.raises(MissingUnreleasedError):
+            Changelog.read_latest_release(str(f_path))
+
+        f_path.write_text('# Changelog\n\n## [Unreleased]\n### Added\n- A\n\n[Unreleased]: https://example.com\n')
+        assert Changelog.read_latest_release(str(f_path)) is None
+
+    def test_get_release(self, test_changelog):
+        assert test_changelog.get_release('0.2.1') == Release(VersionInfo(0, 2, 1), date(2020, 1, 11))
+        assert test_changelog.get_release('v0.1.3').removed == ['Python 3.8 walrus operators']
+        assert test_changelog.get_release(VersionInfo(0, 3)) is test_changelog.latest_release
+        assert test_changelog.get_release('9.9.9') is None
+
+    def test_get_release_lazy(self, test_changelog_path):
+        c = Changelog(test_changelog_path, lazy=True)
+        assert c.get_release('0.2.0').added == ['`bump` and `copy` commands']
+        assert c.releases.parsed_count == 1  # Only the headings of the other releases were read
+
+    def test_get_release_lazy_invalid_heading(self, changelog_path):
+        text = Path(changelog_path).read_text()
+        Path(changelog_path).write_text(text.replace('## [0.1.2]', '## [0.1.2.0]'))
+        with pytest.raises(InvalidVersionError) as e:
+            Changelog(changelog_path, lazy=True).get_release('0.2.0')
+        assert (e.value.line, e.value.column) == (text.splitlines().index('## [0.1.2] - 2019-11-14') + 1, 5)
+
+    def test_releases_between(self, test_changelog):
+        assert [str(r.version) for r in test_changelog.releases_between('0.1.2', 'v0.2.1')] == [
+            '0.2.1', '0.2.0', '0.1.3', '0.1.2'
+        ]
+        assert [str(r.version) for r in test_changelog.releases_between(lo='0.2.2')] == ['0.3.0', '0.2.3', '0.2.2']
+        assert [str(r.version) for r in test_changelog.releases_between(hi=VersionInfo(0, 1, 0))] == ['0.1.0']
+        assert test_changelog.releases_between('1.0.0', '2.0.0') == []
+
+    def test_releases_in_dates(self, test_changelog):
+        assert [str(r.version) for r in test_changelog.releases_in_dates(date(2020, 1, 1), date(2020, 3, 31))] == [
+            '0.2.3', '0.2.2', '0.2.1', '0.2.0'
+        ]
+        assert [str(r.version) for r in test_changelog.releases_in_dates(end=date(2019, 11, 14))] == [
+            '0.1.2', '0.1.1', '0.1.0'
+        ]
+        assert len(test_changelog.releases_in_dates()) == 9
+
+    @freeze_time('2021-01-16')
+    def test_release_index_after_bump(self, test_changelog_path, tmp_path):
+        c_path = tmp_path / 'CHANGELOG.md'
+        c_path.write_text(Path(test_changelog_path).read_text())
+        changelog = Changelog(str(c_path), lazy=True)
+        assert changelog.get_release('0.4.0') is None
+
+        changelog.bump(VersionInfo(0, 4))
+        assert changelog.get_release('0.4.0').added == ['Something added']
+        assert changelog.releases_in_dates(start=date(2021, 1, 1)) == [changelog.latest_release]
+
+    def test_changes_text(self, test_changelog):
+        for release in test_changelog.releases:
+            rendered = Release(release.version, release.release_date, **release.changes).changes_text
+            assert release.changes_text == rendered
+        release = test_changelog.latest_release
+        release.added = release.added + ['Another addition']
+        assert release.changes_text.startswith('### Added\n- `template` command\n')
+        assert '- Automatic releases to PyPI on git tags\n- Another addition\n\n### Changed\n' in release.changes_text
+
     def test_get_next_versions(self, test_changelog):
         assert test_changelog.get_next_versions() == OrderedDict({
             'v0.3.1': VersionInfo(0, 3, 1),
@@ -115,3 +308,121 @@ class TestChangelog:
         bumped_path = f'{Path(__file__).parent.parent.resolve()}/files/test_changelog_file_bumped.md'
         with open(bumped_path, 'r') as expected_f, open(c_path, 'r') as actual_f:
             assert expected_f.read() == actual_f.read()
+
+    @freeze_time('2021-01-16')
+    def test_bump_twice(self, test_changelog_path, tmp_path):
+        c_path = tmp_path / 'CHANGELOG.md'
+        with open(test_changelog_path, 'r') as f:
+            c_path.write_text(f.read())
+
+        changelog = Changelog(str(c_path), lazy=True)
+        changelog.bump(VersionInfo(0, 4))
+        changelog.bump(VersionInfo(0, 4, 1))
+
+        reloaded = Changelog(str(c_path))
+        assert [str(r.version) for r in reloaded.releases[:3]] == ['0.4.1', '0.4.0', '0.3.0']
+        assert reloaded.releases[1].added == ['Something added']
+        assert not reloaded.releases[0].added
+        assert reloaded.full_text.count('[Unreleased]: https://github.com/atwalsh/kac/compare/v0.4.1...master\n'
+                                        '[0.4.1]: https://github.com/atwalsh/kac/compare/v0.4.0...v0.4.1\n'
+                                        '[0.4.0]: https://github.com/atwalsh/kac/compare/v0.3.0...v0.4.0\n') == 1
+
+    def test_bump_copies_untouched_text(self, test_changelog_path, tmp_path):
+        with open(test_changelog_path, 'r') as f:
+            text = f.read()
+        # Unusual spacing in the body and footer is kept as-is
+        text = text.replace('## [0.2.3]', '\n\n## [0.2.3]').replace('[0.1.0]: ', '  \n[0.1.0]: ').rstrip('\n')
+        c_path = tmp_path / 'CHANGELOG.md'
+        c_path.write_text(text)
+
+        changelog = Changelog(str(c_path))
+        changelog.bump(VersionInfo(0, 4))
+        new_text = c_path.read_text()
+        heading = f'\n## [0.4.0] - {date.today()}\n'
+        assert new_text.replace(heading, '', 1).replace(
+            '[0.4.0]: https://github.com/atwalsh/kac/compare/v0.3.0...v0.4.0\n', '', 1
+        ).replace('compare/v0.4.0...master', 'compare/v0.3.0...master') == text
+
+    @freeze_time('2021-01-16')
+    @pytest.mark.parametrize('lazy', [False, True])
+    def test_bump_after_in_memory_change(self, changelog_path, lazy):
+        changelog = Changelog(changelog_path, lazy=lazy)
+        del changelog.releases[-1]
+        changelog.releases.insert(1, Release(VersionInfo(0, 2, 9), date(2020, 2, 1)))
+        changelog.bump(VersionInfo(0, 4, 0))
+
+        expected = Changelog(changelog_path)
+        assert changelog.releases == expected.releases
+        assert [str(r.version) for r in changelog.releases[:2]] == ['0.4.0', '0.3.0']
+        assert changelog.releases[0].added == ['Something added']
+        assert changelog.unreleased.changes == expected.unreleased.changes
+        assert changelog.get_release('0.2.9') is None
+        changelog.bump(VersionInfo(0, 4, 1))  # Still in step with the file
+        assert Changelog(changelog_path).releases == changelog.releases
+
+    @freeze_time('2021-01-16')
+    def test_bump_after_changes_edit(self, changelog_path):
+        changelog = Changelog(changelog_path)
+        changelog.unreleased.changes['security'].append('Something secured')
+        changelog.bump(VersionInfo(0, 4, 0))
+        assert changelog.latest_release.security == ['Something secured']
+        assert '### Security\n- Something secured\n' in changelog.latest_release.changes_text
+
+    def test_bump_failure_leaves_file(self, test_changelog_path, tmp_path, monkeypatch):
+        c_path = tmp_path / 'CHANGELOG.md'
+        with open(test_changelog_path, 'r') as f:
+            text = f.read()
+        c_path.write_text(text)
+        changelog = Changelog(str(c_path))
+
+        def fail(*args, **kwargs):
+            raise OSError('Disk full')
+
+        monkeypatch.setattr(changelog, '_write_span', fail)
+        with pytest.raises(OSError):
+            changelog.bump(VersionInfo(0, 4))
+        assert c_path.read_text() == text
+        assert list(tmp_path.iterdir()) == [c_path]
+
+    @freeze_time('2021-01-16')
+    @pytest.mark.parametrize('memory_map', [False, True])
+    def test_bump_diff(self, test_changelog_path, tmp_path, memory_map):
+        c_path = tmp_path / 'CHANGELOG.md'
+        with open(test_changelog_path, 'r') as f:
+            text = f.read()
+        c_path.write_text(text)
+        bumped_path = f'{Path(__file__).parent.parent.resolve()}/files/test_changelog_file_bumped.md'
+        with open(bumped_path, 'r') as f:
+            expected = ''.join(difflib.unified_diff(text.splitlines(True), f.read().splitlines(True), str(c_path),
+                                                    str(c_path)))
+
+        with Changelog(str(c_path), memory_map=memory_map) as changelog:
+            assert changelog.bump_diff(VersionInfo(0, 4)) == expected
+            assert c_path.read_text() == text
+            changelog.bump(VersionInfo(0, 4))
+            # The diff of the bumped file: a blank line and a heading, and a changed and an added footer link
+            diff = changelog.bump_diff(VersionInfo(0, 4, 1))
+            assert [line for line in diff.splitlines() if line[:1] in '+-'][2:] == [
+                '+## [0.4.1] - 2021-01-16', '+',
+                '-[Unreleased]: https://github.com/atwalsh/kac/compare/v0.4.0...master',
+                '+[Unreleased]: https://github.com/atwalsh/kac/compare/v0.4.1...master',
+                '+[0.4.1]: https://github.com/atwalsh/kac/compare/v0.4.0...v0.4.1',
+            ]
+
+    @freeze_time('2021-01-16')
+    def test_bump_memory_map(self, test_changelog_path, tmp_path):
+        c_path = tmp_path / 'CHANGELOG.md'
+        with open(test_changelog_path, 'r') as f:
+            c_path.write_text(f.read())
+
+        with Changelog(str(c_path), lazy=True, memory_map=True) as changelog:
+            changelog.bump(VersionInfo(0, 4))
+            assert changelog.latest_release == Release(VersionInfo(0, 4), date(2021, 1, 16))
+            # Releases that were not parsed before the bump are read from the new file
+            assert changelog.releases[1] == Release(VersionInfo(0, 3), date(2020, 4, 5))
+            assert changelog.releases[-1].version == VersionInfo(0, 1, 0)
+            assert changelog.releases[-1].added == ['This Changelog and initial project files']
+
+        bumped_path = f'{Path(__file__).parent.parent.resolve()}/files/test_changelog_file_bumped.md'
+        with open(bumped_path, 'r') as expected_f, open(c_path, 'r') as actual_f:
+            assert expected_f.read() == actual_f.read()
@@ -0,0 +1,80 @@
+import io
+import json
+import tracemalloc
+from datetime import date
+
+from kac.bench import generate_changelog
+from kac.changelog.export import COLUMNS, iter_batches, iter_releases, release_to_dict, write_jsonl
+
+
+def _peak_memory(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class TestIterReleases:
+    def test_iter_releases(self, test_changelog_path, test_changelog):
+        assert list(iter_releases(test_changelog_path)) == test_changelog.releases
+
+    def test_memory_is_flat(self, tmp_path):
+        path = generate_changelog(str(tmp_path / 'CHANGELOG.md'), releases=20000)
+        peak = _peak_memory(lambda: sum(1 for _ in iter_releases(path)))
+        # Only the span offsets grow with the history, parsed releases are never held on to
+        assert peak < (tmp_path / 'CHANGELOG.md').stat().st_size / 4
+
+    def test_release_to_dict(self, test_changelog):
+        record = release_to_dict(test_changelog.releases[1])
+        assert record == {
+            'version': '0.2.3', 'major': 0, 'minor': 2, 'patch': 3, 'prerelease': None, 'build': None,
+            'date': '2020-03-19',
+            'changes': {'added': [], 'changed': [], 'deprecated': [],
+                        'fixed': ['Issue where extra newline characters were copied to the clipboard'],
+                        'removed': [], 'security': []},
+        }
+
+
+class TestWriteJsonl:
+    def test_write_jsonl(self, test_changelog_path):
+        f = io.StringIO()
+        assert write_jsonl([test_changelog_path, test_changelog_path], f) == 18
+        records = [json.loads(line) for line in f.getvalue().splitlines()]
+        assert len(records) == 18
+        assert records[0]['version'] == '0.3.0'
+        assert records[0]['path'] == test_changelog_path
+        assert records[0]['changes']['changed'] == ['Use poetry instead of pipenv']
+        assert records[8]['version'] == records[17]['version'] == '0.1.0'
+
+
+class TestIterBatches:
+    def test_iter_batches(self, test_changelog_path):
+        batches = list(iter_batches([test_changelog_path], batch_size=5))
+        assert [len(b['entry']) for b in batches] == [5, 5, 3]
+        assert all(set(b) == set(COLUMNS) for b in batches)
+        assert all(len(column) == len(b['entry']) for b in batches for column in b.values())
+
+        first = batches[0]
+        assert first['version'][:5] == ['0.3.0'] * 4 + ['0.2.3']
+        assert first['change_type'][:5] == ['added', 'added', 'added', 'changed', 'fixed']
+        assert first['entry'][0] == '`template` command'
+        assert list(first['patch']) == [0, 0, 0, 0, 3]
+        assert date.fromordinal(first['date'][0] + date(1970, 1, 1).toordinal()) == date(2020, 4, 5)
+
+    def test_columns_are_buffers(self, test_changelog_path):
+        batch = next(iter_batches([test_changelog_path]))
+        for name in ('major', 'minor', 'patch', 'date'):
+            view = memoryview(batch[name])
+            assert view.format in ('q', 'i')
+            assert len(view) == 13
+
+    def test_release_without_entries(self, tmp_path):
+        path = tmp_path / 'CHANGELOG.md'
+        path.write_text('## [Unreleased]\n\n## [1.0.0-rc.1+build.2] - 2021-01-16\n\n'
+                        '[Unreleased]: https://github.com/atwalsh/kac/compare/v1.0.0-rc.1+build.2...HEAD\n')
+        batch, = iter_batches([str(path)])
+        assert batch['prerelease'] == ['rc.1']
+        assert batch['build'] == ['build.2']
+        assert batch['change_type'] == batch['entry'] == [None]
@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+
+from kac.bench import generate_changelog
+from kac.changelog import Changelog, ChangelogNotFoundError
+from kac.changelog.feed import feed, iter_feed
+
+
+@pytest.fixture
+def changelog_paths(tmp_path):
+    paths = []
+    for idx in range(3):
+        path = str(tmp_path / f'CHANGELOG_{idx}.md')
+        generate_changelog(path, releases=200, seed=idx)
+        paths.append(path)
+    return paths
+
+
+class TestFeed:
+    def test_merged_newest_first(self, changelog_paths):
+        items = feed(changelog_paths)
+        expected = sorted(((r.release_date, p, r) for p in changelog_paths for r in Changelog(p).releases),
+                          key=lambda item: item[0], reverse=True)
+        assert [(i.release_date, i.path) for i in items] == [(d, p) for d, p, _ in expected]
+        assert [i.release for i in items] == [r for _, _, r in expected]
+
+    def test_since_until_limit(self, test_changelog_path):
+        items = feed([test_changelog_path], since=date(2020, 1, 1), until=date(2020, 3, 31))
+        assert [str(i.release.version) for i in items] == ['0.2.3', '0.2.2', '0.2.1', '0.2.0']
+        assert len(feed([test_changelog_path], limit=2)) == 2
+        assert feed([test_changelog_path], since=date(2030, 1, 1)) == []
+
+    def test_stops_early(self, changelog_paths, monkeypatch):
+        parsed = []
+        headings = []
+        parse_release, parse_heading = Changelog._parse_release, Changelog._parse_heading
+        monkeypatch.setattr(Changelog, '_parse_release', lambda self, span: parsed.append(span) or
+                            parse_release(self, span))
+        monkeypatch.setattr(Changelog, '_parse_heading', lambda self, span: headings.append(span) or
+                            parse_heading(self, span))
+
+        assert len(feed(changelog_paths, limit=5)) == 5
+        assert len(parsed) == 5
+        assert len(headings) <= 5 + len(changelog_paths)
+
+    def test_missing_file(self, changelog_paths, tmp_path):
+        with pytest.raises(ChangelogNotFoundError):
+            list(iter_feed(changelog_paths + [str(tmp_path / 'missing.md')]))
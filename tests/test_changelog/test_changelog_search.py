@@ -0,0 +1,147 @@
+import os
+from datetime import date
+
+import pytest
+from freezegun import freeze_time
+from semver import VersionInfo
+
+from kac.bench import generate_changelog
+from kac.changelog import Changelog, ChangelogNotFoundError, Release
+from kac.changelog.search import SearchHit, SearchIndex, default_index_path, search, tokenize
+
+
+@pytest.fixture
+def index(changelog_path):
+    index = SearchIndex()
+    index.update([changelog_path])
+    return index
+
+
+def linear_search(paths, query):
+    words = set(tokenize(query))
+    return [
+        (p, str(r.version), change_type, entry)
+        for p in paths for r in Changelog(p).releases for change_type, entries in r.changes.items()
+        for entry in entries if words <= set(tokenize(entry))
+    ]
+
+
+class TestSearchIndex:
+    def test_tokenize(self):
+        assert tokenize('Fix `CVE-2021-44228` in log_4j') == ['fix', 'cve', '2021', '44228', 'in', 'log_4j']
+
+    def test_search(self, index, changelog_path):
+        assert len(index) == 13
+        assert index.search('COPY') == [
+            SearchHit(changelog_path, '0.2.1', date(2020, 1, 11), 'fixed',
+                      'Issue where `copy` would not correctly copy release text with new lines'),
+            SearchHit(changelog_path, '0.2.0', date(2020, 1, 11), 'added', '`bump` and `copy` commands'),
+            SearchHit(changelog_path, '0.2.0', date(2020, 1, 11), 'changed',
+                      '`kac` cannot be invoked without either the `bump` or `copy` commands'),
+        ]
+        assert [h.version for h in index.search('bump commands')] == ['0.2.0', '0.2.0']
+        assert [h.version for h in index.search('bump', change_type='added')] == ['0.2.0']
+        assert index.search('bump', paths=['missing.md']) == []
+        assert index.search('unknown words') == []
+        assert index.search('') == []
+        with pytest.raises(ValueError):
+            index.search('bump', change_type='unknown')
+
+    def test_terms(self, changelog_path):
+        index = SearchIndex()
+        for day, entry in enumerate(('Fix CVE-2021-1234 and 44228', 'Fix CVE-2021-44228'), start=1):
+            index.add_release(changelog_path, Release(VersionInfo(1, 0, day), date(2021, 1, day), fixed=[entry]))
+        assert [h.version for h in index.search('CVE-2021-44228')] == ['1.0.2']
+        assert [h.version for h in index.search('cve 44228')] == ['1.0.2', '1.0.1']
+
+    def test_matches_linear_search(self, tmp_path):
+        paths = []
+        for idx in range(3):
+            paths.append(str(tmp_path / f'CHANGELOG_{idx}.md'))
+            generate_changelog(paths[-1], releases=100, seed=idx)
+        index = SearchIndex()
+        assert index.update(paths) == 3
+        for query in ('cache', 'version file', 'link support error'):
+            hits = index.search(query)
+            assert sorted((h.path, h.version, h.change_type, h.entry) for h in hits) == \
+                sorted(linear_search(paths, query))
+            assert [h.release_date for h in hits] == sorted((h.release_date for h in hits), reverse=True)
+        assert len(index.search('cache', limit=3)) == 3
+
+    def test_update(self, index, changelog_path):
+        assert index.update([changelog_path]) == 0
+        assert changelog_path in index
+
+        with open(changelog_path, 'a') as f:
+            f.write('\n')
+        assert index.update([changelog_path]) == 1
+        assert len(index) == 13
+        assert len(index.search('copy')) == 3
+
+        os.unlink(changelog_path)
+        assert index.update([changelog_path]) == 0
+        assert changelog_path not in index
+        assert len(index) == 0
+        assert index.search('copy') == []
+
+    @freeze_time('2021-01-16')
+    def test_bump(self, index, changelog_path, monkeypatch):
+        index.update([changelog_path])
+        monkeypatch.setattr(SearchIndex, 'add_changelog', lambda *args: pytest.fail('The file was indexed again'))
+        index.bump(Changelog(changelog_path), VersionInfo(0, 4, 0))
+        assert index.search('something added') == [
+            SearchHit(changelog_path, '0.4.0', date(2021, 1, 16), 'added', 'Something added')
+        ]
+        assert index.update([changelog_path]) == 0
+
+    def test_save_load(self, index, changelog_path, tmp_path):
+        index_path = str(tmp_path / 'index' / 'search.idx')
+        index.save(index_path)
+        assert not index.changed
+        loaded = SearchIndex.load(index_path)
+        assert loaded.paths == [changelog_path]
+        assert loaded.search('copy') == index.search('copy')
+        assert loaded.update([changelog_path]) == 0
+
+        # Removed entries are left out of the saved index
+        with open(changelog_path, 'a') as f:
+            f.write('\n')
+        loaded.update([changelog_path])
+        loaded.save(index_path)
+        loaded = SearchIndex.load(index_path)
+        assert len(loaded._doc_entries) == len(loaded) == 13
+        assert loaded.search('copy') == index.search('copy')
+
+    def test_save_load_multiline_entry(self, tmp_path):
+        index = SearchIndex()
+        index.add_release('CHANGELOG.md', Release(VersionInfo(1, 0, 0), date(2021, 1, 1), fixed=['one\ntwo', 'three']))
+        index_path = str(tmp_path / 'search.idx')
+        index.save(index_path)
+        loaded = SearchIndex.load(index_path)
+        assert loaded._doc_entries == ['one\ntwo', 'three']
+        assert [hit.entry for hit in loaded.search('two')] == ['one\ntwo']
+        assert [hit.entry for hit in loaded.search('three')] == ['three']
+
+    def test_load_invalid(self, tmp_path):
+        assert len(SearchIndex.load(str(tmp_path / 'missing.idx'))) == 0
+        (tmp_path / 'invalid.idx').write_bytes(b'invalid')
+        assert len(SearchIndex.load(str(tmp_path / 'invalid.idx'))) == 0
+
+    def test_default_index_path(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('KAC_CACHE_DIR', str(tmp_path))
+        assert default_index_path() == os.path.join(str(tmp_path), 'search.idx')
+
+
+class TestSearch:
+    def test_persisted(self, changelog_path, tmp_path, monkeypatch):
+        index_path = str(tmp_path / 'search.idx')
+        assert [h.version for h in search('copy', [changelog_path], index_path=index_path)] == \
+            ['0.2.1', '0.2.0', '0.2.0']
+        assert os.path.exists(index_path)
+
+        monkeypatch.setattr(SearchIndex, 'add_changelog', lambda *args: pytest.fail('The file was indexed again'))
+        assert len(search('copy', [changelog_path], change_type='fixed', limit=1, index_path=index_path)) == 1
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(ChangelogNotFoundError):
+            search('copy', [str(tmp_path / 'missing.md')], index_path=str(tmp_path / 'search.idx'))
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from kac.changelog.util import atomic_write, rreplace
+
+
+class TestUtil:
+    def test_rreplace(self):
+        assert rreplace('v0.1.0...v0.1.0', 'v0.1.0', 'v0.2.0', 1) == 'v0.1.0...v0.2.0'
+
+    def test_atomic_write(self, tmp_path):
+        path = tmp_path / 'CHANGELOG.md'
+        path.write_text('old')
+        os.chmod(path, 0o640)
+
+        with atomic_write(str(path)) as f:
+            f.write(b'new')
+            assert path.read_text() == 'old'
+        assert path.read_text() == 'new'
+        assert os.stat(path).st_mode & 0o777 == 0o640
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_atomic_write_symlink(self, tmp_path):
+        target = tmp_path / 'docs' / 'CHANGELOG.md'
+        target.parent.mkdir()
+        target.write_text('old')
+        link = tmp_path / 'CHANGELOG.md'
+        link.symlink_to(target)
+
+        with atomic_write(str(link)) as f:
+            f.write(b'new')
+        assert link.is_symlink()
+        assert target.read_text() == 'new'
+        assert list(target.parent.iterdir()) == [target]
+
+    def test_atomic_write_failure(self, tmp_path):
+        path = tmp_path / 'CHANGELOG.md'
+        path.write_text('old')
+
+        with pytest.raises(RuntimeError):
+            with atomic_write(str(path)) as f:
+                f.write(b'partial')
+                raise RuntimeError
+        assert path.read_text() == 'old'
+        assert list(tmp_path.iterdir()) == [path]
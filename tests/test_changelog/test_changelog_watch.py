@@ -0,0 +1,210 @@
+import os
+import random
+import time
+from pathlib import Path
+
+import pytest
+
+from kac.bench import generate_changelog
+from kac.changelog import Changelog, ChangelogError, InvalidChangeTypeError, MissingUnreleasedError
+from kac.changelog.parser import changed_range
+from kac.changelog.watch import ChangelogWatcher
+
+
+def _replace_text(path, old, new):
+    Path(path).write_text(Path(path).read_text().replace(old, new))
+
+
+def _assert_same(changelog: Changelog, path):
+    expected = Changelog(str(path))
+    assert changelog._index == expected._index
+    assert changelog.unreleased.changes == expected.unreleased.changes
+    assert changelog.releases == expected.releases
+    assert changelog.full_text == expected.full_text
+
+
+class TestChangedRange:
+    @pytest.mark.parametrize('chunk_size', [1, 3, 65536])
+    def test_changed_range(self, chunk_size):
+        assert changed_range('abcdef', 'abXYef', chunk_size) == (2, 4, 4)
+        assert changed_range('abcdef', 'abcdef', chunk_size) == (6, 6, 6)
+        assert changed_range('abcdef', 'abcXdef', chunk_size) == (3, 3, 4)
+        assert changed_range('aaaa', 'aa', chunk_size) == (2, 4, 2)
+        assert changed_range(b'', b'ab', chunk_size) == (0, 0, 2)
+
+    def test_changed_range_random(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            old = ''.join(rng.choice('ab\n') for _ in range(rng.randint(0, 50)))
+            start = rng.randint(0, len(old))
+            end = rng.randint(start, len(old))
+            new = old[:start] + ''.join(rng.choice('ab\n') for _ in range(rng.randint(0, 5))) + old[end:]
+            prefix, old_end, new_end = changed_range(old, new, rng.choice([1, 4, 64]))
+            assert old[:prefix] == new[:prefix] and old[old_end:] == new[new_end:]
+            assert prefix <= min(old_end, new_end) and old_end - prefix <= end - start
+
+
+class TestRefresh:
+    def test_unchanged(self, changelog_path):
+        changelog = Changelog(changelog_path)
+        assert changelog.refresh() is False
+
+    def test_unreleased_edit_keeps_releases(self, changelog_path):
+        changelog = Changelog(changelog_path)
+        releases = changelog.releases[:]
+        Path(changelog_path).write_text(Path(changelog_path).read_text().replace('- Something added\n',
+                                                                     '- Something added\n- Another thing\n'))
+        assert changelog.refresh() is True
+        assert changelog.unreleased.added == ['Something added', 'Another thing']
+        assert all(a is b for a, b in zip(changelog.releases, releases))
+        _assert_same(changelog, changelog_path)
+
+    def test_release_edit_reparses_release(self, changelog_path):
+        changelog = Changelog(changelog_path, lazy=True)
+        changelog.releases[0]
+        changelog.releases[-1]
+        Path(changelog_path).write_text(Path(changelog_path).read_text().replace('- `bump` and `copy` commands\n',
+                                                                     '- `bump`, `copy` and `init` commands\n'))
+        unreleased = changelog.unreleased
+        assert changelog.refresh() is True
+        assert changelog.unreleased is unreleased
+        assert changelog.releases.parsed_count == 2
+        assert changelog.get_release('0.2.0').added == ['`bump`, `copy` and `init` commands']
+        _assert_same(changelog, changelog_path)
+
+    @pytest.mark.parametrize('old, new', [
+        ('### Fixed\n- Issue where extra',
+         '### Fixed\n- Fix\n\n## [0.2.4] - 2020-03-20\n### Fixed\n- Issue where extra'),
+        ('## [0.2.2] - 2020-01-14\n', ''),
+        ('## [0.2.2] - 2020-01-14\n', '## [0.2.2] - 2020-01-15\n'),
+        ('## [0.3.0] - 2020-04-05\n', '## [0.3.1] - 2020-04-06\n'),
+        ('### Changed\n- `template` command to `new`\n', '## [Notes]\n- Notes\n'),
+        ('# Changelog\n', '# Change Log\n'),
+        ('[0.3.0]: ', '[0.3.0]:  '),
+        ('\n## [0.1.0] - 2019-11-14', '\n[Unreleased]: https://example.com\n## [0.1.0] - 2019-11-14'),
+    ])
+    def test_edits(self, changelog_path, old, new):
+        changelog = Changelog(changelog_path)
+        text = Path(changelog_path).read_text()
+        assert old in text
+        Path(changelog_path).write_text(text.replace(old, new, 1))
+        assert changelog.refresh() is True
+        _assert_same(changelog, changelog_path)
+
+    def test_random_edits(self, tmp_path):
+        path = tmp_path / 'CHANGELOG.md'
+        generate_changelog(str(path), releases=30, entries=2, line_length=20, seed=1)
+        changelog = Changelog(str(path), lazy=True)
+        rng = random.Random(2)
+        snippets = ['- Entry\n', '\n', '## [9.9.9] - 2020-01-01\n', '### Added\n', 'x', '## [', '#']
+        for _ in range(200):
+            text = path.read_text()
+            start = rng.randint(text.index('## [Unreleased]\n') + 16, text.index('[Unreleased]:') - 1)
+            end = min(start + rng.randint(0, 40), text.index('[Unreleased]:') - 1)
+            new_text = text[:start] + rng.choice(snippets) + text[end:]
+            path.write_text(new_text)
+            try:
+                Changelog(str(path))
+            except ChangelogError:  # Keep the edits valid, invalid edits are covered below
+                path.write_text(text)
+                continue
+            changelog.refresh()
+            for idx in rng.sample(range(len(changelog.releases)), min(3, len(changelog.releases))):
+                changelog.releases[idx]
+            _assert_same(changelog, path)
+
+    def test_invalid_edit_keeps_state(self, changelog_path):
+        changelog = Changelog(changelog_path)
+        text = Path(changelog_path).read_text()
+        Path(changelog_path).write_text(text.replace('### Changed\n- Use poetry', '### Chnaged\n- Use poetry'))
+        with pytest.raises(InvalidChangeTypeError):
+            changelog.refresh()
+        Path(changelog_path).write_text(text.replace('## [Unreleased]', '## Unreleased'))
+        with pytest.raises(MissingUnreleasedError):
+            changelog.refresh()
+        Path(changelog_path).write_text(text)
+        _assert_same(changelog, changelog_path)
+        assert changelog.refresh() is False
+
+    def test_refresh_after_bump(self, changelog_path):
+        changelog = Changelog(changelog_path)
+        changelog.bump(changelog.get_next_version('minor'))
+        Path(changelog_path).write_text(Path(changelog_path).read_text().replace('- Use poetry', '- Use Poetry'))
+        changelog.refresh()
+        _assert_same(changelog, changelog_path)
+
+    def test_refresh_after_in_memory_change(self, changelog_path):
+        changelog = Changelog(changelog_path)
+        del changelog.releases[0]
+        _replace_text(changelog_path, '- Something added', '- Something else')
+        changelog.refresh()
+        _assert_same(changelog, changelog_path)
+
+    def test_refresh_memory_map(self, changelog_path):
+        changelog = Changelog(changelog_path, memory_map=True)
+        _replace_text(changelog_path, '- Something added', '- Something else')
+        assert changelog.refresh() is True
+        assert changelog.unreleased.added == ['Something else']
+        changelog.close()
+
+    def test_refresh_large_is_fast(self, tmp_path):
+        path = tmp_path / 'CHANGELOG.md'
+        generate_changelog(str(path), releases=20000)
+        changelog = Changelog(str(path), lazy=True)
+        text = path.read_text()
+
+        def best_time(fn):
+            timings = []
+            for idx in range(3):
+                path.write_text(text.replace('## [Unreleased]\n', f'## [Unreleased]\n### Added\n- Entry {idx}\n', 1))
+                start = time.perf_counter()
+                fn()
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        # Most of a refresh is reading the file, the untouched releases are not scanned again
+        assert best_time(changelog.refresh) < best_time(lambda: Changelog(str(path), lazy=True)) / 2
+        assert changelog.releases.parsed_count == 0
+
+
+class TestChangelogWatcher:
+    def test_poll(self, changelog_path):
+        changes = []
+        watcher = ChangelogWatcher(changelog_path, on_change=changes.append)
+        assert watcher.poll() is False
+
+        _replace_text(changelog_path, '- Something added', '- Something else')
+        assert watcher.poll() is True
+        assert changes == [watcher.changelog]
+        assert watcher.changelog.unreleased.added == ['Something else']
+        assert watcher.poll() is False
+
+    def test_poll_errors(self, changelog_path):
+        errors = []
+        watcher = ChangelogWatcher(changelog_path, on_error=errors.append)
+        text = Path(changelog_path).read_text()
+        Path(changelog_path).write_text(text.replace('### Added', '### Addded', 1))
+        assert watcher.poll() is False
+        assert [e.line for e in errors] == [8]
+
+        Path(changelog_path).write_text(text.replace('### Added', '### Adddded', 1))
+        with pytest.raises(InvalidChangeTypeError):
+            ChangelogWatcher(changelog_path).changelog
+        watcher.on_error = None
+        with pytest.raises(InvalidChangeTypeError):
+            watcher.poll()
+
+    def test_poll_missing_file(self, changelog_path):
+        watcher = ChangelogWatcher(changelog_path)
+        os.unlink(changelog_path)
+        assert watcher.poll() is False
+
+    def test_background_thread(self, changelog_path):
+        changes = []
+        with ChangelogWatcher(changelog_path, interval=0.01, on_change=changes.append) as watcher:
+            _replace_text(changelog_path, '- Something added', '- Something else')
+            deadline = time.monotonic() + 5
+            while not changes and time.monotonic() < deadline:
+                time.sleep(0.01)
+        assert changes == [watcher.changelog]
+        assert watcher.changelog.unreleased.added == ['Something else']
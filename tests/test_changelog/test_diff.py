@@ -0,0 +1,71 @@
+import difflib
+import mmap
+import random
+
+import pytest
+
+from kac.changelog.diff import count_lines, unified_diff
+
+TEXT = ''.join(f'line {idx}\n' for idx in range(40))
+
+
+def at(line):
+    return TEXT.index(f'line {line}\n')
+
+
+def apply(text, edits):
+    for start, end, replacement in sorted(edits, reverse=True):
+        text = text[:start] + replacement + text[end:]
+    return text
+
+
+def expected_diff(old, new, context=3):
+    return ''.join(difflib.unified_diff(old.splitlines(True), new.splitlines(True), 'a', 'b', n=context))
+
+
+class TestUnifiedDiff:
+    @pytest.mark.parametrize('edits', [
+        [(0, 0, 'new first\n')],
+        [(len(TEXT), len(TEXT), 'new last\n')],
+        [(at(20), at(21), 'changed\nlines\n')],
+        [(at(5), at(5), '\n## heading\n'), (at(35), at(36), 'a\nb\n')],
+        # Edits close enough to share their context lines are in a single hunk
+        [(at(10), at(11), ''), (at(14), at(14), 'x\n')],
+        # Edits within a line
+        [(at(7) + 2, at(7) + 4, 'NE'), (at(30) + 5, at(31), '3\n')],
+    ])
+    def test_matches_difflib(self, edits):
+        new = apply(TEXT, edits)
+        assert unified_diff(TEXT, edits, 'a', 'b') == expected_diff(TEXT, new)
+        assert unified_diff(TEXT, edits, 'a', 'b', line_count=TEXT.count('\n')) == expected_diff(TEXT, new)
+        assert unified_diff(TEXT.encode('utf-8'), edits, 'a', 'b') == expected_diff(TEXT, new)
+        assert unified_diff(TEXT, edits, 'a', 'b', context=1) == expected_diff(TEXT, new, context=1)
+
+    def test_random_edits(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            offsets = sorted(rng.sample(range(len(TEXT) + 1), 4))
+            edits = [(offsets[0], offsets[1], rng.choice(['', 'x', 'y\n', '\nz\n'])),
+                     (offsets[2], offsets[3], rng.choice(['', 'x', 'y\n', '\nz\n']))]
+            new = apply(TEXT, edits)
+            diff = unified_diff(TEXT, edits, 'a', 'b', line_count=TEXT.count('\n'))
+            # Both diffs are minimal, but may differ on which of two equal lines was changed
+            assert diff.count('\n+') == expected_diff(TEXT, new).count('\n+')
+            assert diff.count('\n-') == expected_diff(TEXT, new).count('\n-')
+
+    def test_no_newline_at_end(self):
+        assert unified_diff('a\nb', [(2, 3, 'c')], 'a', 'b') == \
+            '--- a\n+++ b\n@@ -1,2 +1,2 @@\n a\n-b\n\\ No newline at end of file\n+c\n\\ No newline at end of file\n'
+
+    def test_no_changes(self):
+        assert unified_diff(TEXT, []) == ''
+        assert unified_diff(TEXT, [(5, 9, TEXT[5:9])]) == ''
+
+    def test_memory_map(self, tmp_path):
+        path = tmp_path / 'text.md'
+        path.write_text(TEXT)
+        edits = [(TEXT.index('line 3'), TEXT.index('line 4'), 'three\n'), (len(TEXT), len(TEXT), 'end\n')]
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            assert count_lines(buf) == count_lines(TEXT) == 40
+            assert count_lines(buf, 10, 30) == count_lines(TEXT, 10, 30)
+            assert unified_diff(buf, edits, 'a', 'b', line_count=40) == expected_diff(TEXT, apply(TEXT, edits))
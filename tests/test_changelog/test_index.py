@@ -0,0 +1,35 @@
+from datetime import date
+
+from kac.changelog.index import ReleaseIndex
+
+HEADINGS = [
+    ((2, 0, 0, None, None), date(2021, 3, 1)),
+    ((2, 0, 0, 'rc.2', None), date(2021, 2, 1)),
+    ((2, 0, 0, 'rc.1', 'build.5'), date(2021, 1, 15)),
+    ((1, 10, 0, None, None), date(2021, 1, 15)),
+    ((1, 9, 1, None, None), date(2020, 12, 1)),
+]
+
+
+class TestReleaseIndex:
+    def test_position(self):
+        index = ReleaseIndex(HEADINGS)
+        assert len(index) == 5
+        assert index.position((1, 10, 0, None, None)) == 3
+        assert index.position((2, 0, 0, 'rc.1', None)) == 2  # Build metadata is ignored
+        assert index.position((3, 0, 0, None, None)) is None
+
+    def test_positions_between(self):
+        index = ReleaseIndex(HEADINGS)
+        assert index.positions_between((1, 9, 5, None, None), (2, 0, 0, 'rc.2', None)) == [1, 2, 3]
+        assert index.positions_between((2, 0, 0, 'rc.1', None), None) == [0, 1, 2]
+        assert index.positions_between(None, (1, 10, 0, None, None)) == [3, 4]
+        assert index.positions_between(None, None) == [0, 1, 2, 3, 4]
+        assert index.positions_between((5, 0, 0, None, None), None) == []
+
+    def test_positions_in_dates(self):
+        index = ReleaseIndex(HEADINGS)
+        assert index.positions_in_dates(date(2021, 1, 1), date(2021, 2, 1)) == [1, 2, 3]
+        assert index.positions_in_dates(date(2021, 1, 15), date(2021, 1, 15)) == [2, 3]
+        assert index.positions_in_dates(None, date(2020, 12, 31)) == [4]
+        assert index.positions_in_dates(date(2022, 1, 1), None) == []
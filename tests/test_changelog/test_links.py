@@ -0,0 +1,112 @@
+from pathlib import Path
+
+import pytest
+
+from kac.changelog import Changelog, ChangelogParseError, InvalidLinkError
+from kac.changelog.links import FooterLinks, split_compare_url
+
+FOOTER = '''[Unreleased]: https://github.com/atwalsh/kac/compare/v0.2.0...master
+[0.2.0]: https://github.com/atwalsh/kac/compare/v0.1.0...v0.2.0
+[0.1.0]: https://github.com/atwalsh/kac/releases/tag/v0.1.0
+[docs]: https://example.com/docs
+'''
+
+
+class TestFooterLinks:
+    @pytest.mark.parametrize('url, expected', [
+        ('https://github.com/a/b/compare/v0.3.0...master', ('https://github.com/a/b/compare', 'master')),
+        ('https://gitlab.com/a/b/-/compare/v1.0.0...HEAD', ('https://gitlab.com/a/b/-/compare', 'HEAD')),
+        ('https://github.com/a/b/compare/v1.0.0', ('https://github.com/a/b/compare', 'HEAD')),
+        ('', (None, 'HEAD')),
+    ])
+    def test_split_compare_url(self, url, expected):
+        assert split_compare_url(url) == expected
+
+    def test_parse(self):
+        links = FooterLinks.parse(FOOTER + '\n[0.1.0]: https://example.com/duplicate\n')
+        assert list(links) == ['Unreleased', '0.2.0', '0.1.0', 'docs']
+        assert links['0.1.0'] == 'https://github.com/atwalsh/kac/releases/tag/v0.1.0'
+        assert links.line_of('docs') == 3
+        assert (links.compare_base, links.head) == ('https://github.com/atwalsh/kac/compare', 'master')
+        assert links.compare_url('0.1.0', '0.2.0') == links['0.2.0']
+
+    def test_add_release(self):
+        links = FooterLinks.parse(FOOTER)
+        assert links.add_release('0.3.0', '0.2.0') == \
+            '[0.3.0]: https://github.com/atwalsh/kac/compare/v0.2.0...v0.3.0'
+        assert list(links)[:3] == ['Unreleased', '0.3.0', '0.2.0']
+        assert links['Unreleased'] == 'https://github.com/atwalsh/kac/compare/v0.3.0...master'
+        assert links.validate(['0.3.0', '0.2.0', '0.1.0']) == []
+
+    def test_validate(self):
+        links = FooterLinks.parse(FOOTER.replace('v0.1.0...v0.2.0', 'v0.0.9...v0.2.0'))
+        errors = links.validate(['0.3.0', '0.2.0', '0.1.0'])
+        assert [(type(e), e.message, e.line) for e in errors] == [
+            (InvalidLinkError, 'Link for Unreleased should be https://github.com/atwalsh/kac/compare/v0.3.0...master',
+             1),
+            (InvalidLinkError, 'Missing link for 0.3.0', None),
+            (InvalidLinkError, 'Link for 0.2.0 should be https://github.com/atwalsh/kac/compare/v0.1.0...v0.2.0', 2),
+        ]
+        assert FooterLinks.parse('[Unreleased]: nowhere\n').validate(['0.1.0'])[0].line == 1
+
+    def test_regenerate(self):
+        links = FooterLinks.parse(FOOTER)
+        assert links.regenerate(['0.3.0', '0.2.0', '0.1.0', '0.0.1']) == '''\
+[Unreleased]: https://github.com/atwalsh/kac/compare/v0.3.0...master
+[0.3.0]: https://github.com/atwalsh/kac/compare/v0.2.0...v0.3.0
+[0.2.0]: https://github.com/atwalsh/kac/compare/v0.1.0...v0.2.0
+[0.1.0]: https://github.com/atwalsh/kac/compare/v0.0.1...v0.1.0
+[0.0.1]: https://github.com/atwalsh/kac/releases/tag/v0.0.1
+[docs]: https://example.com/docs
+'''
+        with pytest.raises(ChangelogParseError):
+            FooterLinks.parse('[Unreleased]: nowhere\n').regenerate(['0.1.0'])
+
+
+class TestChangelogLinks:
+    def test_validate_links(self, test_changelog):
+        assert len(test_changelog.links) == 10
+        assert test_changelog.validate_links() == []
+
+    def test_regenerate_links(self, changelog_path):
+        text = Path(changelog_path).read_text()
+        Path(changelog_path).write_text(text.replace('compare/v0.2.1...v0.2.2', 'compare/v0.2.0...v0.2.2'))
+        changelog = Changelog(changelog_path, lazy=True)
+        errors = changelog.validate_links()
+        assert [(e.message, e.path, e.line) for e in errors] == [
+            ('Link for 0.2.2 should be https://github.com/atwalsh/kac/compare/v0.2.1...v0.2.2', changelog_path,
+             text.splitlines().index('[0.2.2]: https://github.com/atwalsh/kac/compare/v0.2.1...v0.2.2') + 1),
+        ]
+        changelog.regenerate_links()
+        assert Path(changelog_path).read_text() == text
+        assert changelog.validate_links() == []
+
+    def test_bump_updates_links(self, changelog_path):
+        changelog = Changelog(changelog_path)
+        links = changelog.links
+        changelog.bump(changelog.get_next_version('minor'))
+        assert changelog.links is links
+        assert links['0.4.0'] == 'https://github.com/atwalsh/kac/compare/v0.3.0...v0.4.0'
+        assert changelog.validate_links() == []
+        assert list(Changelog(changelog_path).links.items()) == list(links.items())
+
+    def test_bump_failure_keeps_links(self, changelog_path, monkeypatch):
+        changelog = Changelog(changelog_path)
+        links = list(changelog.links.items())
+
+        def fail(*args, **kwargs):
+            raise OSError('Disk full')
+
+        monkeypatch.setattr(changelog, '_write_span', fail)
+        with pytest.raises(OSError):
+            changelog.bump(changelog.get_next_version('minor'))
+        assert list(changelog.links.items()) == links
+        assert changelog.validate_links() == []
+
+    def test_bump_without_url(self, changelog_path):
+        Path(changelog_path).write_text(Path(changelog_path).read_text().replace(
+            '[Unreleased]: https://github.com/atwalsh/kac/compare/v0.3.0...master', '[Unreleased]: TODO'))
+        changelog = Changelog(changelog_path)
+        with pytest.raises(ChangelogParseError) as e:
+            changelog.bump(changelog.get_next_version('patch'))
+        assert e.value.path == changelog_path
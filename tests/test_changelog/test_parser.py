@@ -0,0 +1,181 @@
+import io
+import time
+from datetime import date
+
+import pytest
+
+from kac.changelog.parser import (ChangelogHead, ReleaseSpan, ReleaseSpans, iter_changes, parse_date, read_head, scan,
+                                  split_heading, split_headings)
+
+
+def _pathological_changelog(releases: int) -> str:
+    """Build a CHANGELOG with long runs of whitespace-heavy entries that backtrack badly with nested quantifiers."""
+    body = ''.join(
+        f'## [{i}.0.0] - 2020-01-01\n### Added\n' + '-   \t \n' * 20 + '- ' + ' ' * 200 + '\n\n'
+        for i in range(releases, 0, -1)
+    )
+    return f'# Changelog\n\n## [Unreleased]\n### Fixed\n- {" " * 500}\n\n{body}' \
+           f'[Unreleased]: https://github.com/atwalsh/kac/compare/v{releases}.0.0...HEAD\n'
+
+
+def _best_scan_time(text: str) -> float:
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        scan(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+class TestScan:
+    def test_scan(self, test_changelog_path):
+        with open(test_changelog_path) as f:
+            text = f.read()
+        index = scan(text)
+
+        assert text[:index.unreleased_start].endswith('semver.org/spec/v2.0.0.html).\n\n')
+        assert text[index.unreleased_start:index.unreleased_body_start] == '## [Unreleased]\n'
+        assert text[index.unreleased_body_start:index.unreleased_end].startswith('### Added\n- Something added\n')
+        assert text[index.footer_start:].startswith('[Unreleased]: ')
+        assert index.end == len(text)
+
+        assert len(index.releases) == 9
+        first = index.releases[0]
+        assert text[first.start:first.body_start] == '## [0.3.0] - 2020-04-05\n'
+        assert first.end == index.releases[1].start
+        assert index.releases[-1].end == index.footer_start
+
+    def test_scan_bytes(self, test_changelog_path):
+        with open(test_changelog_path, 'rb') as f:
+            data = f.read()
+        with open(test_changelog_path) as f:
+            text = f.read()
+        assert scan(data) == scan(text)  # ASCII file, so byte and character offsets agree
+
+    def test_scan_missing_sections(self):
+        assert scan('# Changelog\n\n## [0.1.0] - 2020-01-01\n') is None
+        assert scan('# Changelog\n\n## [Unreleased]\n### Added\n- A\n') is None
+
+    def test_scan_skips_non_release_headings(self):
+        text = '## [Unreleased]\n\n## [Notes]\n- Not a release\n\n## [0.1.0] - 2020-01-01\n### Added\n- A\n\n' \
+               '[Unreleased]: https://example.com\n'
+        index = scan(text)
+        assert index.unreleased_end == text.index('## [0.1.0]')
+        start, body_start, end = text.index('## [0.1.0]'), text.index('### Added'), text.index('[Unreleased]:')
+        assert index.releases == [ReleaseSpan(start, body_start, end)]
+
+    def test_scan_yanked_release(self):
+        text = '## [Unreleased]\n\n## [0.2.0] - 2020-03-01 [YANKED]\n### Added\n- B\n\n## [0.1.0] - 2020-01-01\n' \
+               '### Added\n- A\n\n[Unreleased]: https://example.com\n'
+        yanked, body_start = text.index('## [0.2.0]'), text.index('### Added')
+        assert scan(text).releases == [ReleaseSpan(yanked, body_start, text.index('## [0.1.0]')),
+                                       ReleaseSpan(text.index('## [0.1.0]'), text.index('### Added\n- A'),
+                                                   text.index('[Unreleased]:'))]
+        assert read_head(io.BytesIO(text.encode()), 1)[1].latest == scan(text.encode()).releases[0]
+
+    def test_scan_linear(self):
+        small, large = _pathological_changelog(250), _pathological_changelog(2000)
+        assert scan(large) is not None
+        # 8x the input should take roughly 8x the time; quadratic or exponential behaviour would blow well past this
+        assert _best_scan_time(large) < max(_best_scan_time(small), 1e-4) * 24
+
+
+class TestReadHead:
+    @pytest.mark.parametrize('chunk_size', [1, 7, 8192])
+    def test_read_head(self, test_changelog_path, chunk_size):
+        with open(test_changelog_path, 'rb') as f:
+            data = f.read()
+        f = io.BytesIO(data)
+        buf, head = read_head(f, chunk_size)
+
+        assert data.startswith(buf)
+        # Stops once the heading that follows the latest release is read, reads double in size up to then
+        assert len(buf) <= max(chunk_size, 2 * data.index(b'## [0.2.3]'))
+        assert head.unreleased_start == data.index(b'## [Unreleased]')
+        assert head.latest == scan(data).releases[0]
+
+    def test_read_head_constant(self):
+        for releases in (100, 2000):
+            data = _pathological_changelog(releases).encode()
+            f = io.BytesIO(data)
+            buf, head = read_head(f)
+            assert f.tell() == 8192
+            assert head.latest == scan(data).releases[0]
+
+    @pytest.mark.parametrize('chunk_size', [1, 8192])
+    def test_read_head_whole_file(self, chunk_size):
+        data = b'## [Unreleased]\n\n## [Notes]\n## [0.1.0] - 2020-01-01\n### Added\n- A\n'
+        buf, head = read_head(io.BytesIO(data), chunk_size)
+        assert buf == data
+        assert head.latest == ReleaseSpan(data.index(b'## [0.1.0]'), data.index(b'### Added'), len(data))
+
+        data += b'[Unreleased]: https://example.com\n'
+        assert read_head(io.BytesIO(data), chunk_size)[1].latest.end == data.index(b'[Unreleased]:')
+
+    def test_read_head_missing_sections(self):
+        assert read_head(io.BytesIO(b'# Changelog\n\n## [0.1.0] - 2020-01-01\n'))[1] is None
+        assert read_head(io.BytesIO(b'## [Unreleased]\n- A\n[Unreleased]: x\n## [0.1.0] - 2020-01-01\n'), 1)[1] == \
+            ChangelogHead(0, 16, None)
+
+
+class TestReleaseSpans:
+    def test_sequence(self):
+        spans = ReleaseSpans([ReleaseSpan(0, 1, 2), ReleaseSpan(2, 3, 4)])
+        assert len(spans) == 2
+        assert spans[-1] == ReleaseSpan(2, 3, 4)
+        assert spans[1:] == [ReleaseSpan(2, 3, 4)]
+
+        spans.insert(0, ReleaseSpan(-1, -1, -1))
+        spans[2] = ReleaseSpan(5, 6, 7)
+        del spans[1]
+        assert spans == [ReleaseSpan(-1, -1, -1), ReleaseSpan(5, 6, 7)]
+        assert ReleaseSpans(spans) == spans
+
+        spans[1:] = [ReleaseSpan(8, 9, 10), ReleaseSpan(11, 12, 13)]
+        del spans[::2]
+        assert spans == [ReleaseSpan(8, 9, 10)]
+
+
+class TestSplitHeading:
+    def test_split_heading(self):
+        assert split_heading('## [0.3.0] - 2020-04-05\n') == ('0.3.0', '2020-04-05')
+        assert split_heading(b'## [1.0.0-rc.1+build.2] - 2021-01-16') == ('1.0.0-rc.1+build.2', '2021-01-16')
+        assert split_heading('## [0.2.0] - 2020-03-01 [YANKED]\n') == ('0.2.0', '2020-03-01')
+
+    def test_split_headings(self, test_changelog_path):
+        with open(test_changelog_path, 'rb') as f:
+            data = f.read()
+        spans = scan(data).releases
+        expected = [split_heading(data[span.start:span.body_start]) for span in spans]
+        assert split_headings(data, spans) == split_headings(data.decode(), spans) == expected
+        assert split_headings(data, [ReleaseSpan(0, 10, 10)]) == [None]
+
+    def test_split_heading_invalid(self):
+        assert split_heading('## [Unreleased]') is None
+        assert split_heading('## [0.3.0]') is None
+        assert split_heading('## [0.3.0] - April 5th') is None
+        assert split_heading('### Added') is None
+
+
+class TestParseDate:
+    def test_parse_date(self):
+        assert parse_date('2020-04-05') == date(2020, 4, 5)
+        assert parse_date('2020-4-5') == date(2020, 4, 5)
+
+    @pytest.mark.parametrize('text', ['2020-02-30', '20-04-05', '2020-04', '2020-004-05', '2020--05', 'x'])
+    def test_parse_date_invalid(self, text):
+        with pytest.raises(ValueError):
+            parse_date(text)
+
+
+class TestIterChanges:
+    def test_iter_changes(self):
+        changes = '### Added\n- Add A\n- Add B  \n\nSome prose\n### Changed \n- Change C\n'
+        assert list(iter_changes(changes)) == [('Added', 'Add A'), ('Added', 'Add B'), ('Changed', 'Change C')]
+
+    def test_iter_changes_ignores_entries_without_heading(self):
+        assert list(iter_changes('- Orphan\n## Other\n- Orphan\n')) == []
+
+    def test_iter_changes_ignores_headings_of_many_words(self):
+        changes = '### Added stuff\n- Ignored\n### Fixed  \n- Fix A\n###  Removed\n- Ignored\n'
+        assert list(iter_changes(changes)) == [('Fixed', 'Fix A')]
@@ -1,11 +1,14 @@
+import pickle
+import tracemalloc
 from collections import OrderedDict
 from datetime import date
 
-import click
 import pytest
 from semver import VersionInfo
 
-from kac.changelog.release import ReleaseBase, Release, Unreleased
+from kac.changelog.exceptions import InvalidChangeTypeError
+from kac.changelog.parser import ReleaseSpan
+from kac.changelog.release import ReleaseBase, Release, ReleaseList, Unreleased
 
 
 class TestReleaseBase:
@@ -25,6 +28,67 @@ class TestReleaseBase:
             rb.changes['security'],
         ])
 
+    def test_slots(self):
+        rb = ReleaseBase(['Added something'])
+        assert not hasattr(rb, '__dict__')
+        with pytest.raises(AttributeError):
+            rb.unknown = 'value'
+
+    def test_set_changes(self):
+        rb = ReleaseBase(['Add A'], fixed=['Fix B'])
+        rb.changed = ['Change C']
+        rb.added = rb.added + ['Add D']
+        assert rb.changes == OrderedDict(
+            [('added', ['Add A', 'Add D']), ('changed', ['Change C']), ('deprecated', []), ('fixed', ['Fix B']),
+             ('removed', []), ('security', [])])
+
+        # Changes made to the lists returned by the change type attributes are written back
+        rb.fixed.append('Fix E')
+        rb.added[0] = 'Add F'
+        rb.changed += ['Change G']
+        del rb.added[1]
+        assert rb.changes == OrderedDict(
+            [('added', ['Add F']), ('changed', ['Change C', 'Change G']), ('deprecated', []),
+             ('fixed', ['Fix B', 'Fix E']), ('removed', []), ('security', [])])
+        assert rb.changes_text == '### Added\n- Add F\n\n### Changed\n- Change C\n- Change G\n\n' \
+                                  '### Fixed\n- Fix B\n- Fix E\n\n'
+
+    def test_changes_write_through(self):
+        rb = ReleaseBase(['Add A'])
+        rb.changes['fixed'].append('Fix B')
+        rb.changes['added'][0] = 'Add C'
+        assert rb.fixed == ['Fix B']
+        assert rb.changes_text == '### Added\n- Add C\n\n### Fixed\n- Fix B\n\n'
+        assert pickle.loads(pickle.dumps(rb.changes['added'])) == ['Add C']
+
+        rb.freeze()
+        with pytest.raises(AttributeError):
+            rb.changes['added'].append('Add D')
+
+    def test_frozen(self):
+        rb = ReleaseBase(['Add A'], frozen=True)
+        assert rb.frozen
+        with pytest.raises(AttributeError):
+            rb.added = []
+        assert rb.added == ['Add A']
+
+        rb = ReleaseBase(['Add A'])
+        rb.freeze()
+        with pytest.raises(AttributeError):
+            rb.removed = ['Remove B']
+        with pytest.raises(AttributeError):
+            rb.added.append('Add C')
+        with pytest.raises(AttributeError):
+            rb.added.clear()
+        assert rb.added == ['Add A']
+
+        release = Release(VersionInfo(1, 0, 0), date(2021, 2, 11), frozen=True)
+        with pytest.raises(AttributeError):
+            release.release_date = date(2021, 2, 12)
+        with pytest.raises(AttributeError):
+            release.version = VersionInfo(1, 0, 1)
+        assert (release.version, release.release_date) == (VersionInfo(1, 0, 0), date(2021, 2, 11))
+
     def test_changes_to_dict(self):
         changes = '### Added\n- Add A\n\n### Changed\n- Change B\n'
         cd = ReleaseBase.changes_to_dict(changes)
@@ -37,14 +101,53 @@ class TestReleaseBase:
             'security': []
         }
 
+    def test_changes_to_dict_heading_of_many_words(self):
+        cd = ReleaseBase.changes_to_dict('### Added stuff\n- Add A\n\n### Changed\n- Change B\n')
+        assert (cd['added'], cd['changed']) == ([], ['Change B'])
+
     def test_changes_to_dict_invalid_item(self):
-        changes = '### BadChange\n- Add A\n\n### Changed\n- Change B\n'
-        with pytest.raises(click.Abort):
+        changes = '### Changed\n- Change B\n\n### BadChange\n- Add A\n'
+        with pytest.raises(InvalidChangeTypeError) as e:
             ReleaseBase.changes_to_dict(changes)
+        assert (e.value.message, e.value.line, e.value.column) == ('Invalid change type: BadChange', 4, 5)
+
+    def test_changes_to_dict_collect_errors(self):
+        changes = '### BadChange\n- Add A\n- Add B\n\n### Changed\n- Change B\n### Other\n- C\n'
+        errors = []
+        cd = ReleaseBase.changes_to_dict(changes, errors)
+        assert cd['changed'] == ['Change B']
+        assert [(e.message, e.line) for e in errors] == [('Invalid change type: BadChange', 1),
+                                                        ('Invalid change type: Other', 7)]
 
     def test_changes_text(self):
         rb = ReleaseBase(['Added something'], ['Changed A'])
         assert rb.changes_text == '### Added\n- Added something\n\n### Changed\n- Changed A\n\n'
+        assert ReleaseBase().changes_text == ''
+
+    def test_changes_text_is_cached(self):
+        rb = ReleaseBase(['A', 'B'], fixed=['C'])
+        assert rb.changes_text is rb.changes_text
+        rb.fixed = ['D']
+        assert rb.changes_text == '### Added\n- A\n- B\n\n### Fixed\n- D\n\n'
+        rb.freeze()
+        assert rb.changes_text is rb.changes_text
+
+    @pytest.mark.parametrize('text, adopted', [
+        ('### Added\n- A\n- B\n\n### Fixed\n- C\n\n', True),
+        ('', True),
+        ('### Added\n- A\n\n\n', False),  # Extra blank line
+        ('### Fixed\n- C\n\n### Added\n- A\n\n', False),  # Change types out of order
+        ('### added\n- A\n\n', False),
+        ('### Added\n- A \n\n', False),  # Trailing whitespace is stripped from entries
+        ('### Added\n-  A\n\n', False),
+        ('### Added\n- A\r\n\n', False),
+        ('### Added\nNote\n- A\n\n', False),
+    ])
+    def test_adopt_text(self, text, adopted):
+        rb = ReleaseBase(**ReleaseBase.changes_to_dict(text))
+        rb._adopt_text(text)
+        assert (rb.changes_text is text) is adopted
+        assert rb.changes_text == ReleaseBase(**ReleaseBase.changes_to_dict(text)).changes_text
 
 
 class TestRelease:
@@ -57,6 +160,43 @@ class TestRelease:
         # Equality only checks date and release number
         assert r == Release(VersionInfo(0, 3), date(2021, 2, 11), changed=['Changed A'])
 
+    def test_packed_version(self):
+        r = Release((1, 2, 3, 'rc.1', None), date(2021, 2, 11))
+        assert r.packed_version == (1, 2, 3, 'rc.1', None)
+        assert r._version_info is None
+        assert r.__repr__() == '<Release v1.2.3-rc.1 - 2021-02-11>'
+        assert r.version == VersionInfo(1, 2, 3, prerelease='rc.1')
+        assert r.version is r.version
+
+        assert r == Release(VersionInfo(1, 2, 3, prerelease='rc.1', build='b.1'), date(2021, 2, 11))
+        assert r != Release(VersionInfo(1, 2, 3), date(2021, 2, 11))
+        assert r != 'v1.2.3-rc.1'
+
+        r.version = VersionInfo(2)
+        assert r.packed_version == (2, 0, 0, None, None)
+        r.freeze()
+        with pytest.raises(AttributeError):
+            r.version = VersionInfo(3)
+
+    def test_memory(self):
+        entries = [f'Entry {i}' for i in range(3000)]
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            releases = [Release((1, 2, i, None, None), date(2021, 2, 11), entries[3 * i:3 * i + 2],
+                                fixed=entries[3 * i + 2:3 * i + 3]) for i in range(1000)]
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert len(releases) == 1000
+        # A release with an OrderedDict, six lists and a VersionInfo took over 1.2KB
+        assert (after - before) / 1000 < 400
+
+    def test_init_fixed_removed(self):
+        r = Release(VersionInfo(0, 3), date(2021, 2, 11), fixed=['Fixed A'], removed=['Removed B'])
+        assert r.fixed == ['Fixed A']
+        assert r.removed == ['Removed B']
+
 
 class TestUnreleased:
     def test_init(self):
@@ -69,3 +209,70 @@ class TestUnreleased:
 
         u1 = Unreleased(['Add A'], ['Change B'])
         assert u1.has_changes
+
+
+class TestReleaseList:
+    def test_lazy_parse(self):
+        parsed = []
+
+        def parse(span):
+            parsed.append(span.start)
+            return Release(VersionInfo(0, span.start), date(2021, 2, 11))
+
+        rl = ReleaseList([ReleaseSpan(3, 3, 3), ReleaseSpan(2, 2, 2), ReleaseSpan(1, 1, 1)], parse)
+        assert len(rl) == 3
+        assert rl.parsed_count == 0
+
+        assert rl[0].version == VersionInfo(0, 3)
+        assert rl[0].version == VersionInfo(0, 3)
+        assert parsed == [3]
+
+        assert [r.version for r in rl[1:]] == [VersionInfo(0, 2), VersionInfo(0, 1)]
+        assert parsed == [3, 2, 1]
+        assert rl.parsed_count == 3
+
+    def test_insert(self):
+        rl = ReleaseList([ReleaseSpan(1, 1, 1)], lambda span: Release(VersionInfo(0, span.start), date(2021, 2, 11)))
+        rl.insert(0, Release(VersionInfo(0, 2), date(2021, 2, 12)))
+        assert rl.parsed_count == 1
+        assert [r.version for r in rl] == [VersionInfo(0, 2), VersionInfo(0, 1)]
+
+    def test_all_headings(self):
+        batches = []
+
+        def parse_headings(spans):
+            batches.append([span.start for span in spans])
+            return [((0, span.start, 0, None, None), date(2021, 2, span.start)) for span in spans]
+
+        rl = ReleaseList([ReleaseSpan(i, i, i) for i in range(3, 0, -1)],
+                         lambda span: Release(VersionInfo(0, span.start), date(2021, 2, 11)), None, parse_headings)
+        rl.insert(0, Release(VersionInfo(1, 0), date(2021, 2, 12)))
+        rl[2].freeze()  # Parsed, so its heading is not parsed again
+        assert rl.all_headings() == [
+            ((1, 0, 0, None, None), date(2021, 2, 12)),
+            ((0, 3, 0, None, None), date(2021, 2, 3)),
+            ((0, 2, 0, None, None), date(2021, 2, 11)),
+            ((0, 1, 0, None, None), date(2021, 2, 1)),
+        ]
+        assert batches == [[3, 1]]
+
+    def test_slices(self):
+        rl = ReleaseList([ReleaseSpan(i, i, i) for i in range(5, 0, -1)],
+                         lambda span: Release(VersionInfo(0, span.start), date(2021, 2, 11)))
+        del rl[0:2]
+        assert len(rl) == len(rl._spans) == 3
+        rl[1:] = [Release(VersionInfo(0, 9), date(2021, 2, 12))]
+        assert [r.version for r in rl] == [VersionInfo(0, 3), VersionInfo(0, 9)]
+        with pytest.raises(ValueError):
+            rl[::2] = []
+        with pytest.raises(TypeError):
+            del rl['0']
+        assert len(rl) == len(rl._spans) == 2
+
+    def test_reindex(self):
+        rl = ReleaseList([ReleaseSpan(1, 1, 1)], lambda span: Release(VersionInfo(0, span.start), date(2021, 2, 11)))
+        rl.insert(0, Release(VersionInfo(0, 2), date(2021, 2, 12)))
+        rl.reindex([ReleaseSpan(0, 0, 0), ReleaseSpan(5, 5, 5)])
+        assert [r.version for r in rl] == [VersionInfo(0, 2), VersionInfo(0, 5)]
+        with pytest.raises(ValueError):
+            rl.reindex([])
@@ -0,0 +1,74 @@
+import io
+import json
+
+import pytest
+from semver import VersionInfo
+
+from kac.changelog import Changelog, trace
+from kac.changelog.trace import Tracer
+
+
+class TestTracer:
+    def test_off_by_default(self, changelog_path):
+        assert trace.active() is None
+        Changelog(changelog_path)
+        with trace.span('phase') as event:
+            event['args']['bytes'] = 1
+
+    def test_load(self, changelog_path):
+        with trace.tracing() as tracer:
+            Changelog(changelog_path)
+        assert trace.active() is None
+        events = {e['name']: e for e in tracer.events}
+        assert [e['name'] for e in tracer.events] == ['read', 'scan', 'parse_unreleased', 'parse_releases', 'load']
+        assert events['read']['args'] == {'bytes': 1965}
+        assert events['scan']['args'] == {'bytes': 1965, 'releases': 9}
+        assert events['parse_releases']['args'] == {'releases': 9}
+        assert events['load']['args']['path'] == changelog_path
+        assert events['load']['duration'] >= events['parse_releases']['duration'] > 0
+        assert tracer.totals['parse_heading']['count'] == 9
+        assert tracer.totals['parse_heading']['args'] == {'releases': 9}
+        assert tracer.totals['parse_changes']['args']['bytes'] > 0
+
+    def test_bump_and_render(self, changelog_path):
+        changelog = Changelog(changelog_path, lazy=True)
+        with trace.tracing() as tracer:
+            changelog.bump(VersionInfo(1, 0, 0))
+            changelog.latest_release.changes_text
+        assert [e['name'] for e in tracer.events] == ['write', 'rescan', 'bump']
+        assert tracer.events[0]['args']['bytes'] > 1965
+        assert tracer.totals['footer']['count'] == 1
+        assert tracer.totals['render']['count'] == 1
+
+    def test_nested_tracing(self):
+        outer = Tracer()
+        with trace.tracing(outer):
+            with trace.tracing() as inner:
+                assert trace.active() is inner
+            assert trace.active() is outer
+
+    def test_on_event(self, changelog_path):
+        names = []
+        with trace.tracing(Tracer(on_event=lambda e: names.append(e['name']))):
+            Changelog.read_latest_release(changelog_path)
+        assert names == ['read_head']
+
+    def test_write(self, changelog_path):
+        with trace.tracing() as tracer:
+            Changelog(changelog_path)
+
+        f = io.StringIO()
+        tracer.write(f)
+        data = json.loads(f.getvalue())
+        assert [e['name'] for e in data['events']][-1] == 'load'
+        assert data['totals']['parse_heading']['count'] == 9
+
+        f = io.StringIO()
+        tracer.write(f, 'chrome')
+        data = json.loads(f.getvalue())
+        assert [e['name'] for e in data['traceEvents']][0] == 'load'  # Sorted by start time
+        assert {e['ph'] for e in data['traceEvents']} == {'X'}
+        assert 'parse_heading' in data['otherData']['totals']
+
+        with pytest.raises(ValueError):
+            tracer.write(f, 'xml')
@@ -0,0 +1,123 @@
+import time
+
+import pytest
+from semver import VersionInfo
+
+from kac.changelog import version
+from kac.changelog.version import (CANDIDATES, coerce, format_version, next_version, next_versions, next_versions_many,
+                                   pack, parse, parse_versions, precedence_key, unpack)
+
+
+@pytest.fixture
+def empty_caches(monkeypatch):
+    for name in ('_parsed', '_formatted', '_unpacked'):
+        monkeypatch.setattr(version, name, {})
+
+
+def _best_time(func, *args) -> float:
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+class TestVersion:
+    @pytest.mark.parametrize('text', ['0.1.0', '10.20.30', '1.0.0-rc.1', '1.0.0+build.5', '1.0.0-alpha-1.0+001'])
+    def test_parse(self, text):
+        assert unpack(parse(text)) == VersionInfo.parse(text)
+        assert parse(text) == pack(VersionInfo.parse(text))
+        assert format_version(parse(text)) == str(VersionInfo.parse(text))
+
+    @pytest.mark.parametrize('text', ['1.0', 'v1.0.0', '01.0.0', '1.00.0', '1.0.0.0', '1..0', '1.0.١', '1.0.0-',
+                                      '1.0.0-01', 'Unreleased'])
+    def test_parse_invalid(self, text, empty_caches):
+        with pytest.raises(ValueError):
+            parse(text)
+        with pytest.raises(ValueError):
+            VersionInfo.parse(text)
+        assert text not in version._parsed
+
+    def test_parse_interned(self, empty_caches):
+        assert parse('1.2.3') is parse(''.join(['1.2', '.3']))
+        assert format_version(parse('1.2.3')) == '1.2.3'
+        assert unpack(parse('1.2.3')) is unpack((1, 2, 3, None, None))
+
+    def test_parse_bounded(self, empty_caches, monkeypatch):
+        monkeypatch.setattr(version, '_VERSION_CACHE_SIZE', 2)
+        assert parse_versions(['1.0.0', '1.0.1', '1.0.2', '1.0.0']) == [(1, 0, 0, None, None), (1, 0, 1, None, None),
+                                                                     (1, 0, 2, None, None), (1, 0, 0, None, None)]
+        assert list(version._parsed) == ['1.0.0', '1.0.1']
+        assert len(version._formatted) == 2
+        assert format_version((1, 0, 2, None, None)) == '1.0.2'
+        assert len(version._formatted) == 2
+
+    def test_parse_versions(self):
+        texts = ['1.0.0', '0.1.0', '1.0.0-rc.1+build.2', '1.0.0']
+        assert parse_versions(texts) == [parse(text) for text in texts]
+        assert parse_versions([]) == []
+        with pytest.raises(ValueError):
+            parse_versions(['1.0.0', '1.0'])
+
+    def test_parse_versions_faster(self):
+        # The same few versions appear in most CHANGELOG files
+        texts = [f'{major}.{minor}.{patch}' for major in range(3) for minor in range(10) for patch in range(5)] * 100
+        texts += ['1.0.0-rc.1', '2.0.0+build.1'] * 100
+        assert [unpack(v) for v in parse_versions(texts)] == [VersionInfo.parse(text) for text in texts]
+        assert _best_time(parse_versions, texts) * 2 < _best_time(lambda: [VersionInfo.parse(text) for text in texts])
+
+    def test_pack(self):
+        assert pack(VersionInfo(1, 2, 3, 'rc.1', 'b')) == (1, 2, 3, 'rc.1', 'b')
+        assert pack([1, 2, 3, None, None]) == (1, 2, 3, None, None)
+
+    def test_coerce(self):
+        assert coerce('v1.2.3') == coerce('1.2.3') == coerce(VersionInfo(1, 2, 3)) == (1, 2, 3, None, None)
+
+    def test_precedence_key(self):
+        # Example precedence order from the semver specification
+        versions = ['1.0.0-alpha', '1.0.0-alpha.1', '1.0.0-alpha.beta', '1.0.0-beta', '1.0.0-beta.2', '1.0.0-beta.11',
+                    '1.0.0-rc.1', '1.0.0', '1.0.1', '1.1.0', '2.0.0']
+        assert sorted(reversed(versions), key=lambda v: precedence_key(parse(v))) == versions
+        assert precedence_key(parse('1.0.0+build.1')) == precedence_key(parse('1.0.0'))
+
+
+VERSIONS = ['0.0.0', '1.2.3', '1.0.0-rc.1', '1.0.0-rc.x09', '1.0.0-alpha', '1.0.0+build.9', '1.0.0-rc.1+b.99',
+            '1.1.0-beta.2', '2.0.0+exp.sha.5114f85', '0.1.0-0']
+
+
+class TestNextVersions:
+    @pytest.mark.parametrize('text', VERSIONS)
+    @pytest.mark.parametrize('prerelease_token, build_token', [('rc', 'build'), ('pr', 'bo'), ('rc1', 'b2'), ('', '')])
+    def test_next_versions(self, text, prerelease_token, build_token):
+        v = VersionInfo.parse(text)
+        expected = [
+            v.bump_patch(), v.bump_minor(), v.bump_major(), v.bump_prerelease(prerelease_token),
+            v.bump_build(build_token), v.bump_prerelease(prerelease_token).bump_build(build_token),
+        ]
+        candidates = next_versions(parse(text), prerelease_token, build_token)
+        assert len(candidates) == len(CANDIDATES)
+        assert [unpack(c) for c in candidates] == expected
+        assert [format_version(c) for c in candidates] == [str(e) for e in expected]
+
+    @pytest.mark.parametrize('text', VERSIONS)
+    @pytest.mark.parametrize('bump_type', ['major', 'minor', 'patch', 'prerelease'])
+    def test_next_version(self, text, bump_type):
+        v = VersionInfo.parse(text)
+        assert unpack(next_version(parse(text), bump_type, 'pr')) == v.next_version(bump_type, prerelease_token='pr')
+
+    @pytest.mark.parametrize('text', VERSIONS)
+    def test_next_version_build(self, text):
+        assert unpack(next_version(parse(text), 'build', build_token='bo')) == VersionInfo.parse(text).bump_build('bo')
+
+    def test_next_version_invalid(self):
+        with pytest.raises(ValueError):
+            next_version(parse('1.0.0'), 'micro')
+
+    def test_next_versions_many(self):
+        rows = next_versions_many(['v1.2.3', VersionInfo(1, 0, 0, 'rc.1'), (0, 1, 0, None, None)], 'pr', 'bo')
+        assert rows == [next_versions(parse('1.2.3'), 'pr', 'bo'), next_versions(parse('1.0.0-rc.1'), 'pr', 'bo'),
+                        next_versions(parse('0.1.0'), 'pr', 'bo')]
+        assert rows[1][CANDIDATES.index('prerelease')] == (1, 0, 0, 'rc.2', None)
+        with pytest.raises(ValueError):
+            next_versions_many(['1.0'])
@@ -1,6 +1,8 @@
+import json
 from pathlib import Path
 from unittest.mock import Mock
 
+import pytest
 from click.testing import CliRunner
 from freezegun import freeze_time
 from semver import VersionInfo
@@ -58,3 +60,64 @@ class TestBump:
                     f2_text = f2.read()
                     assert f'## [{version}] - 2021-01-16' in f2_text
                 assert Changelog('CHANGELOG.md').latest_version == version
+
+    def test_invalid_changelog(self, test_changelog_path, tmp_path):
+        f_path = tmp_path / 'CHANGELOG.md'
+        with open(test_changelog_path) as f:
+            f_path.write_text(f.read().replace('### Changed\n- `template`', '### Renamed\n- `template`', 1))
+        res = CliRunner().invoke(bump, ['-f', str(f_path), '-t', 'patch'])
+        assert res.exit_code == 1
+        assert res.output == 'Invalid change type: Renamed (line 11, column 5)\nAborted!\n'
+
+    @freeze_time('2021-01-16')
+    def test_json(self, test_changelog_path, tmp_path, monkeypatch):
+        f_path = tmp_path / 'CHANGELOG.md'
+        with open(test_changelog_path) as f:
+            text = f.read()
+        f_path.write_text(text)
+        monkeypatch.setattr('questionary.select', lambda *args, **kwargs: pytest.fail('Prompted for a version'))
+        monkeypatch.setenv('KAC_CACHE_DIR', str(tmp_path / 'cache'))
+
+        # Without a version part, only the candidates are reported
+        res = CliRunner().invoke(bump, ['-f', str(f_path), '--json'])
+        assert res.exit_code == 0
+        record = json.loads(res.output)
+        assert record['status'] == 'dry_run'
+        assert record['candidates'] == {'patch': '0.3.1', 'minor': '0.4.0', 'major': '1.0.0',
+                                        'prerelease': '0.3.0-rc.1', 'build': '0.3.0+build.1',
+                                        'prerelease_build': '0.3.0-rc.1+build.1'}
+        assert record['new_version'] is None
+
+        res = CliRunner().invoke(bump, ['-f', str(f_path), '-t', 'minor', '--json', '--dry-run'])
+        record = json.loads(res.output)
+        assert (record['status'], record['previous_version'], record['new_version']) == ('dry_run', '0.3.0', '0.4.0')
+        assert '+## [0.4.0] - 2021-01-16\n' in record['diff']
+        assert f_path.read_text() == text
+
+        res = CliRunner().invoke(bump, ['-f', str(f_path), '-t', 'minor', '--json'])
+        assert json.loads(res.output)['status'] == 'bumped'
+        assert f_path.read_text() == Path(test_changelog_path).with_name('test_changelog_file_bumped.md').read_text()
+
+        res = CliRunner().invoke(bump, ['-f', str(f_path), '-t', 'minor', '--json'])
+        assert res.exit_code == 0
+        assert json.loads(res.output)['status'] == 'skipped'
+
+    def test_json_invalid_changelog(self, tmp_path):
+        f_path = tmp_path / 'CHANGELOG.md'
+        f_path.write_text('## [Unreleased]\n### Renamed\n- A\n\n[Unreleased]: https://example.com\n')
+        res = CliRunner().invoke(bump, ['-f', str(f_path), '-t', 'patch', '--json'])
+        assert res.exit_code == 1
+        assert json.loads(res.output) == {'path': str(f_path), 'status': 'error', 'line': 2, 'column': 5,
+                                          'message': 'Invalid change type: Renamed (line 2, column 5)'}
+
+    @freeze_time('2021-01-16')
+    def test_dry_run(self, test_changelog_path, tmp_path):
+        f_path = tmp_path / 'CHANGELOG.md'
+        with open(test_changelog_path) as f:
+            text = f.read()
+        f_path.write_text(text)
+        res = CliRunner().invoke(bump, ['-f', str(f_path), '-t', 'major', '--dry-run'])
+        assert res.exit_code == 0
+        assert res.output.startswith(f'--- {f_path}\n+++ {f_path}\n@@ -5,6 +5,8 @@\n')
+        assert '+## [1.0.0] - 2021-01-16\n' in res.output
+        assert f_path.read_text() == text
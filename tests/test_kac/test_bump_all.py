@@ -0,0 +1,41 @@
+import json
+import shutil
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from kac.kac import bump_all
+
+
+class TestBumpAll:
+    def _setup(self, test_changelog_path, root: Path, count: int = 3):
+        for idx in range(count):
+            (root / f'package_{idx}').mkdir()
+            shutil.copy(test_changelog_path, root / f'package_{idx}' / 'CHANGELOG.md')
+
+    def test_glob_table(self, test_changelog_path, tmp_path):
+        self._setup(test_changelog_path, tmp_path)
+        runner = CliRunner()
+        res = runner.invoke(bump_all, [f'{tmp_path}/*/CHANGELOG.md', '-t', 'minor', '-w', '1'])
+        assert res.exit_code == 0
+        lines = res.output.splitlines()
+        assert lines[0].split() == ['PATH', 'STATUS', 'FROM', 'TO']
+        assert [line.split()[1:] for line in lines[1:]] == [['bumped', '0.3.0', '0.4.0']] * 3
+
+    def test_json_skip_and_error(self, test_changelog_path, tmp_path):
+        self._setup(test_changelog_path, tmp_path, count=1)
+        (tmp_path / 'bad.md').write_text('# Changelog\n')
+        runner = CliRunner()
+        runner.invoke(bump_all, [str(tmp_path / 'package_0' / 'CHANGELOG.md'), '-t', 'patch'])
+
+        res = runner.invoke(bump_all, [f'{tmp_path}/**/*.md', '-t', 'patch', '--format', 'json'])
+        assert res.exit_code == 1
+        results = {Path(r['path']).name: r for r in json.loads(res.output)}
+        assert results['CHANGELOG.md']['status'] == 'skipped'
+        assert results['CHANGELOG.md']['previous_version'] == '0.3.1'
+        assert results['bad.md']['status'] == 'error'
+
+    def test_no_files(self, tmp_path):
+        res = CliRunner().invoke(bump_all, [f'{tmp_path}/*.md', '-t', 'patch'])
+        assert res.exit_code == 1
+        assert res.output == 'No CHANGELOG files found.\nAborted!\n'
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from click.testing import CliRunner
 
@@ -42,3 +44,49 @@ class TestCopy:
                                  f"Try 'copy --help' for help.\n\n" \
                                  f"Error: Invalid value for \'-f\' / \'--filename\': " \
                                  f"File \'{iso}/CHANGELOG.md\' does not exist.\n"
+
+    def test_no_releases(self, tmp_path):
+        f_path = tmp_path / 'CHANGELOG.md'
+        f_path.write_text('## [Unreleased]\n### Added\n- A\n\n[Unreleased]: https://example.com\n')
+        res = CliRunner().invoke(copy, ['-f', str(f_path)])
+        assert res.exit_code == 1
+        assert res.output == 'The CHANGELOG has no releases to copy.\nAborted!\n'
+
+    def test_json(self, test_changelog_path, monkeypatch):
+        copied = []
+        monkeypatch.setattr('pyperclip.copy', copied.append)
+        res = CliRunner().invoke(copy, ['-f', test_changelog_path, '--json'])
+        assert res.exit_code == 0
+        text = '### Added\n- `template` command\n- Initial basic tests with SemaphoreCI integration\n' \
+               '- Automatic releases to PyPI on git tags\n\n### Changed\n- Use poetry instead of pipenv\n\n'
+        assert json.loads(res.output) == {'path': test_changelog_path, 'status': 'copied', 'version': '0.3.0',
+                                          'release_date': '2020-04-05', 'text': text, 'message': ''}
+        assert copied == [text]
+
+        res = CliRunner().invoke(copy, ['-f', test_changelog_path, '--json', '--dry-run'])
+        assert json.loads(res.output)['status'] == 'dry_run'
+        assert copied == [text]
+
+    def test_dry_run(self, test_changelog_path, monkeypatch):
+        monkeypatch.setattr('pyperclip.copy', lambda *args: pytest.fail('Copied to the clipboard'))
+        res = CliRunner().invoke(copy, ['-f', test_changelog_path, '--dry-run'])
+        assert res.exit_code == 0
+        assert res.output.startswith('### Added\n- `template` command\n')
+
+    def test_json_no_releases(self, tmp_path):
+        f_path = tmp_path / 'CHANGELOG.md'
+        f_path.write_text('## [Unreleased]\n### Added\n- A\n\n[Unreleased]: https://example.com\n')
+        res = CliRunner().invoke(copy, ['-f', str(f_path), '--json'])
+        assert res.exit_code == 0
+        assert json.loads(res.output)['status'] == 'skipped'
+
+    def test_no_clipboard(self, test_changelog_path, monkeypatch):
+        import pyperclip
+
+        def fail(text):
+            raise pyperclip.PyperclipException('No clipboard')
+
+        monkeypatch.setattr('pyperclip.copy', fail)
+        res = CliRunner().invoke(copy, ['-f', test_changelog_path])
+        assert res.exit_code == 1
+        assert res.output == 'No clipboard\nAborted!\n'
@@ -0,0 +1,27 @@
+import json
+
+from click.testing import CliRunner
+
+from kac.kac import export
+
+
+class TestExport:
+    def test_jsonl(self, test_changelog_path):
+        res = CliRunner().invoke(export, [test_changelog_path])
+        assert res.exit_code == 0
+        records = [json.loads(line) for line in res.output.splitlines()]
+        assert [r['version'] for r in records][:3] == ['0.3.0', '0.2.3', '0.2.2']
+        assert len(records) == 9
+
+    def test_columns_to_file(self, test_changelog_path, tmp_path):
+        output = tmp_path / 'export.jsonl'
+        res = CliRunner().invoke(export, [test_changelog_path, '--format', 'columns', '--batch-size', '10', '-o',
+                                          str(output)])
+        assert res.exit_code == 0
+        batches = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [len(b['entry']) for b in batches] == [10, 3]
+        assert batches[0]['date'][0] == 18357  # 2020-04-05
+
+    def test_no_files(self, tmp_path):
+        res = CliRunner().invoke(export, [f'{tmp_path}/*.md'])
+        assert res.exit_code == 1
@@ -0,0 +1,28 @@
+import json
+
+from click.testing import CliRunner
+
+from kac.kac import feed
+
+
+class TestFeed:
+    def test_text(self, test_changelog_path):
+        res = CliRunner().invoke(feed, [test_changelog_path, test_changelog_path, '-n', '3'])
+        assert res.exit_code == 0
+        assert res.output.splitlines() == [
+            f'2020-04-05  v0.3.0  {test_changelog_path}',
+            f'2020-04-05  v0.3.0  {test_changelog_path}',
+            f'2020-03-19  v0.2.3  {test_changelog_path}',
+        ]
+
+    def test_jsonl(self, test_changelog_path):
+        res = CliRunner().invoke(feed, [test_changelog_path, '--since', '2020-03-01', '--format', 'jsonl'])
+        assert res.exit_code == 0
+        records = [json.loads(line) for line in res.output.splitlines()]
+        assert [(r['version'], r['path']) for r in records] == [('0.3.0', test_changelog_path),
+                                                                ('0.2.3', test_changelog_path)]
+        assert records[0]['changes']['added'][0] == '`template` command'
+
+    def test_no_files(self, tmp_path):
+        res = CliRunner().invoke(feed, [f'{tmp_path}/*.md'])
+        assert res.exit_code == 1
@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = str(Path(__file__).parent.parent.parent.resolve())
+
+# Modules that only some commands need, and that must not be imported by the others
+INTERACTIVE_MODULES = {'questionary', 'prompt_toolkit'}
+HEAVY_MODULES = INTERACTIVE_MODULES | {'jinja2', 'pyperclip', 'concurrent.futures.process'}
+# Modules that only commands reading a CHANGELOG file need, and that `--help` must not import
+LIBRARY_MODULES = {'kac.changelog', 'semver', 'difflib', 'mmap', 'hashlib', 'tempfile'}
+
+# Total import time budget of each command, in microseconds: about 2.5 times what the imports take on a developer
+# machine, so that a new import of a heavy module fails the test without slow CI runners failing it too.
+LIGHT_BUDGET_US = 200_000
+INIT_BUDGET_US = 300_000
+
+
+def _import_times(args, cwd) -> dict:
+    """Run `kac` with `python -X importtime` and return the self import time of every imported module."""
+    code = 'import sys; from kac.kac import cli; cli(sys.argv[1:], prog_name="kac")'
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_ROOT, os.environ.get('PYTHONPATH')])))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code, *args],
+        cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(self_us)
+    return times
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='`-X importtime` requires Python 3.7')
+@pytest.mark.parametrize('args, forbidden, budget', [
+    (['--help'], HEAVY_MODULES | LIBRARY_MODULES, LIGHT_BUDGET_US),
+    (['copy', '--help'], HEAVY_MODULES | LIBRARY_MODULES, LIGHT_BUDGET_US),
+    (['bump', '--help'], HEAVY_MODULES | LIBRARY_MODULES, LIGHT_BUDGET_US),
+    (['search', '--help'], HEAVY_MODULES | LIBRARY_MODULES, LIGHT_BUDGET_US),
+    (['bump', '-t', 'patch'], HEAVY_MODULES, LIGHT_BUDGET_US),
+    (['bump', '--json'], HEAVY_MODULES, LIGHT_BUDGET_US),
+    (['copy', '--dry-run'], HEAVY_MODULES, LIGHT_BUDGET_US),
+    (['bump-all', 'CHANGELOG.md', '-t', 'patch'], INTERACTIVE_MODULES | {'jinja2', 'pyperclip'}, LIGHT_BUDGET_US),
+    (['init', '--help'], HEAVY_MODULES | LIBRARY_MODULES, LIGHT_BUDGET_US),
+    (['init', '--version', '1.0.0', '--repo-url', 'https://example.com', '-f', 'NEW.md'],
+     INTERACTIVE_MODULES | {'pyperclip'}, INIT_BUDGET_US),
+])
+def test_import_time(args, forbidden, budget, test_changelog_path, tmp_path):
+    (tmp_path / 'CHANGELOG.md').write_text(Path(test_changelog_path).read_text())
+    times = _import_times(args, tmp_path)
+
+    assert 'kac.kac' in times
+    assert not {name for name in times if name.split('.')[0] in forbidden or name in forbidden}
+    assert sum(times.values()) < budget
+
+
+def test_library_does_not_import_click():
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_ROOT, os.environ.get('PYTHONPATH')])))
+    proc = subprocess.run(
+        [sys.executable, '-c', 'import sys, kac.changelog; print("click" in sys.modules)'],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == 'False'
+
+
+def test_option_constants_match_library():
+    from kac import kac
+    from kac.changelog import Changelog
+    from kac.changelog.release import ReleaseBase
+
+    assert kac.DEFAULT_FILE_NAME == Changelog.default_file_name
+    assert kac.BUMP_TYPES == Changelog.BUMP_TYPES
+    assert kac.CHANGE_TYPES == ReleaseBase.CHANGE_TYPES
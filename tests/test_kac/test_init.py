@@ -30,3 +30,33 @@ class TestInit:
 
             with open('CHANGELOG.md') as new_f, open(expected_path) as expected:
                 assert new_f.read() == expected.read()
+
+    @freeze_time("2021-06-12")
+    def test_non_interactive(self, monkeypatch, tmp_path):
+        monkeypatch.setattr('questionary.text', Mock(side_effect=AssertionError('prompted')))
+        paths = [tmp_path / f'package_{idx}' / 'CHANGELOG.md' for idx in range(3)]
+        for path in paths:
+            path.parent.mkdir()
+        res = CliRunner().invoke(init, ['--version', 'v0.0.1', '--repo-url', 'https://github.com/atwalsh/kac',
+                                        *map(str, paths)])
+        assert res.exit_code == 0
+        assert res.output.splitlines() == [f'Created CHANGELOG file at: {path}' for path in paths]
+        expected = (Path(__file__).parent.parent / 'files' / 'test_init_file.md').read_text()
+        assert all(path.read_text() == expected for path in paths)
+
+    def test_existing_files_are_kept(self, tmp_path):
+        existing, new = tmp_path / 'existing.md', tmp_path / 'new.md'
+        existing.write_text('# Changelog\n')
+        res = CliRunner().invoke(init, ['--version', '1.0.0', '--repo-url', 'https://example.com', str(existing),
+                                        str(new)])
+        assert res.exit_code == 1
+        assert f'The CHANGELOG file already exists: {existing}' in res.output
+        assert existing.read_text() == '# Changelog\n'
+        assert new.is_file()
+
+    def test_invalid_version(self, tmp_path):
+        res = CliRunner().invoke(init, ['--version', '1.0', '--repo-url', 'https://example.com',
+                                        str(tmp_path / 'CHANGELOG.md')])
+        assert res.exit_code == 1
+        assert res.output.startswith('Invalid Semantic Version number: 1.0\n')
+        assert not (tmp_path / 'CHANGELOG.md').exists()
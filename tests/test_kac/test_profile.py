@@ -0,0 +1,36 @@
+import json
+import shutil
+
+from click.testing import CliRunner
+
+from kac.changelog import trace
+from kac.kac import cli
+
+
+class TestProfile:
+    def test_profile(self, test_changelog_path, tmp_path):
+        changelog_path = tmp_path / 'CHANGELOG.md'
+        shutil.copy(test_changelog_path, changelog_path)
+        profile = tmp_path / 'profile.json'
+        res = CliRunner().invoke(cli, ['--profile', str(profile), 'bump', '-t', 'patch', '-f', str(changelog_path)])
+        assert res.exit_code == 0
+        names = [e['name'] for e in json.loads(profile.read_text())['events']]
+        assert names[-1] == 'kac bump'
+        assert {'read', 'scan', 'parse_releases', 'load', 'write', 'bump'} <= set(names)
+        assert trace.active() is None
+
+    def test_profile_env(self, test_changelog_path, tmp_path):
+        profile = tmp_path / 'profile.json'
+        res = CliRunner().invoke(cli, ['export', test_changelog_path],
+                                 env={'KAC_PROFILE': str(profile), 'KAC_PROFILE_FORMAT': 'chrome'})
+        assert res.exit_code == 0
+        data = json.loads(profile.read_text())
+        assert data['traceEvents'][0]['name'] == 'kac export'
+        assert data['otherData']['totals']['parse_heading']['count'] == 9
+
+    def test_profile_on_error(self, tmp_path):
+        profile = tmp_path / 'profile.json'
+        res = CliRunner().invoke(cli, ['--profile', str(profile), 'bump', '-t', 'patch', '-f',
+                                       str(tmp_path / 'missing.md')])
+        assert res.exit_code != 0
+        assert profile.is_file()
@@ -0,0 +1,59 @@
+import json
+import os
+import shutil
+
+from click.testing import CliRunner
+from freezegun import freeze_time
+
+from kac.changelog.search import SearchIndex, default_index_path
+from kac.kac import bump, search
+
+
+class TestSearch:
+    def test_text(self, test_changelog_path, tmp_path):
+        index_path = str(tmp_path / 'search.idx')
+        res = CliRunner().invoke(search, ['copy', test_changelog_path, '--index', index_path, '-n', '2'])
+        assert res.exit_code == 0
+        assert res.output.splitlines() == [
+            f'2020-01-11  v0.2.1  fixed  {test_changelog_path}: '
+            'Issue where `copy` would not correctly copy release text with new lines',
+            f'2020-01-11  v0.2.0  added  {test_changelog_path}: `bump` and `copy` commands',
+        ]
+
+    def test_jsonl(self, test_changelog_path, tmp_path, monkeypatch):
+        monkeypatch.setenv('KAC_CACHE_DIR', str(tmp_path))
+        res = CliRunner().invoke(search, ['bump', test_changelog_path, '-t', 'changed', '--format', 'jsonl'])
+        assert res.exit_code == 0
+        assert [json.loads(line) for line in res.output.splitlines()] == [{
+            'path': test_changelog_path,
+            'version': '0.2.0',
+            'release_date': '2020-01-11',
+            'change_type': 'changed',
+            'entry': '`kac` cannot be invoked without either the `bump` or `copy` commands',
+        }]
+        assert test_changelog_path in SearchIndex.load()
+
+    def test_no_files(self, tmp_path):
+        res = CliRunner().invoke(search, ['copy', f'{tmp_path}/*.md'])
+        assert res.exit_code == 1
+
+    def test_missing_file(self, tmp_path):
+        res = CliRunner().invoke(search, ['copy', str(tmp_path / 'CHANGELOG.md'), '--index', str(tmp_path / 'idx')])
+        assert res.exit_code == 1
+        assert res.output.startswith('Invalid CHANGELOG file path.')
+
+    @freeze_time('2021-01-16')
+    def test_bump_leaves_index(self, test_changelog_path, tmp_path, monkeypatch):
+        monkeypatch.setenv('KAC_CACHE_DIR', str(tmp_path / 'cache'))
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            shutil.copy(test_changelog_path, 'CHANGELOG.md')
+            assert runner.invoke(search, ['something']).output == ''
+            index_stat = os.stat(default_index_path())
+
+            assert runner.invoke(bump, ['-t', 'minor']).output == 'Bumped to v0.4.0!\n'
+            assert os.stat(default_index_path()).st_mtime_ns == index_stat.st_mtime_ns
+            # The bumped file is indexed again by the next search
+            res = runner.invoke(search, ['something'])
+            assert res.output == '2021-01-16  v0.4.0  added  CHANGELOG.md: Something added\n'
+            assert len(SearchIndex.load(default_index_path())) == 15
@@ -0,0 +1,33 @@
+import json
+import shutil
+
+from click.testing import CliRunner
+from freezegun import freeze_time
+
+from kac.changelog import Changelog
+from kac.kac import serve
+
+
+class TestServe:
+    @freeze_time('2021-01-16')
+    def test_requests(self, test_changelog_path, tmp_path, monkeypatch):
+        monkeypatch.setenv('KAC_CACHE_DIR', str(tmp_path / 'cache'))
+        path = shutil.copy(test_changelog_path, str(tmp_path / 'CHANGELOG.md'))
+        requests = [
+            {'id': 1, 'command': 'bump', 'path': path, 'type': 'minor', 'dry_run': True},
+            {'id': 2, 'command': 'bump', 'path': path, 'type': 'minor'},
+            {'id': 3, 'command': 'copy', 'path': path, 'dry_run': True},
+        ]
+        res = CliRunner().invoke(serve, input=''.join(json.dumps(r) + '\n' for r in requests))
+        assert res.exit_code == 0
+        results = [json.loads(line) for line in res.output.splitlines()]
+        assert [(r['id'], r['status']) for r in results] == [(1, 'dry_run'), (2, 'bumped'), (3, 'dry_run')]
+        assert results[0]['diff'] == results[1]['diff']
+        assert results[2]['version'] == '0.4.0'
+        assert results[2]['text'] == '### Added\n- Something added\n\n### Changed\n- `template` command to `new`\n\n'
+        assert str(Changelog(path).latest_version) == '0.4.0'
+
+    def test_empty_input(self):
+        res = CliRunner().invoke(serve, input='')
+        assert res.exit_code == 0
+        assert res.output == ''
@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from kac.kac import watch
+
+
+class TestWatch:
+    def test_watch(self, changelog_path, monkeypatch):
+        def edit(old, new):
+            return lambda: Path(changelog_path).write_text(Path(changelog_path).read_text().replace(old, new, 1))
+
+        edits = [edit('### Added\n', '### Added\n- New\n'), edit('### Added', '### Adds')]
+
+        def sleep(_):
+            if not edits:
+                raise KeyboardInterrupt
+            edits.pop(0)()
+
+        monkeypatch.setattr('time.sleep', sleep)
+        res = CliRunner().invoke(watch, ['-f', changelog_path])
+        assert res.exit_code == 0
+        lines = res.output.splitlines()
+        assert lines[0] == f'Watching {changelog_path}: 9 releases, latest v0.3.0, 2 unreleased changes'
+        assert lines[1].startswith('Updated in ')
+        assert lines[1].endswith(': 9 releases, latest v0.3.0, 3 unreleased changes')
+        assert lines[2].startswith('Error: Invalid change type: Adds (line ')
+        assert len(lines) == 3
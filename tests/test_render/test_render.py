@@ -0,0 +1,39 @@
+from datetime import date
+from pathlib import Path
+
+import pytest
+from semver import VersionInfo
+
+from kac import render
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('KAC_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(render, '_environment', None)
+    return tmp_path / 'templates'
+
+
+class TestRender:
+    def test_render_changelog(self, cache_dir):
+        text = render.render_changelog(VersionInfo.parse('0.0.1'), 'https://github.com/atwalsh/kac', date(2021, 6, 12))
+        assert text == (Path(__file__).parent.parent / 'files' / 'test_init_file.md').read_text()
+
+    def test_template_is_compiled_once(self, cache_dir):
+        assert render.get_environment() is render.get_environment()
+        assert render.get_template('CHANGELOG.md') is render.get_template('CHANGELOG.md')
+
+    def test_bytecode_is_cached_on_disk(self, cache_dir, monkeypatch):
+        render.get_template('CHANGELOG.md')
+        assert len(list(cache_dir.iterdir())) == 1
+
+        # A new process loads the cached bytecode instead of compiling the template
+        monkeypatch.setattr(render, '_environment', None)
+        environment = render.get_environment()
+        monkeypatch.setattr(environment, 'compile', None)
+        assert render.render_changelog(VersionInfo.parse('1.0.0'), 'https://example.com').startswith('# Changelog')
+
+    def test_unwritable_cache_dir(self, cache_dir, monkeypatch):
+        monkeypatch.setattr(render, 'template_cache_dir', lambda: '/dev/null/templates')
+        assert render.get_environment().bytecode_cache is None
+        assert render.get_template('CHANGELOG.md')
@@ -0,0 +1,97 @@
+import io
+import json
+import shutil
+
+import pytest
+from freezegun import freeze_time
+
+from kac.changelog import Changelog
+from kac.serve import Server, bump_record
+
+
+class TestBumpRecord:
+    def test_no_releases(self, tmp_path):
+        f_path = tmp_path / 'CHANGELOG.md'
+        f_path.write_text('## [Unreleased]\n### Added\n- A\n\n[Unreleased]: https://example.com\n')
+        record = bump_record(Changelog(str(f_path)), 'patch')
+        assert (record['status'], record['message']) == ('error', 'The CHANGELOG has no releases to bump.')
+
+    def test_invalid_bump_type(self, changelog_path):
+        record = bump_record(Changelog(changelog_path), 'minor_patch')
+        assert (record['status'], record['message']) == ('error', 'Invalid bump type: minor_patch')
+
+
+class TestServer:
+    @freeze_time('2021-01-16')
+    def test_bump(self, changelog_path):
+        server = Server()
+        result = server.handle({'id': 1, 'command': 'bump', 'path': changelog_path, 'type': 'patch', 'dry_run': True})
+        assert (result['id'], result['status'], result['new_version']) == (1, 'dry_run', '0.3.1')
+
+        result = server.handle({'command': 'bump', 'path': changelog_path, 'type': 'prerelease', 'prerelease': 'beta'})
+        assert (result['status'], result['new_version']) == ('bumped', '0.3.1-beta.1')
+        assert 'id' not in result
+        assert Changelog(changelog_path).latest_version == Changelog(changelog_path).releases[0].version
+        assert str(Changelog(changelog_path).latest_version) == '0.3.1-beta.1'
+
+        result = server.handle({'command': 'bump', 'path': changelog_path, 'type': 'patch'})
+        assert (result['status'], result['previous_version']) == ('skipped', '0.3.1-beta.1')
+
+    def test_copy(self, changelog_path):
+        result = Server().handle({'command': 'copy', 'path': changelog_path, 'dry_run': True})
+        assert (result['status'], result['version'], result['release_date']) == ('dry_run', '0.3.0', '2020-04-05')
+        assert result['text'].startswith('### Added\n- `template` command\n')
+
+    def test_keeps_changelogs_parsed(self, changelog_path, monkeypatch):
+        server = Server()
+        changelog = server.changelog(changelog_path)
+        monkeypatch.setattr(Changelog, '__init__', lambda *args, **kwargs: pytest.fail('Parsed again'))
+        assert server.changelog(changelog_path) is changelog
+        server.handle({'command': 'bump', 'path': changelog_path, 'type': 'patch'})
+        assert server.changelog(changelog_path) is changelog
+
+        # Edited files are refreshed in place
+        with open(changelog_path, 'a') as f:
+            f.write('[0.0.1]: https://github.com/atwalsh/kac/releases/tag/v0.0.1\n')
+        assert server.changelog(changelog_path) is changelog
+        assert changelog.links['0.0.1'] == 'https://github.com/atwalsh/kac/releases/tag/v0.0.1'
+
+    def test_max_files(self, changelog_path, tmp_path):
+        paths = [changelog_path] + [shutil.copy(changelog_path, str(tmp_path / f'{idx}.md')) for idx in range(2)]
+        server = Server(max_files=2)
+        first = server.changelog(paths[0])
+        for path in paths[1:]:
+            server.changelog(path)
+        assert repr(server) == '<Server of 2 CHANGELOG files>'
+        assert server.changelog(paths[0]) is not first
+
+    def test_errors(self, changelog_path, tmp_path):
+        server = Server()
+        assert server.handle({'id': 'a', 'command': 'tag', 'path': changelog_path}) == {
+            'id': 'a', 'path': changelog_path, 'status': 'error',
+            'message': 'Invalid command: tag, expected one of bump, copy'}
+        assert server.handle({'command': 'copy', 'path': str(tmp_path / 'missing.md')})['message'] == \
+            'Invalid CHANGELOG file path.'
+        assert server.handle([])['status'] == 'error'
+
+        with open(changelog_path) as f:
+            text = f.read()
+        with open(changelog_path, 'w') as f:
+            f.write(text.replace('### Changed\n- Use poetry', '### Renamed\n- Use poetry'))
+        result = server.handle({'command': 'copy', 'path': changelog_path, 'dry_run': True})
+        assert (result['status'], result['line'], result['column']) == ('error', 20, 5)
+
+    def test_serve(self, changelog_path):
+        requests = io.StringIO('\n'.join([
+            json.dumps({'id': 1, 'command': 'copy', 'path': changelog_path, 'dry_run': True}),
+            '',
+            'not json',
+            json.dumps({'id': 2, 'command': 'bump', 'path': changelog_path}),
+        ]))
+        results = io.StringIO()
+        assert Server().serve(requests, results) == 3
+        records = [json.loads(line) for line in results.getvalue().splitlines()]
+        assert [r.get('id') for r in records] == [1, None, 2]
+        assert [r['status'] for r in records] == ['dry_run', 'error', 'dry_run']
+        assert records[1]['message'].startswith('Invalid JSON request: ')
+        assert records[2]['candidates']['minor'] == '0.4.0'